@@ -0,0 +1,61 @@
+"""
+Compares the memory used by a large configuration tree, held as nested
+dictionaries and in its compact representation, using tracemalloc.
+
+python benchmarks/compact.py [tenants]
+"""
+import gc
+import sys
+import tracemalloc
+
+from config.common import Configuration
+from config.common.compact import compact
+
+
+def create_values(tenants: int):
+    return {
+        "tenants": {
+            f"tenant-{index}": {
+                "name": f"Tenant {index}",
+                "region": "westeurope" if index % 2 else "northeurope",
+                "limits": {"rps": 100, "burst": 200, "connections": 10},
+                "ports": [8000, 8001, 8002],
+                "routes": [
+                    {"path": "/api", "method": "GET", "weight": 0.5},
+                    {"path": "/api", "method": "POST", "weight": 0.5},
+                ],
+            }
+            for index in range(tenants)
+        }
+    }
+
+
+def measure(factory):
+    gc.collect()
+    tracemalloc.start()
+    value = factory()
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size, peak
+
+
+def main(tenants: int) -> None:
+    _, dict_size, _ = measure(lambda: Configuration(create_values(tenants)))
+    config, compact_size, compact_peak = measure(
+        lambda: Configuration(compact(create_values(tenants)))
+    )
+
+    assert config.tenants[f"tenant-{tenants - 1}"].limits.rps == 100
+
+    print(f"tenants: {tenants}")
+    print(f"nested dictionaries: {dict_size / 1024 / 1024:.2f} MiB")
+    print(
+        f"compact: {compact_size / 1024 / 1024:.2f} MiB "
+        f"({compact_size / dict_size:.0%}), "
+        f"peak while compacting: {compact_peak / 1024 / 1024:.2f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,49 @@
+"""
+Compares the time spent applying many flattened keys, like the ones of
+environment variables, one by one and in bulk with merge_values.
+
+python benchmarks/merge_values.py [tenants]
+"""
+import sys
+import time
+
+from config.common import apply_key_value, merge_values
+
+LIMITS = ["rps", "burst", "connections", "timeout"]
+
+
+def create_pairs(tenants: int):
+    return [
+        (f"app__tenants__tenant-{index}__limits__{name}", index)
+        for index in range(tenants)
+        for name in LIMITS
+    ]
+
+
+def measure(function, pairs):
+    values = {}
+    start = time.perf_counter()
+    function(values, pairs)
+    return values, time.perf_counter() - start
+
+
+def apply_one_by_one(values, pairs):
+    for key, value in pairs:
+        apply_key_value(values, key, value)
+
+
+def main(tenants: int) -> None:
+    pairs = create_pairs(tenants)
+
+    expected, one_by_one = measure(apply_one_by_one, pairs)
+    values, bulk = measure(merge_values, pairs)
+
+    assert values == expected
+
+    print(f"keys: {len(pairs)}")
+    print(f"one by one: {one_by_one:.3f}s")
+    print(f"in bulk: {bulk:.3f}s ({bulk / one_by_one:.0%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,66 @@
+"""
+This module provides support for the project CLI. Rich output, through
+`rich-click`, is used only when the standard output is a terminal, since loading
+`rich` takes longer than most commands; otherwise plain `click` is used.
+"""
+import importlib
+import os
+import sys
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+
+def use_rich_output() -> bool:
+    """
+    Returns a value indicating whether the CLI should use rich output, which can be
+    forced setting the EC_RICH environment variable to "1" or "0".
+    """
+    value = os.environ.get("EC_RICH")
+    if value is not None:
+        return value == "1"
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):  # pragma: no cover
+        return False
+
+
+def get_click() -> ModuleType:
+    """
+    Returns the `rich_click` module if rich output is used and it is installed,
+    otherwise the `click` module.
+    """
+    if use_rich_output():
+        try:
+            import rich_click
+
+            return rich_click
+        except ImportError:  # pragma: no cover
+            pass
+    import click
+
+    return click
+
+
+click: Any = get_click()
+
+
+class LazyGroup(getattr(click, "RichGroup", click.Group)):  # type: ignore
+    """
+    A group of commands whose modules are imported only when they are invoked,
+    described by import paths like `config.user.cli:settings`.
+    """
+
+    def __init__(
+        self, *args, lazy_commands: Optional[Dict[str, str]] = None, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name: str):
+        if cmd_name in self.lazy_commands:
+            module_name, _, attribute = self.lazy_commands[cmd_name].partition(":")
+            return getattr(importlib.import_module(module_name), attribute)
+        return super().get_command(ctx, cmd_name)
@@ -1,11 +1,15 @@
 import os
 
-import rich_click as click
+from config.cli import LazyGroup, click
 
-from config.user.cli import settings
 
-
-@click.group()
+@click.group(
+    cls=LazyGroup,
+    lazy_commands={
+        "settings": "config.user.cli:settings",
+        "snapshot": "config.cli.snapshot:snapshot",
+    },
+)
 @click.option(
     "--verbose", default=False, help="Whether to display debug output.", is_flag=True
 )
@@ -16,6 +20,3 @@ def main(verbose: bool):
 
     if verbose:
         os.environ["EC_VERBOSE"] = "1"
-
-
-main.add_command(settings)
@@ -0,0 +1,112 @@
+import importlib
+import os
+import sys
+from typing import Optional
+
+from config.cli import click
+from config.common import ConfigurationBuilder
+from config.common.snapshot import compile_snapshot
+
+
+def load_builder(target: str) -> ConfigurationBuilder:
+    """
+    Returns the ConfigurationBuilder described by an import path like
+    `app.settings:builder`, or `app.settings:get_builder` for a function that
+    returns a builder.
+    """
+    module_name, _, attribute = target.partition(":")
+    if not module_name or not attribute:
+        raise click.BadParameter(
+            "expected a value like 'module:builder' or 'module:factory'",
+            param_hint="TARGET",
+        )
+
+    # like other tools importing applications, allow importing modules from the
+    # current working directory
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as import_error:
+        raise click.ClickException(f"Cannot import {module_name}: {import_error}")
+
+    try:
+        builder = getattr(module, attribute)
+    except AttributeError:
+        raise click.ClickException(f"{module_name} has no attribute {attribute}.")
+
+    if callable(builder) and not isinstance(builder, ConfigurationBuilder):
+        builder = builder()
+
+    if not isinstance(builder, ConfigurationBuilder):
+        raise click.ClickException(
+            f"{target} is not a ConfigurationBuilder, nor a function returning one."
+        )
+    return builder
+
+
+def describe_source(source) -> str:
+    file_path = getattr(source, "file_path", None)
+    if file_path is not None:
+        return f"{type(source).__name__} {file_path}"
+    return type(source).__name__
+
+
+@click.group()
+def snapshot():
+    """
+    Commands to handle compiled snapshots of configuration.
+    """
+
+
+@click.command(name="compile")
+@click.argument("target")
+@click.option("--output", "-o", required=True, help="Output file path.")
+@click.option(
+    "--max-source-time",
+    type=float,
+    required=False,
+    help="Fail if a source takes longer than the given number of seconds.",
+)
+def compile_command(target: str, output: str, max_source_time: Optional[float]):
+    """
+    Read and merge the sources of a ConfigurationBuilder, and write the merged
+    values to a compiled snapshot that can be loaded with SnapshotFile, reporting
+    the time spent on each source.
+
+    Examples:
+
+    config snapshot compile app.settings:get_builder -o settings.snapshot
+    """
+    report = compile_snapshot(load_builder(target))
+    report.write(output)
+
+    click.echo(f"{'Source':<50} {'Load (ms)':>10} {'Merge (ms)':>10} {'Keys':>8}")
+    slow_sources = []
+    for source_report in report.sources:
+        click.echo(
+            f"{describe_source(source_report.source)[:50]:<50} "
+            f"{source_report.load_time * 1000:>10.2f} "
+            f"{source_report.merge_time * 1000:>10.2f} "
+            f"{source_report.keys:>8}"
+        )
+        if max_source_time is not None and source_report.total_time > max_source_time:
+            slow_sources.append(source_report)
+
+    click.echo(
+        f"Snapshot: {report.keys} keys, {report.size} bytes, "
+        f"fingerprint {report.fingerprint}"
+    )
+    click.echo(f"Written to: {output}")
+
+    if slow_sources:
+        raise click.ClickException(
+            "Sources exceeding the maximum time: "
+            + ", ".join(
+                describe_source(source_report.source) for source_report in slow_sources
+            )
+        )
+
+
+snapshot.add_command(compile_command)
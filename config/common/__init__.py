@@ -1,13 +1,38 @@
 from abc import ABC, abstractmethod
 from collections import abc
-from typing import Any, Dict, List, Mapping, Optional, Type, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from deepmerge import Merger
 
+from config.common.interpolation import interpolate
+from config.common.merging import MergeStrategies, MergeStrategy, create_merger
 from config.errors import ConfigurationOverrideError
 
+if TYPE_CHECKING:  # pragma: no cover
+    from config.common.accessors import Accessor
+    from config.common.export import ConfigurationExport
+    from config.common.schema import Schema
+    from config.common.secrets import Secrets
+    from config.common.statistics import AccessStatistics
+    from config.common.variants import ConfigurationBase
+
 T = TypeVar("T")
 
+_MISSING = object()
+
 merger = Merger(
     type_strategies=[
         (list, ["append"]),
@@ -19,80 +44,263 @@ merger = Merger(
 )
 
 
-def apply_key_value(obj: Mapping[str, Any], key: str, value: Any) -> Mapping[str, Any]:
+Key = Union[str, Tuple[str, ...]]
+
+
+def split_key(key: Key) -> List[str]:
+    """
+    Returns the parts of a key describing a nested property, like `a:b`, `a__b`,
+    or `a.b`. Keys can also be tuples of parts, for parts containing separators,
+    like `("certificates", "tls.crt")`.
+    """
+    if isinstance(key, tuple):
+        return list(key)
     key = key.strip("_:.")  # remove special characters from both ends
     for token in (":", "__", "."):
         if token in key:
-            parts = key.split(token)
+            return key.split(token)
+    return [key]
 
-            sub_property = obj
-            last_part = parts[-1]
-            for part in parts[:-1]:
-                if isinstance(sub_property, abc.MutableSequence):
-                    try:
-                        index = int(part)
-                    except ValueError:
-                        raise ConfigurationOverrideError(
-                            f"{part} was supposed to be a numeric index in {key}"
-                        )
-
-                    sub_property = sub_property[index]
-                    continue
-
-                try:
-                    sub_property = sub_property[part]
-                except KeyError:
-                    sub_property[part] = {}
-                    sub_property = sub_property[part]
-                else:
-                    if not isinstance(sub_property, abc.Mapping) and not isinstance(
-                        sub_property, abc.MutableSequence
-                    ):
-                        raise ConfigurationOverrideError(
-                            f"The key '{key}' cannot be used "
-                            f"because it overrides another "
-                            f"variable with shorter key! ({part}, {sub_property})"
-                        )
-
-            if isinstance(sub_property, abc.MutableSequence):
-                try:
-                    index = int(last_part)
-                except ValueError:
-                    raise ConfigurationOverrideError(
-                        f"{last_part} was supposed to be a numeric index in {key}, "
-                        f"because the affected property is a mutable sequence."
-                    )
-
-                try:
-                    sub_property[index] = merger.merge(sub_property[index], value)
-                except IndexError:
-                    raise ConfigurationOverrideError(
-                        f"Invalid override for mutable sequence {key}, "
-                        f"assignment index out of range"
-                    )
+
+def _descend(container: Any, part: str, key: str) -> Any:
+    """
+    Returns the object at the given intermediate part of a key, inside the given
+    container, creating a dictionary if it does not exist.
+    """
+    if isinstance(container, abc.MutableSequence):
+        try:
+            index = int(part)
+        except ValueError:
+            raise ConfigurationOverrideError(
+                f"{part} was supposed to be a numeric index in {key}"
+            )
+        return container[index]
+
+    try:
+        sub_property = container[part]
+    except KeyError:
+        sub_property = container[part] = {}
+    else:
+        if not isinstance(sub_property, abc.Mapping) and not isinstance(
+            sub_property, abc.MutableSequence
+        ):
+            raise ConfigurationOverrideError(
+                f"The key '{key}' cannot be used "
+                f"because it overrides another "
+                f"variable with shorter key! ({part}, {sub_property})"
+            )
+    return sub_property
+
+
+def _set_value(
+    sub_property: Any,
+    last_part: str,
+    value: Any,
+    parts: List[str],
+    key: str,
+    merger: Merger,
+) -> None:
+    """
+    Sets the value at the last part of a key, inside the given object.
+    """
+    if isinstance(sub_property, abc.MutableSequence):
+        try:
+            index = int(last_part)
+        except ValueError:
+            raise ConfigurationOverrideError(
+                f"{last_part} was supposed to be a numeric index in {key}, "
+                f"because the affected property is a mutable sequence."
+            )
+
+        try:
+            sub_property[index] = merger.value_strategy(
+                parts, sub_property[index], value
+            )
+        except IndexError:
+            raise ConfigurationOverrideError(
+                f"Invalid override for mutable sequence {key}, "
+                f"assignment index out of range"
+            )
+    else:
+        try:
+            if isinstance(sub_property, abc.Mapping):
+                sub_property[last_part] = merger.value_strategy(
+                    parts,
+                    sub_property.get(last_part),
+                    value,
+                )
             else:
-                try:
-                    if isinstance(sub_property, abc.Mapping):
-                        sub_property[last_part] = merger.merge(
-                            sub_property.get(last_part),
-                            value,
-                        )
-                    else:
-                        sub_property[last_part] = value
-                except TypeError as type_error:
-                    raise ConfigurationOverrideError(
-                        f"Invalid assignment {key} -> {value}, {str(type_error)}"
-                    )
-
-            return obj
-
-    obj[key] = merger.merge(obj.get(key), value)
+                sub_property[last_part] = value
+        except TypeError as type_error:
+            raise ConfigurationOverrideError(
+                f"Invalid assignment {key} -> {value}, {str(type_error)}"
+            )
+
+
+def _get_parts(key: Key) -> Tuple[str, List[str]]:
+    # returns the key to be used in error messages, and its parts
+    if isinstance(key, tuple):
+        return ":".join(key), list(key)
+    key = key.strip("_:.")  # remove special characters from both ends
+    return key, split_key(key)
+
+
+def apply_key_value(
+    obj: Mapping[str, Any], key: Key, value: Any, merger: Merger = merger
+) -> Mapping[str, Any]:
+    name, parts = _get_parts(key)
+    if len(parts) == 1:
+        obj[parts[0]] = merger.value_strategy(parts, obj.get(parts[0]), value)
+        return obj
+
+    sub_property = obj
+    for part in parts[:-1]:
+        sub_property = _descend(sub_property, part, name)
+
+    _set_value(sub_property, parts[-1], value, parts, name, merger)
     return obj
 
 
-def merge_values(destination: Mapping[str, Any], source: Mapping[str, Any]) -> None:
-    for key, value in source.items():
-        apply_key_value(destination, key, value)
+KeyValuePairs = Iterable[Tuple[Key, Any]]
+
+
+def _get_container(
+    obj: Mapping[str, Any],
+    containers: Dict[Tuple[str, ...], Any],
+    path: Tuple[str, ...],
+    key: str,
+    owned: Optional[Dict[int, Any]],
+) -> Any:
+    """
+    Returns the object at the given path, walking from its closest ancestor already
+    walked by previous keys, and caching the objects at the path and at its
+    ancestors. If owned containers are given, other containers along the path are
+    replaced with shallow copies.
+    """
+    try:
+        return containers[path]
+    except KeyError:
+        pass
+    parent = (
+        obj
+        if len(path) == 1
+        else _get_container(obj, containers, path[:-1], key, owned)
+    )
+    container = _descend(parent, path[-1], key)
+
+    if (
+        owned is not None
+        and id(container) not in owned
+        and isinstance(container, (dict, list))
+    ):
+        container = dict(container) if isinstance(container, dict) else list(container)
+        if isinstance(parent, abc.MutableSequence):
+            parent[int(path[-1])] = container
+        else:
+            parent[path[-1]] = container  # type: ignore
+        owned[id(container)] = container
+
+    containers[path] = container
+    return container
+
+
+def merge_values(
+    destination: Mapping[str, Any],
+    source: Union[Mapping[str, Any], KeyValuePairs],
+    merger: Merger = merger,
+    owned: Optional[Dict[int, Any]] = None,
+) -> None:
+    """
+    Merges the given values into the destination. Values can be a mapping, or an
+    iterable of key-value pairs, which is consumed as it is iterated.
+
+    If owned containers are given, by id, containers of the destination that are
+    not owned, like the values of configuration sources, are not modified: they
+    are replaced with copies, which are added to the owned containers. The merger
+    must then merge dictionaries into new dictionaries.
+
+    The objects at the paths of keys are cached while values are merged, so that
+    the path shared by many keys, like `app__tenants__0__limits__rps` and
+    `app__tenants__0__limits__burst`, is walked once.
+    """
+    items = source.items() if isinstance(source, abc.Mapping) else source
+    containers: Dict[Tuple[str, ...], Any] = {}
+
+    for item_key, value in items:
+        key, parts = _get_parts(item_key)
+        if len(parts) == 1:
+            sub_property: Any = destination
+        else:
+            sub_property = _get_container(
+                destination, containers, tuple(parts[:-1]), key, owned
+            )
+
+        # a value set to a walked object replaces it, or merges into it:
+        # objects cached for the path and for its descendants are discarded
+        if containers and tuple(parts) in containers:
+            containers.clear()
+
+        if type(sub_property) is dict:
+            # fast path for the most common case, like in _set_value
+            last_part = parts[-1]
+            try:
+                sub_property[last_part] = merger.value_strategy(
+                    parts, sub_property.get(last_part), value
+                )
+            except TypeError as type_error:
+                raise ConfigurationOverrideError(
+                    f"Invalid assignment {key} -> {value}, {str(type_error)}"
+                )
+        else:
+            _set_value(sub_property, parts[-1], value, parts, key, merger)
+
+
+class ImmutableMapping(abc.Mapping):
+    """
+    Base class for read-only mappings of configuration values. Configuration
+    objects use immutable mappings directly, without copying them.
+    """
+
+    __slots__ = ()
+
+    def copy(self) -> Dict[str, Any]:
+        """Returns a dictionary with the same items of this mapping."""
+        return dict(self.items())
+
+
+def is_sequence(value: Any) -> bool:
+    """
+    Returns a value indicating whether the given value is a sequence of
+    configuration values (strings and bytes are not).
+    """
+    return isinstance(value, (abc.MutableSequence, tuple))
+
+
+class DeferredValue(ABC):
+    """
+    Base class for configuration values that are obtained only when they are
+    read for the first time, through a Configuration object.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def get_value(self) -> Any:
+        """Returns the actual value."""
+
+
+def resolve_deferred_values(value: Any) -> Any:
+    """
+    Returns a copy of the given value, in which deferred values are replaced with
+    their actual values.
+    """
+    if isinstance(value, DeferredValue):
+        return value.get_value()
+    if isinstance(value, abc.Mapping):
+        return {key: resolve_deferred_values(item) for key, item in value.items()}
+    if is_sequence(value):
+        return [resolve_deferred_values(item) for item in value]
+    return value
 
 
 class ConfigurationSource(ABC):
@@ -100,6 +308,23 @@ class ConfigurationSource(ABC):
     def get_values(self) -> Dict[str, Any]:
         """Returns the values read from this source."""
 
+    def iter_values(self) -> KeyValuePairs:
+        """
+        Returns the values read from this source as an iterable of key-value pairs.
+        Sources that can read values incrementally override this method to yield
+        values as they are read, so that they can be merged with bounded memory.
+        The same key can be yielded more than once, values are merged in order.
+        """
+        return self.get_values().items()
+
+    def get_sections(self) -> Optional[Set[str]]:
+        """
+        Returns the top-level keys of the values of this source, if they can be
+        obtained cheaply, without reading all values; otherwise None. This is used to
+        skip sources entirely, when building only some sections of configuration.
+        """
+        return None
+
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}>"
 
@@ -125,22 +350,28 @@ class Configuration:
     example of JSON structure explorer.
     """
 
-    __slots__ = ("_data",)
+    __slots__ = ("_data", "_fingerprint")
 
     def __new__(cls, arg=None):
-        if not arg:
+        if arg is None or isinstance(arg, abc.Mapping):
             return super().__new__(cls)
-        if isinstance(arg, abc.Mapping):
-            return super().__new__(cls)
-        if isinstance(arg, abc.MutableSequence):
-            return [cls(item) for item in arg]
+        if is_sequence(arg):
+            return ConfigurationSequence(arg, cls)
+        if isinstance(arg, DeferredValue):
+            return arg.get_value()
         return arg
 
     def __init__(self, mapping: Optional[Mapping[str, Any]] = None):
         """
         Creates a new instance of Configuration object with the given values.
         """
-        self._data: Dict[str, Any] = dict(mapping.items()) if mapping else {}
+        if isinstance(mapping, ImmutableMapping):
+            self._data: Dict[str, Any] = mapping  # type: ignore
+        else:
+            self._data = dict(mapping.items()) if mapping else {}
+        # the computed fingerprint, or a Fingerprinter holding the hashes of
+        # subtrees shared with other configurations
+        self._fingerprint: Any = None
 
     def __contains__(self, item: str) -> bool:
         return item in self._data
@@ -154,8 +385,10 @@ class Configuration:
     def __getattr__(self, name) -> Any:
         if name in self._data:
             value = self._data.get(name)
-            if isinstance(value, abc.Mapping) or isinstance(value, abc.MutableSequence):
+            if isinstance(value, abc.Mapping) or is_sequence(value):
                 return Configuration(value)  # type: ignore
+            if isinstance(value, DeferredValue):
+                return value.get_value()
             return value
         raise AttributeError(
             f"'{self.__class__.__name__}' object has no attribute '{name}'"
@@ -166,12 +399,53 @@ class Configuration:
         return f"<Configuration {repr(hidden_values)}>"
 
     @property
-    def values(self) -> Dict[str, Any]:
+    def values(self) -> Mapping[str, Any]:
         """
-        Returns a copy of the dictionary of current settings.
+        Returns a copy of the dictionary of current settings, or for frozen
+        configurations the read-only FrozenMapping of settings itself, which is not
+        copied since it cannot be modified.
         """
         return self._data.copy()
 
+    def fingerprint(self) -> str:
+        """
+        Returns a stable content hash of the values of this configuration, computed
+        once. Configurations with the same values have the same fingerprint, so it
+        can be used as cache key, and to compare configurations cheaply.
+        """
+        fingerprint = self._fingerprint
+        if not isinstance(fingerprint, str):
+            from config.common.fingerprint import Fingerprinter
+
+            fingerprint = Fingerprinter(fingerprint).fingerprint(self._data)
+            self._fingerprint = fingerprint
+        return fingerprint
+
+    def export(self, resolve_deferred: bool = False) -> "ConfigurationExport":
+        """
+        Returns a compiled snapshot of the values of this configuration, to be
+        passed to child processes and read there with an ExportedSource. Deferred
+        values, like references to secrets, are resolved and included only if
+        resolve_deferred is True, otherwise they cause an error.
+        """
+        from config.common.export import ConfigurationExport, to_plain_values
+
+        return ConfigurationExport.from_values(
+            to_plain_values(self._data, resolve_deferred)
+        )
+
+    def accessor(self, path: str, default: Any = _MISSING) -> "Accessor":
+        """
+        Returns a callable that reads the value at the given path, like
+        `limits.per_tenant.rps`, tokenizing the path once and without creating
+        intermediate Configuration objects. It is meant for settings read very
+        often; if the path does not exist, the default is returned if specified,
+        otherwise a KeyError is raised.
+        """
+        from config.common.accessors import Accessor
+
+        return Accessor(self, path, default)
+
     def bind(self, cls: Type[T], *path: str) -> T:
         """
         Returns an instance of the given type, using the current values as input.
@@ -180,17 +454,132 @@ class Configuration:
         values = self.values
         for fragment in path:
             values = values[fragment]
-        return cls(**values)
+        return cls(**resolve_deferred_values(values))
+
+
+class ConfigurationSequence(abc.Sequence):
+    """
+    A read-only view over a sequence of configuration values, that wraps items
+    in Configuration objects only when they are accessed. Wrapped items are cached,
+    and slicing returns a new view without wrapping items.
+    """
+
+    __slots__ = ("_items", "_cls", "_cache")
+
+    def __init__(self, items: abc.Sequence, cls: Type[Configuration] = Configuration):
+        self._items = items
+        self._cls = cls
+        self._cache: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ConfigurationSequence(self._items[index], self._cls)
+
+        try:
+            return self._cache[index]
+        except KeyError:
+            pass
+
+        value = self._items[index]
+        if isinstance(value, abc.Mapping) or is_sequence(value):
+            wrapped = self._cls(value)
+            if index < 0:
+                index += len(self._items)
+            self._cache[index] = wrapped
+            return wrapped
+        if isinstance(value, DeferredValue):
+            return value.get_value()
+        return value
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ConfigurationSequence):
+            other = other._items
+        if not is_sequence(other):
+            return NotImplemented
+        items = self._items
+        if len(items) != len(other):  # type: ignore
+            return False
+        return all(a == b for a, b in zip(self, other))  # type: ignore
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return repr(list(self))
 
 
 class ConfigurationBuilder:
-    def __init__(self, *sources: ConfigurationSource) -> None:
+    def __init__(
+        self,
+        *sources: ConfigurationSource,
+        interpolate: bool = False,
+        secrets: Optional["Secrets"] = None,
+        compact: bool = False,
+        merge_strategies: Union[
+            MergeStrategies, Mapping[str, MergeStrategy], None
+        ] = None,
+        schema: Union["Schema", Mapping[str, Any], None] = None,
+        access_statistics: Optional["AccessStatistics"] = None,
+        frozen: bool = False,
+    ) -> None:
         """
         Creates a new instance of ConfigurationBuilder, that can obtain a Configuration
         object from different sources. Sources are applied in the given order and can
         override each other's settings.
+
+        If interpolate is True, references like `${other.key}` and `${env:NAME}`
+        inside values are resolved after all sources are merged.
+
+        If secrets are configured, values like `secret://name` are replaced with
+        references to secrets, resolved through the configured resolver.
+
+        If compact is True, built configurations are backed by a compact, read-only
+        representation of values, using less memory for very large trees.
+
+        Merge strategies describe how lists are merged, by path: "append" (default),
+        "replace", "dedupe", or UnionByKey(key), for example:
+        {"servers": "replace", "tenants": UnionByKey("id"), "*.tags": "dedupe"}.
+
+        A schema describes the types of values by path, like {"server.port": int},
+        to convert values read as strings, like environment variables, when
+        configuration is built.
+
+        If access statistics are configured, built configurations count reads of
+        their values by path, to find hot settings and settings that are never read.
+
+        If frozen is True, built configurations are backed by deeply immutable
+        values, using read-only mappings and tuples instead of dictionaries and
+        lists, that can be shared across threads and caches without copies, and
+        hashed. Frozen and compact representations cannot be combined.
         """
+        if compact and frozen:
+            raise ValueError("compact and frozen cannot be combined")
         self._sources: List[ConfigurationSource] = list(sources) if sources else []
+        self.interpolate = interpolate
+        self.secrets = secrets
+        self.compact = compact
+        if merge_strategies is not None and not isinstance(
+            merge_strategies, MergeStrategies
+        ):
+            merge_strategies = MergeStrategies(merge_strategies)
+        self.merge_strategies: Optional[MergeStrategies] = merge_strategies
+        # values are merged into new containers, since the values of sources, like
+        # the ones of MapSource, are read again on every build
+        self._merger = create_merger(merge_strategies, copy=True)
+        if schema is not None:
+            from config.common.schema import Schema
+
+            if not isinstance(schema, Schema):
+                schema = Schema(schema)
+        self.schema: Optional["Schema"] = schema
+        self.access_statistics = access_statistics
+        self.frozen = frozen
 
     def __repr__(self) -> str:
         return f"<ConfigurationBuilder {self._sources}>"
@@ -199,6 +588,18 @@ class ConfigurationBuilder:
     def sources(self) -> List[ConfigurationSource]:
         return self._sources
 
+    @property
+    def degradations(self) -> List[Any]:
+        """
+        Returns the degradations of the sources that could not be read the last time
+        values were read, and whose previous values were used instead.
+        """
+        return [
+            source.degradation  # type: ignore
+            for source in self._sources
+            if getattr(source, "degradation", None) is not None
+        ]
+
     def add_source(self, source: ConfigurationSource):
         self._sources.append(source)
 
@@ -208,8 +609,98 @@ class ConfigurationBuilder:
     def add_value(self, key: str, value: Any):
         self.sources.append(MapSource({key: value}))
 
-    def build(self) -> Configuration:
-        settings = {}
+    def merge_sources(self, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Reads values from all sources, and returns the merged values. If sections
+        are specified, only the values of the given top-level keys are kept, and
+        sources reporting that they do not contain any of them are skipped.
+        """
+        settings: Dict[str, Any] = {}
+        # containers of the values of sources are copied before being modified
+        owned: Dict[int, Any] = {id(settings): settings}
+
+        if sections is None:
+            for source in self._sources:
+                merge_values(settings, source.iter_values(), self._merger, owned)
+            return settings
+
+        sections = set(sections)
         for source in self._sources:
-            merge_values(settings, source.get_values())
-        return Configuration(settings)
+            source_sections = source.get_sections()
+            if source_sections is not None and sections.isdisjoint(source_sections):
+                continue
+            merge_values(
+                settings,
+                (
+                    (key, value)
+                    for key, value in source.iter_values()
+                    if split_key(key)[0] in sections
+                ),
+                self._merger,
+                owned,
+            )
+        return settings
+
+    def build(self, sections: Optional[Iterable[str]] = None) -> Configuration:
+        """
+        Builds a Configuration with the values of all sources. If sections are
+        specified, only the values of the given top-level keys are read and merged,
+        which is useful for processes that need only part of the configuration.
+        """
+        return self._create_configuration(self.merge_sources(sections))
+
+    def export(self, sections: Optional[Iterable[str]] = None) -> "ConfigurationExport":
+        """
+        Reads and merges values from all sources, and returns a compiled snapshot of
+        the merged values, to be passed to child processes and read there with an
+        ExportedSource. Like compiled snapshots, exported values do not include
+        interpolation, type coercion, and secrets, which are applied by the child
+        processes building configuration.
+        """
+        from config.common.export import ConfigurationExport
+
+        return ConfigurationExport.from_values(self.merge_sources(sections))
+
+    def freeze(self) -> "ConfigurationBase":
+        """
+        Reads and merges values from all sources once, and returns a frozen base
+        from which many configurations can be derived, applying only small overlays.
+        """
+        from config.common.variants import ConfigurationBase
+
+        return ConfigurationBase(self)
+
+    def _create_configuration(
+        self,
+        settings: Dict[str, Any],
+        compact: Optional[bool] = None,
+        frozen: Optional[bool] = None,
+    ) -> Configuration:
+        if self.interpolate:
+            interpolate(settings)
+        if self.secrets is not None:
+            self.secrets.bind(settings)
+        if self.schema is not None:
+            self.schema.apply(settings)
+        return self._wrap_values(settings, compact, frozen)
+
+    def _wrap_values(
+        self,
+        settings: Dict[str, Any],
+        compact: Optional[bool] = None,
+        frozen: Optional[bool] = None,
+    ) -> Configuration:
+        if self.compact if compact is None else compact:
+            from config.common.compact import compact as compact_values
+
+            configuration = Configuration(compact_values(settings))
+        elif self.frozen if frozen is None else frozen:
+            from config.common.frozen import freeze_values
+
+            # values are copied once, and no longer aliased with sources
+            configuration = Configuration(freeze_values(settings))
+        else:
+            configuration = Configuration(settings)
+        if self.access_statistics is not None:
+            return self.access_statistics.track(configuration)
+        return configuration
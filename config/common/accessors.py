@@ -0,0 +1,92 @@
+"""
+This module provides precompiled accessors to configuration values, to read the
+same settings many times, like in request handlers, with minimal overhead.
+"""
+from collections import abc
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Tuple
+
+from config.common import _MISSING, Configuration, DeferredValue, is_sequence, split_key
+
+if TYPE_CHECKING:  # pragma: no cover
+    from config.common.provider import ConfigurationProvider
+
+
+def compile_path(path: str) -> Tuple[Tuple[str, Optional[int]], ...]:
+    """
+    Returns the parts of the given path, like `limits.per_tenant.rps`, as tuples
+    of keys and list indexes, for parts that can be used as list indexes.
+    """
+    return tuple(
+        (part, int(part) if part.lstrip("-").isdigit() else None)
+        for part in split_key(path)
+    )
+
+
+class Accessor:
+    """
+    Reads the value at a given path of a configuration. The path is tokenized once,
+    and values are read directly from the underlying data, without creating
+    intermediate Configuration objects. Mappings and lists are returned wrapped
+    like by Configuration attributes, and deferred values are resolved.
+    """
+
+    __slots__ = ("path", "default", "_parts", "_configuration")
+
+    def __init__(
+        self,
+        configuration: Optional[Configuration],
+        path: str,
+        default: Any = _MISSING,
+    ) -> None:
+        self.path = path
+        self.default = default
+        self._parts = compile_path(path)
+        self._configuration = configuration
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.path!r}>"
+
+    def _get_data(self) -> Mapping[str, Any]:
+        return self._configuration._data  # type: ignore
+
+    def __call__(self) -> Any:
+        value: Any = self._get_data()
+        try:
+            for key, index in self._parts:
+                if isinstance(value, abc.Mapping):
+                    value = value[key]
+                elif index is not None and is_sequence(value):
+                    value = value[index]
+                else:
+                    raise KeyError(key)
+        except (KeyError, IndexError):
+            if self.default is _MISSING:
+                raise KeyError(self.path)
+            return self.default
+
+        if isinstance(value, DeferredValue):
+            return value.get_value()
+        if isinstance(value, abc.Mapping) or is_sequence(value):
+            return Configuration(value)
+        return value
+
+
+class ProviderAccessor(Accessor):
+    """
+    Reads the value at a given path of the current configuration snapshot of a
+    provider, therefore always returning the latest value after reloads.
+    """
+
+    __slots__ = ("_provider",)
+
+    def __init__(
+        self,
+        provider: "ConfigurationProvider",
+        path: str,
+        default: Any = _MISSING,
+    ) -> None:
+        super().__init__(None, path, default)
+        self._provider = provider
+
+    def _get_data(self) -> Mapping[str, Any]:
+        return self._provider._current._data
@@ -0,0 +1,196 @@
+"""
+This module provides a compact, read-only representation of configuration values,
+to reduce the memory used by very large configuration trees:
+
+- keys are interned, and the tuples of keys of small mappings are shared by all
+  mappings having the same keys;
+- small mappings are stored as tuples of values, in objects with __slots__;
+- lists of numbers of the same type are stored as arrays;
+- other lists are stored as tuples;
+- short strings are deduplicated;
+- identical subtrees are stored only once, since they are immutable.
+"""
+import sys
+from array import array
+from collections import abc
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from config.common import Configuration, ImmutableMapping
+
+SMALL_MAPPING_SIZE = 16
+SHORT_STRING_LENGTH = 64
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+class CompactMapping(ImmutableMapping):
+    """
+    A small read-only mapping, storing a shared tuple of keys and a tuple of values.
+    """
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: Tuple[str, ...], values: Tuple[Any, ...]) -> None:
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"<CompactMapping {self.copy()!r}>"
+
+
+class CompactDict(ImmutableMapping):
+    """
+    A read-only mapping for large sets of keys, backed by a dictionary.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"<CompactDict {self._data!r}>"
+
+    def copy(self) -> Dict[str, Any]:
+        return self._data.copy()
+
+
+def _get_array_typecode(values: abc.Sequence) -> Optional[str]:
+    if not values:
+        return None
+    value_type = type(values[0])
+
+    if value_type is float:
+        if all(type(value) is float for value in values):
+            return "d"
+        return None
+
+    if value_type is int:
+        if all(
+            type(value) is int and _INT64_MIN <= value <= _INT64_MAX for value in values
+        ):
+            return "q"
+    return None
+
+
+class Compactor:
+    """
+    Converts trees of configuration values to their compact representation.
+    Instances keep the tables of interned keys and strings, which can be reused
+    across several trees.
+    """
+
+    def __init__(
+        self,
+        small_mapping_size: int = SMALL_MAPPING_SIZE,
+        short_string_length: int = SHORT_STRING_LENGTH,
+    ) -> None:
+        self.small_mapping_size = small_mapping_size
+        self.short_string_length = short_string_length
+        self._keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._strings: Dict[str, str] = {}
+        self._nodes: Dict[Tuple[Any, ...], Any] = {}
+
+    def _share(self, key: Tuple[Any, ...], node: Any) -> Any:
+        return self._nodes.setdefault(key, node)
+
+    def _get_identity(self, value: Any) -> Tuple[Any, ...]:
+        # values of different types comparing equal, like 1 and True, must not be
+        # shared; compacted containers are already shared, so their id is used
+        if isinstance(value, (ImmutableMapping, tuple, array)):
+            return (type(value), id(value))
+        if type(value) is float:
+            # distinguishes 0.0 and -0.0
+            return (float, value.hex())
+        try:
+            hash(value)
+        except TypeError:
+            return (type(value), id(value))
+        return (type(value), value)
+
+    def compact(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) <= self.short_string_length:
+                return self._strings.setdefault(value, value)
+            return value
+
+        if isinstance(value, abc.Mapping):
+            return self.compact_mapping(value)
+
+        if isinstance(value, (abc.MutableSequence, tuple)) and not isinstance(
+            value, array
+        ):
+            typecode = _get_array_typecode(value)
+            if typecode is not None:
+                items = array(typecode, value)
+                return self._share((array, typecode, items.tobytes()), items)
+
+            compacted = tuple(self.compact(item) for item in value)
+            return self._share(
+                (tuple,) + tuple(self._get_identity(item) for item in compacted),
+                compacted,
+            )
+
+        return value
+
+    def compact_mapping(self, value: Mapping[str, Any]) -> ImmutableMapping:
+        if len(value) > self.small_mapping_size:
+            return CompactDict(
+                {
+                    sys.intern(key) if isinstance(key, str) else key: self.compact(item)
+                    for key, item in value.items()
+                }
+            )
+
+        keys = tuple(
+            sys.intern(key) if isinstance(key, str) else key for key in value.keys()
+        )
+        keys = self._keys.setdefault(keys, keys)
+        values = tuple(self.compact(item) for item in value.values())
+        return self._share(
+            (CompactMapping, id(keys)) + tuple(self._get_identity(v) for v in values),
+            CompactMapping(keys, values),
+        )
+
+
+def compact(values: Mapping[str, Any]) -> ImmutableMapping:
+    """
+    Returns a compact, read-only representation of the given configuration values.
+    """
+    return Compactor().compact_mapping(values)
+
+
+def compact_configuration(configuration: Configuration) -> Configuration:
+    """
+    Returns a Configuration object backed by a compact representation of the values
+    of the given configuration.
+    """
+    return Configuration(compact(configuration.values))
@@ -0,0 +1,152 @@
+"""
+This module provides support for passing configuration built by a process to
+child processes, like workers and tools, so that they do not need to read and
+parse all configuration sources again.
+
+Values are serialized as compiled snapshots, and passed through an environment
+variable, or through an inherited file descriptor, which is preferable for large
+configurations and for values that should not be visible in the environment of
+processes.
+"""
+import base64
+import os
+import tempfile
+from collections import abc
+from typing import Any, Dict, Optional, Tuple
+
+from config.common import ConfigurationSource, DeferredValue, is_sequence
+from config.common.snapshot import SnapshotError, dump_snapshot, load_snapshot
+from config.errors import ConfigurationError
+
+ENV_VARIABLE = "EC_CONFIGURATION"
+FD_SUFFIX = "_FD"
+
+
+def to_plain_values(value: Any, resolve_deferred: bool = False) -> Any:
+    """
+    Returns a copy of the given configuration values using only dictionaries and
+    lists, for example for values backed by compact, read-only representations.
+    Deferred values, like references to secrets, are resolved only if
+    resolve_deferred is True, otherwise a SnapshotError is raised.
+    """
+    if isinstance(value, abc.Mapping):
+        return {
+            key: to_plain_values(item, resolve_deferred) for key, item in value.items()
+        }
+    if is_sequence(value):
+        return [to_plain_values(item, resolve_deferred) for item in value]
+    if isinstance(value, DeferredValue):
+        if not resolve_deferred:
+            raise SnapshotError(
+                f"Cannot export the deferred value {value!r}: export the builder "
+                "instead, or resolve deferred values explicitly."
+            )
+        return to_plain_values(value.get_value(), resolve_deferred)
+    return value
+
+
+class ConfigurationExport:
+    """
+    A compiled snapshot of configuration values, to be passed to child processes,
+    and read with an ExportedSource.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"<ConfigurationExport size={len(self.data)}>"
+
+    @classmethod
+    def from_values(cls, values: Dict[str, Any]) -> "ConfigurationExport":
+        return cls(dump_snapshot(values))
+
+    def to_environment(self, name: str = ENV_VARIABLE) -> Dict[str, str]:
+        """
+        Returns the environment variables to be set for child processes, holding
+        the whole snapshot encoded as base64.
+        """
+        return {name: base64.b64encode(self.data).decode("ascii")}
+
+    def to_file_descriptor(
+        self, name: str = ENV_VARIABLE
+    ) -> Tuple[int, Dict[str, str]]:
+        """
+        Writes the snapshot to an anonymous in-memory file (memfd) where supported,
+        otherwise to an unlinked temporary file, and returns its inheritable file
+        descriptor, and the environment variables to be set for child processes.
+        The file descriptor must be passed to child processes (for example with
+        the pass_fds argument of subprocess.Popen), and closed by the caller.
+        """
+        memfd_create = getattr(os, "memfd_create", None)
+        if memfd_create is not None:
+            fd = memfd_create("ec-configuration", 0)
+        else:  # pragma: no cover
+            fd, path = tempfile.mkstemp()
+            os.unlink(path)
+
+        try:
+            view = memoryview(self.data)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.set_inheritable(fd, True)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd, {name + FD_SUFFIX: str(fd)}
+
+
+def _read_file_descriptor(fd: int) -> bytes:
+    # pread does not change the offset of the file, which is shared with the
+    # parent process and other children
+    pread = getattr(os, "pread", None)
+    chunks = []
+    offset = 0
+    while True:
+        if pread is not None:
+            chunk = pread(fd, 1 << 20, offset)
+        else:  # pragma: no cover
+            os.lseek(fd, offset, os.SEEK_SET)
+            chunk = os.read(fd, 1 << 20)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+        offset += len(chunk)
+
+
+class ExportedSource(ConfigurationSource):
+    """
+    Reads configuration values exported by a parent process, from an environment
+    variable or from an inherited file descriptor.
+    """
+
+    def __init__(self, name: str = ENV_VARIABLE, optional: bool = False) -> None:
+        super().__init__()
+        self.name = name
+        self.optional = optional
+
+    def read_data(self) -> Optional[bytes]:
+        """
+        Returns the exported snapshot, or None if it was not exported.
+        """
+        encoded = os.environ.get(self.name)
+        if encoded is not None:
+            return base64.b64decode(encoded)
+
+        fd = os.environ.get(self.name + FD_SUFFIX)
+        if fd is not None:
+            return _read_file_descriptor(int(fd))
+        return None
+
+    def get_values(self) -> Dict[str, Any]:
+        data = self.read_data()
+        if data is None:
+            if self.optional:
+                return {}
+            raise ConfigurationError(
+                f"Exported configuration not found: neither {self.name} nor "
+                f"{self.name + FD_SUFFIX} environment variables are set."
+            )
+        return load_snapshot(data)
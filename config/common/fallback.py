@@ -0,0 +1,208 @@
+"""
+This module provides a wrapper for configuration sources that can be slow or
+unavailable, like remote services, limiting the time spent reading them and
+falling back to their last values read successfully.
+"""
+import copy
+import logging
+import time
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Dict, Optional, Set, Tuple, Type
+
+from config.common import ConfigurationSource
+from config.common.files import PathType
+from config.errors import ConfigurationError
+
+logger = logging.getLogger("config.fallback")
+
+# errors of sources that are likely to be temporary, like network errors
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    OSError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+class SourceTimeoutError(ConfigurationError):
+    """
+    An exception risen when a configuration source does not return values within
+    the time allowed.
+    """
+
+    def __init__(self, source: ConfigurationSource, timeout: float) -> None:
+        super().__init__(f"The source {source!r} did not return values in {timeout}s.")
+        self.source = source
+        self.timeout = timeout
+
+
+class Degradation:
+    """
+    Describes a source whose last values could not be read, and whose previous
+    values are used instead.
+    """
+
+    __slots__ = ("source", "error", "fallback", "since")
+
+    def __init__(
+        self,
+        source: ConfigurationSource,
+        error: BaseException,
+        fallback: str,
+        since: float,
+    ) -> None:
+        self.source = source
+        self.error = error
+        self.fallback = fallback
+        self.since = since
+
+    def __repr__(self) -> str:
+        return (
+            f"<Degradation {self.source!r} fallback={self.fallback} "
+            f"error={self.error!r}>"
+        )
+
+
+class FallbackSource(ConfigurationSource):
+    """
+    Wraps a configuration source, limiting the time spent reading its values, and
+    falling back to the last values read successfully when the source exceeds the
+    time allowed or raises one of the given errors. Last values can be persisted
+    to a file, so that they are available also when the application restarts
+    while the source is unavailable.
+
+    Values are read in a daemon thread: a source that hangs does not block the
+    application, nor its exit. While a previous read is still running, new reads
+    fall back immediately instead of starting more threads.
+    """
+
+    def __init__(
+        self,
+        source: ConfigurationSource,
+        timeout: Optional[float] = None,
+        fallback_path: Optional[PathType] = None,
+        errors: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+    ) -> None:
+        """
+        Creates a new instance of FallbackSource for the given source. If a timeout
+        is specified, reads taking longer than the given number of seconds fall back
+        to the last values, like reads raising one of the given errors: by default,
+        transient errors like OSError and TimeoutError, while other errors, like
+        invalid values, are propagated. If a fallback path is specified, last values
+        are persisted to the given file, as compiled snapshot readable only by its
+        owner, since values of remote sources can include secrets.
+        """
+        super().__init__()
+        self.source = source
+        self.timeout = timeout
+        self.fallback_path = Path(fallback_path) if fallback_path else None
+        self.errors = errors
+        self._fallback_errors = (SourceTimeoutError,) + tuple(errors)
+        self.degradation: Optional[Degradation] = None
+        self._last_values: Optional[Dict[str, Any]] = None
+        self._pending: Optional[Thread] = None
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<FallbackSource {self.source!r}>"
+
+    def get_sections(self) -> Optional[Set[str]]:
+        return self.source.get_sections()
+
+    def _read(self) -> Dict[str, Any]:
+        if self.timeout is None:
+            return self.source.get_values()
+
+        with self._lock:
+            if self._pending is not None and self._pending.is_alive():
+                raise SourceTimeoutError(self.source, self.timeout)
+
+            result: Dict[str, Any] = {}
+
+            def read():
+                try:
+                    result["values"] = self.source.get_values()
+                except BaseException as error:
+                    result["error"] = error
+
+            thread = Thread(target=read, name=f"read {self.source!r}", daemon=True)
+            self._pending = thread
+            thread.start()
+
+        thread.join(self.timeout)
+        if thread.is_alive():
+            raise SourceTimeoutError(self.source, self.timeout)
+        if "error" in result:
+            raise result["error"]
+        return result["values"]
+
+    def _persist(self, values: Dict[str, Any]) -> None:
+        from config.common.snapshot import write_snapshot
+
+        try:
+            write_snapshot(self.fallback_path, values, mode=0o600)  # type: ignore
+        except (OSError, ConfigurationError):
+            logger.warning(
+                "Cannot persist the last values of %r to %s.",
+                self.source,
+                self.fallback_path,
+                exc_info=True,
+            )
+
+    def _load_persisted(self) -> Optional[Dict[str, Any]]:
+        from config.common.snapshot import load_snapshot
+
+        if self.fallback_path is None:
+            return None
+        try:
+            return load_snapshot(self.fallback_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ConfigurationError):
+            logger.warning(
+                "Cannot read the last values of %r from %s.",
+                self.source,
+                self.fallback_path,
+                exc_info=True,
+            )
+            return None
+
+    def get_values(self) -> Dict[str, Any]:
+        try:
+            values = self._read()
+        except self._fallback_errors as error:
+            return self._fall_back(error)
+
+        if self.degradation is not None:
+            logger.info("The source %r recovered.", self.source)
+            self.degradation = None
+
+        # values are copied, since they can be modified when merged
+        if values != self._last_values:
+            self._last_values = copy.deepcopy(values)
+            if self.fallback_path is not None:
+                self._persist(self._last_values)
+        return values
+
+    def _fall_back(self, error: BaseException) -> Dict[str, Any]:
+        if self._last_values is not None:
+            fallback = "memory"
+            values = self._last_values
+        else:
+            persisted = self._load_persisted()
+            if persisted is None:
+                raise error
+            fallback = "file"
+            values = self._last_values = persisted
+
+        if self.degradation is None:
+            self.degradation = Degradation(self.source, error, fallback, time.time())
+        else:
+            self.degradation.error = error
+        logger.warning(
+            "Using the last values of %r (%s), since reading it failed: %r",
+            self.source,
+            fallback,
+            error,
+        )
+        return copy.deepcopy(values)
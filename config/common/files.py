@@ -1,18 +1,95 @@
+import os
+import stat
+import tempfile
 from abc import abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Optional, Set, Tuple, Union
 
-from config.common import ConfigurationSource
+from config.common import ConfigurationSource, KeyValuePairs, split_key
 from config.errors import MissingConfigurationFileError
 
 PathType = Union[Path, str]
 
+# the modification time in nanoseconds and the size of a file, or None if the file
+# does not exist
+FileState = Optional[Tuple[int, int]]
+
+
+def get_file_state(path: PathType) -> FileState:
+    """
+    Returns the modification time and the size of the file at the given path, read
+    with a single stat, or None if the file does not exist.
+    """
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _read_umask() -> Optional[int]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# the umask can be read only setting it, which affects all threads: where it cannot
+# be read from /proc, it is read once, when this module is imported
+_IMPORT_UMASK = os.umask(0o022)
+os.umask(_IMPORT_UMASK)
+
+
+def get_new_file_mode() -> int:
+    """
+    Returns the permissions of new files according to the umask, like files
+    created with open. Files created with tempfile.mkstemp are readable only by
+    their owner, and get these permissions before they replace files.
+    """
+    umask = _read_umask()
+    return 0o666 & ~(_IMPORT_UMASK if umask is None else umask)
+
+
+def write_atomic(file_path: PathType, data: bytes, mode: Optional[int] = None) -> None:
+    """
+    Writes the given data to a temporary file in the same folder of the given path,
+    which then replaces the file, so readers never see a partially written file.
+    The data is flushed to disk before the file is replaced. If a mode is not
+    given, the permissions of the existing file are kept, and new files get the
+    permissions of files created with open.
+    """
+    file_path = Path(file_path)
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            mode = get_new_file_mode()
+
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
 
 class FileConfigurationSource(ConfigurationSource):
     def __init__(self, file_path: PathType, optional: bool = False) -> None:
         super().__init__()
         self.file_path = Path(file_path)
         self.optional = optional
+        self._manifest: Optional[Tuple[Tuple[int, int], Set[str]]] = None
 
     @abstractmethod
     def read_source(self) -> Dict[str, Any]:
@@ -27,3 +104,41 @@ class FileConfigurationSource(ConfigurationSource):
                 return {}
             raise MissingConfigurationFileError(self.file_path)
         return self.read_source()
+
+    def iter_source(self) -> KeyValuePairs:
+        """
+        Reads values from the source file path, as key-value pairs. This method is
+        not used if the file does not exist.
+        """
+        return self.read_source().items()
+
+    def _iter_source_recording_sections(self, state: FileState) -> KeyValuePairs:
+        sections = set()
+        for key, value in self.iter_source():
+            sections.add(split_key(key)[0])
+            yield key, value
+
+        if state is not None:
+            self._manifest = (state, sections)
+
+    def iter_values(self) -> KeyValuePairs:
+        if not self.file_path.exists():
+            if self.optional:
+                return ()
+            raise MissingConfigurationFileError(self.file_path)
+        return self._iter_source_recording_sections(get_file_state(self.file_path))
+
+    def get_sections(self) -> Optional[Set[str]]:
+        """
+        Returns the top-level keys of this file, if the file did not change since it
+        was last read entirely.
+        """
+        manifest = self._manifest
+        if manifest is None:
+            if self.optional and not self.file_path.exists():
+                return set()
+            return None
+        state, sections = manifest
+        if state != get_file_state(self.file_path):
+            return None
+        return sections
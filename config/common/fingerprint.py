@@ -0,0 +1,118 @@
+"""
+This module computes stable content hashes of configuration values, to be used as
+cache keys, or to compare configuration snapshots cheaply.
+"""
+from collections import abc
+from hashlib import blake2b
+from typing import Any, Dict, Optional, Tuple
+
+from config.common import DeferredValue, is_sequence
+
+DIGEST_SIZE = 16
+
+
+def _encode_key(key: Any) -> bytes:
+    return f"{type(key).__name__}:{key}".encode("utf8")
+
+
+def _sort_key(item: Tuple[Any, Any]) -> Tuple[str, str]:
+    key = item[0]
+    return (type(key).__name__, str(key))
+
+
+class Fingerprinter:
+    """
+    Computes content hashes of trees of configuration values. The hash of a
+    container is derived from the hashes of its items, and the hash of each object
+    is computed once: objects appearing several times, like subtrees shared by
+    different configurations, are hashed only once.
+
+    Hashes are stored by object id, therefore a Fingerprinter must be used only
+    while the hashed values are not modified.
+    """
+
+    def __init__(
+        self, shared: Optional["Fingerprinter"] = None, values: Any = None
+    ) -> None:
+        """
+        Creates a new instance of Fingerprinter. If a shared fingerprinter is given,
+        its hashes are reused, but new hashes are not stored in it. If values are
+        given, they are hashed the first time hashes are requested to this
+        fingerprinter as shared one.
+        """
+        self._shared = shared
+        self._pending = values
+        # objects are kept in memory with their hash, so their ids are not reused
+        self._memo: Dict[int, Tuple[Any, bytes]] = {}
+
+    def _get_memo(self, value: Any) -> Optional[bytes]:
+        key = id(value)
+        fingerprinter: Optional[Fingerprinter] = self
+        while fingerprinter is not None:
+            if fingerprinter._pending is not None:
+                pending = fingerprinter._pending
+                fingerprinter._pending = None
+                fingerprinter.digest(pending)
+            try:
+                return fingerprinter._memo[key][1]
+            except KeyError:
+                fingerprinter = fingerprinter._shared
+        return None
+
+    def digest(self, value: Any) -> bytes:
+        """
+        Returns the content hash of the given value, as bytes.
+        """
+        is_container = isinstance(value, abc.Mapping) or is_sequence(value)
+
+        if is_container:
+            memo = self._get_memo(value)
+            if memo is not None:
+                return memo
+
+        hasher = blake2b(digest_size=DIGEST_SIZE)
+
+        if isinstance(value, abc.Mapping):
+            hasher.update(b"d")
+            for key, item in sorted(value.items(), key=_sort_key):
+                encoded_key = _encode_key(key)
+                hasher.update(len(encoded_key).to_bytes(4, "little"))
+                hasher.update(encoded_key)
+                hasher.update(self.digest(item))
+        elif is_container:
+            hasher.update(b"l")
+            for item in value:
+                hasher.update(self.digest(item))
+        elif isinstance(value, str):
+            hasher.update(b"s")
+            hasher.update(value.encode("utf8", "surrogatepass"))
+        elif value is None or isinstance(value, bool):
+            hasher.update(f"b{value}".encode())
+        elif isinstance(value, int):
+            hasher.update(f"i{value}".encode())
+        elif isinstance(value, float):
+            hasher.update(f"f{value.hex()}".encode())
+        elif isinstance(value, DeferredValue):
+            # deferred values are identified by their description, like the name of
+            # a secret, not by their actual value
+            hasher.update(f"r{type(value).__qualname__}:{value!r}".encode("utf8"))
+        else:
+            hasher.update(f"o{type(value).__qualname__}:{value!r}".encode("utf8"))
+
+        result = hasher.digest()
+        if is_container:
+            self._memo[id(value)] = (value, result)
+        return result
+
+    def fingerprint(self, value: Any) -> str:
+        """
+        Returns the content hash of the given value, as hexadecimal string.
+        """
+        return self.digest(value).hex()
+
+
+def fingerprint_values(value: Any) -> str:
+    """
+    Returns a stable content hash of the given configuration values.
+    """
+    return Fingerprinter().fingerprint(value)
@@ -0,0 +1,96 @@
+"""
+This module provides a deeply immutable representation of configuration values,
+used by configurations built in frozen mode:
+
+- mappings are stored as read-only FrozenMapping objects;
+- lists are stored as tuples, and sets as frozensets.
+
+Frozen values can be shared across threads and caches without copies, and are
+hashable when all their values are hashable: the hash of each frozen mapping is
+computed once, so subtrees can be used as keys of caches cheaply.
+"""
+from collections import abc
+from typing import Any, Dict, Iterator, Optional
+
+from config.common import Configuration, ImmutableMapping, is_sequence
+
+
+class FrozenMapping(ImmutableMapping):
+    """
+    A read-only, hashable mapping of frozen configuration values.
+    """
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+        self._hash: Optional[int] = None
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"<FrozenMapping {self._data!r}>"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenMapping):
+            # hashes already computed tell cheaply most mappings that differ
+            if (
+                self._hash is not None
+                and other._hash is not None
+                and self._hash != other._hash
+            ):
+                return False
+            return self._data == other._data
+        if isinstance(other, dict):
+            return self._data == other
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def copy(self) -> "FrozenMapping":  # type: ignore[override]
+        """
+        Returns this mapping: frozen mappings cannot be modified, therefore they
+        do not need to be copied, like frozensets.
+        """
+        return self
+
+
+def freeze_values(value: Any) -> Any:
+    """
+    Returns a deeply immutable representation of the given configuration values.
+    Values that are already frozen are returned as they are.
+    """
+    if isinstance(value, (str, bytes, FrozenMapping)):
+        return value
+
+    if isinstance(value, abc.Mapping):
+        return FrozenMapping({key: freeze_values(item) for key, item in value.items()})
+
+    if is_sequence(value):
+        return tuple(freeze_values(item) for item in value)
+
+    if isinstance(value, abc.Set) and not isinstance(value, frozenset):
+        return frozenset(value)
+
+    return value
+
+
+def freeze_configuration(configuration: Configuration) -> Configuration:
+    """
+    Returns a Configuration object backed by a frozen representation of the values
+    of the given configuration.
+    """
+    return Configuration(freeze_values(configuration.values))
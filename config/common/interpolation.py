@@ -0,0 +1,261 @@
+"""
+This module implements interpolation of references inside configuration values,
+like `${other.key}` to reference other values, and `${env:NAME}` to reference
+environment variables.
+
+References are compiled into a dependency graph once per build, then each value is
+resolved only once, in dependency order.
+"""
+import copy
+import os
+import re
+from collections import abc
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from config.errors import ConfigurationInterpolationError
+
+Path = Tuple[Union[str, int], ...]
+
+_reference_pattern = re.compile(r"\$(\$?)\{([^{}]*)\}")
+
+ENV_PREFIX = "env:"
+
+
+class Reference:
+    """Describes a `${...}` reference inside a configuration value."""
+
+    __slots__ = ("expression", "env_name", "path")
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.env_name: Optional[str] = None
+        self.path: Tuple[str, ...] = ()
+
+        if expression.startswith(ENV_PREFIX):
+            self.env_name = expression[len(ENV_PREFIX) :]
+        else:
+            self.path = tuple(expression.split("."))
+
+        if not expression or not all(self.path) or self.env_name == "":
+            raise ConfigurationInterpolationError(
+                f"Invalid reference: '${{{expression}}}'"
+            )
+
+    def __repr__(self) -> str:
+        return f"<Reference ${{{self.expression}}}>"
+
+
+Template = List[Union[str, Reference]]
+
+
+def compile_template(value: str) -> Optional[Template]:
+    """
+    Parses the given string into a list of literal parts and references. Returns
+    None if the string does not contain any reference. A `$${...}` sequence is an
+    escaped literal `${...}`.
+    """
+    if "${" not in value:
+        return None
+
+    parts: Template = []
+    has_references = False
+    position = 0
+
+    for match in _reference_pattern.finditer(value):
+        if match.start() > position:
+            parts.append(value[position : match.start()])
+        if match.group(1):
+            parts.append("${" + match.group(2) + "}")
+        else:
+            parts.append(Reference(match.group(2)))
+            has_references = True
+        position = match.end()
+
+    if position < len(value):
+        parts.append(value[position:])
+
+    if not has_references:
+        # only escaped sequences
+        return ["".join(parts)]  # type: ignore
+    return parts
+
+
+def _format_path(path: Path) -> str:
+    return ".".join(str(part) for part in path)
+
+
+class Interpolator:
+    """
+    Resolves references inside a tree of configuration values.
+    """
+
+    def __init__(
+        self,
+        values: Mapping[str, Any],
+        templates: Optional[Mapping[Path, Template]] = None,
+    ) -> None:
+        """
+        Creates a new instance of Interpolator for the given values. If templates
+        are given, by path, only those values are resolved, and the values are not
+        scanned for references.
+        """
+        self._values = values
+        self._templates: Dict[Path, Template] = {}
+        self._resolved: Dict[Path, Any] = {}
+        self._resolving: Dict[Path, None] = {}
+        self._owned = {id(values)}
+        if templates is None:
+            self._collect((), values)
+        else:
+            self._templates.update(templates)
+
+    @property
+    def templates(self) -> Dict[Path, Template]:
+        """
+        Returns the templates of the values including references, by path.
+        """
+        return self._templates
+
+    @property
+    def references_count(self) -> int:
+        return len(self._templates)
+
+    def _collect(self, path: Path, value: Any) -> None:
+        if isinstance(value, str):
+            template = compile_template(value)
+            if template is not None:
+                self._templates[path] = template
+        elif isinstance(value, abc.Mapping):
+            for key, item in value.items():
+                self._collect(path + (key,), item)
+        elif isinstance(value, abc.MutableSequence):
+            for index, item in enumerate(value):
+                self._collect(path + (index,), item)
+
+    def _get(self, path: Path, reference: Reference) -> Tuple[Path, Any]:
+        value: Any = self._values
+        target_path: Path = ()
+        for part in reference.path:
+            key: Union[str, int] = part
+            if isinstance(value, abc.Mapping) and part in value:
+                value = value[part]
+            elif isinstance(value, abc.MutableSequence) and part.isdigit():
+                key = int(part)
+                try:
+                    value = value[key]
+                except IndexError:
+                    break
+            else:
+                break
+            target_path += (key,)
+        else:
+            return target_path, value
+
+        raise ConfigurationInterpolationError(
+            f"The value at '{_format_path(path)}' references a missing key: "
+            f"'${{{reference.expression}}}'"
+        )
+
+    def _resolve_reference(self, path: Path, reference: Reference) -> Any:
+        if reference.env_name is not None:
+            try:
+                return os.environ[reference.env_name]
+            except KeyError:
+                raise ConfigurationInterpolationError(
+                    f"The value at '{_format_path(path)}' references a missing "
+                    f"environment variable: '{reference.env_name}'"
+                )
+
+        target_path, target = self._get(path, reference)
+
+        if target_path in self._templates:
+            return self._resolve(target_path)
+
+        if isinstance(target, (abc.Mapping, abc.MutableSequence)):
+            # resolve the references inside the referenced subtree first,
+            # then copy it, to not alias the same objects in different places
+            size = len(target_path)
+            for template_path in list(self._templates):
+                if template_path[:size] == target_path:
+                    self._resolve(template_path)
+            # resolving references replaces containers along their paths with
+            # copies: the target is obtained again, with the resolved values
+            _, target = self._get(path, reference)
+            return copy.deepcopy(target)
+        return target
+
+    def _resolve(self, path: Path) -> Any:
+        try:
+            return self._resolved[path]
+        except KeyError:
+            pass
+
+        if path in self._resolving:
+            cycle = list(self._resolving)
+            cycle = cycle[cycle.index(path) :] + [path]
+            raise ConfigurationInterpolationError(
+                "Circular reference: "
+                + " -> ".join(_format_path(item) for item in cycle)
+            )
+
+        self._resolving[path] = None
+        try:
+            template = self._templates[path]
+
+            if len(template) == 1:
+                part = template[0]
+                # a value made of a single reference keeps the referenced type
+                value = (
+                    self._resolve_reference(path, part)
+                    if isinstance(part, Reference)
+                    else part
+                )
+            else:
+                value = "".join(
+                    str(self._resolve_reference(path, part))
+                    if isinstance(part, Reference)
+                    else part
+                    for part in template
+                )
+        finally:
+            del self._resolving[path]
+
+        self._set(path, value)
+        self._resolved[path] = value
+        return value
+
+    def _set(self, path: Path, value: Any) -> None:
+        # containers along the path are copied before being modified, since they
+        # can be shared with the values of configuration sources
+        parent: Any = self._values
+        for part in path[:-1]:
+            child = parent[part]
+            if id(child) not in self._owned:
+                child = dict(child) if isinstance(child, abc.Mapping) else list(child)
+                parent[part] = child
+                self._owned.add(id(child))
+            parent = child
+        parent[path[-1]] = value
+
+    def resolve_value(self, path: Path) -> Any:
+        """
+        Resolves the references of the value at the given path, which must be the
+        path of a template, and returns the resolved value.
+        """
+        return self._resolve(path)
+
+    def resolve(self) -> Mapping[str, Any]:
+        """
+        Resolves all references. The root mapping is updated in place, while
+        nested containers holding references are replaced by updated copies.
+        """
+        for path in self._templates:
+            self._resolve(path)
+        return self._values
+
+
+def interpolate(values: Mapping[str, Any]) -> Mapping[str, Any]:
+    """
+    Resolves `${other.key}` and `${env:NAME}` references inside the given values.
+    """
+    return Interpolator(values).resolve()
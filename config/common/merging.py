@@ -0,0 +1,205 @@
+"""
+This module provides strategies to merge lists of values, configurable by path.
+"""
+import re
+from fnmatch import translate
+from typing import Any, Callable, Dict, List, Mapping, Optional, Pattern, Tuple, Union
+
+from deepmerge import Merger
+
+from config.errors import ConfigurationError
+
+ListStrategy = Callable[[Merger, List[Any], list, list], list]
+
+
+def _hash_key(value: Any) -> Any:
+    # returns a hashable key for the given value, also for unhashable values like
+    # dictionaries and lists; types are included so that 1 and True are different
+    if isinstance(value, dict):
+        return (dict, frozenset((key, _hash_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_hash_key(item) for item in value))
+    if isinstance(value, set):
+        return (set, frozenset(_hash_key(item) for item in value))
+    return (type(value), value)
+
+
+def append(config: Merger, path: List[Any], base: list, nxt: list) -> list:
+    """Appends new items to the existing list."""
+    return base + nxt
+
+
+def replace(config: Merger, path: List[Any], base: list, nxt: list) -> list:
+    """Replaces the existing list with the new list."""
+    return nxt
+
+
+def dedupe(config: Merger, path: List[Any], base: list, nxt: list) -> list:
+    """
+    Appends new items to the existing list, then removes duplicates keeping the
+    first occurrence of each item.
+    """
+    seen = set()
+    result = []
+    for item in base + nxt:
+        key = _hash_key(item)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+class UnionByKey:
+    """
+    Merges lists of objects identified by a key, like "id": items of the new list
+    are merged into the items of the existing list having the same key, other
+    items are appended.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"<UnionByKey {self.key!r}>"
+
+    def __call__(self, config: Merger, path: List[Any], base: list, nxt: list) -> list:
+        key = self.key
+        result = list(base)
+        positions: Dict[Any, int] = {}
+
+        for index, item in enumerate(result):
+            if isinstance(item, dict) and key in item:
+                positions.setdefault(_hash_key(item[key]), index)
+
+        for item in nxt:
+            if not isinstance(item, dict) or key not in item:
+                result.append(item)
+                continue
+
+            item_key = _hash_key(item[key])
+            try:
+                index = positions[item_key]
+            except KeyError:
+                positions[item_key] = len(result)
+                result.append(item)
+            else:
+                result[index] = config.value_strategy(
+                    path + [index], result[index], item
+                )
+        return result
+
+
+BUILTIN_STRATEGIES: Dict[str, ListStrategy] = {
+    "append": append,
+    "replace": replace,
+    "dedupe": dedupe,
+}
+
+MergeStrategy = Union[str, ListStrategy]
+
+
+def _get_strategy(strategy: MergeStrategy) -> ListStrategy:
+    if isinstance(strategy, str):
+        try:
+            return BUILTIN_STRATEGIES[strategy]
+        except KeyError:
+            raise ConfigurationError(
+                f"Unknown merge strategy: {strategy!r}, "
+                f"supported strategies: {', '.join(BUILTIN_STRATEGIES)}"
+            )
+    return strategy
+
+
+def format_path(path: List[Any]) -> str:
+    return ".".join(str(part) for part in path)
+
+
+class MergeStrategies:
+    """
+    Describes the strategies used to merge lists, by path. Paths are described
+    using dots, like `app.servers`, and can contain wildcards like `*.servers` or
+    `tenants.*.tags`. Exact paths take precedence over wildcards, and wildcards are
+    evaluated in the given order.
+    """
+
+    def __init__(
+        self,
+        strategies: Optional[Mapping[str, MergeStrategy]] = None,
+        default: MergeStrategy = "append",
+    ) -> None:
+        self.default = _get_strategy(default)
+        self._exact: Dict[str, ListStrategy] = {}
+        self._patterns: List[Tuple[Pattern, ListStrategy]] = []
+        self._cache: Dict[str, ListStrategy] = {}
+
+        for path, strategy in (strategies or {}).items():
+            if any(character in path for character in "*?["):
+                self._patterns.append(
+                    (re.compile(translate(path)), _get_strategy(strategy))
+                )
+            else:
+                self._exact[path] = _get_strategy(strategy)
+
+    def __bool__(self) -> bool:
+        return bool(self._exact or self._patterns) or self.default is not append
+
+    def get_strategy(self, path: List[Any]) -> ListStrategy:
+        """
+        Returns the strategy to be used to merge lists at the given path.
+        """
+        formatted_path = format_path(path)
+        try:
+            return self._cache[formatted_path]
+        except KeyError:
+            pass
+
+        strategy = self._exact.get(formatted_path)
+        if strategy is None:
+            for pattern, pattern_strategy in self._patterns:
+                if pattern.match(formatted_path):
+                    strategy = pattern_strategy
+                    break
+            else:
+                strategy = self.default
+
+        self._cache[formatted_path] = strategy
+        return strategy
+
+    def merge_lists(
+        self, config: Merger, path: List[Any], base: list, nxt: list
+    ) -> list:
+        return self.get_strategy(path)(config, path, base, nxt)
+
+
+def merge_dicts_copy(config: Merger, path: List[Any], base: dict, nxt: dict) -> dict:
+    """
+    Like the "merge" strategy of deepmerge, but returns a new dictionary instead of
+    modifying the base.
+    """
+    result = dict(base)
+    for key, value in nxt.items():
+        if key in result:
+            result[key] = config.value_strategy(path + [key], result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def create_merger(
+    strategies: Optional[MergeStrategies] = None, copy: bool = False
+) -> Merger:
+    """
+    Returns a Merger that merges lists using the given strategies. If copy is True,
+    dictionaries are merged into new dictionaries instead of being modified.
+    """
+    return Merger(
+        type_strategies=[
+            (list, [strategies.merge_lists if strategies else "append"]),
+            (dict, [merge_dicts_copy if copy else "merge"]),
+            (set, ["union"]),
+        ],
+        fallback_strategies=["override"],
+        type_conflict_strategies=["override"],
+    )
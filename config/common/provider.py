@@ -0,0 +1,93 @@
+"""
+This module provides a holder for the current Configuration of an application,
+supporting hot reload following the read-copy-update pattern.
+"""
+from threading import Lock
+from typing import Any, Optional
+
+from config.common import _MISSING, Configuration, ConfigurationBuilder
+from config.common.accessors import ProviderAccessor
+
+
+class ConfigurationProvider:
+    """
+    Owns the current Configuration snapshot built by a ConfigurationBuilder.
+
+    Readers obtain the current snapshot without taking any lock: a snapshot is
+    never modified after it is published, and a reload publishes a new snapshot
+    with a single reference assignment. Writers (reloads) are serialized, so that
+    concurrent reloads never publish snapshots out of order.
+    """
+
+    __slots__ = ("_builder", "_current", "_version", "_write_lock")
+
+    def __init__(
+        self,
+        builder: ConfigurationBuilder,
+        configuration: Optional[Configuration] = None,
+    ) -> None:
+        """
+        Creates a new instance of ConfigurationProvider. If a configuration is not
+        provided, the initial snapshot is built immediately using the given builder.
+        """
+        self._builder = builder
+        self._write_lock = Lock()
+        self._current = configuration if configuration is not None else builder.build()
+        self._version = 1
+
+    def __repr__(self) -> str:
+        return f"<ConfigurationProvider version={self._version}>"
+
+    @property
+    def builder(self) -> ConfigurationBuilder:
+        return self._builder
+
+    @property
+    def configuration(self) -> Configuration:
+        """
+        Returns the current configuration snapshot.
+        """
+        return self._current
+
+    @property
+    def version(self) -> int:
+        """
+        Returns a number that is incremented every time a new snapshot is published.
+        """
+        return self._version
+
+    def get(self) -> Configuration:
+        """
+        Returns the current configuration snapshot.
+        """
+        return self._current
+
+    def accessor(self, path: str, default: Any = _MISSING) -> ProviderAccessor:
+        """
+        Returns a callable that reads the value at the given path of the current
+        snapshot, like `limits.per_tenant.rps`, always returning the latest value
+        after reloads. The path is tokenized once.
+        """
+        return ProviderAccessor(self, path, default)
+
+    def publish(self, configuration: Configuration) -> Configuration:
+        """
+        Publishes the given configuration as the current snapshot.
+        """
+        with self._write_lock:
+            self._current = configuration
+            self._version += 1
+        return configuration
+
+    def reload(self) -> Configuration:
+        """
+        Rebuilds the configuration using the underlying builder, and publishes the
+        result as the current snapshot. Readers keep using the previous snapshot
+        until the new one is ready. If the build fails, the current snapshot is kept
+        and the exception is propagated.
+        """
+        with self._write_lock:
+            configuration = self._builder.build()
+            self._current = configuration
+            self._version += 1
+        return configuration
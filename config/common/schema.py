@@ -0,0 +1,311 @@
+"""
+This module provides schemas describing the types of configuration values by path,
+to convert values read from sources that produce only strings, like environment
+variables and INI files, once, when configuration is built.
+"""
+import re
+from collections import abc
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from config.common import DeferredValue
+from config.errors import ConfigurationCoercionError
+
+Converter = Callable[[Any], Any]
+
+WILDCARD = "*"
+
+_TRUE_VALUES = {"1", "true", "yes", "on", "y"}
+_FALSE_VALUES = {"0", "false", "no", "off", "n", ""}
+
+_duration_pattern = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)", re.IGNORECASE)
+_duration_units = {
+    "ms": 0.001,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+}
+
+
+def to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        if value in (0, 1):
+            return bool(value)
+    elif isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in _TRUE_VALUES:
+            return True
+        if normalized in _FALSE_VALUES:
+            return False
+    raise ValueError(f"invalid boolean value: {value!r}")
+
+
+def to_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"invalid integer value: {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError(f"invalid integer value: {value!r}")
+
+
+def to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"invalid float value: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip())
+    raise ValueError(f"invalid float value: {value!r}")
+
+
+def to_str(value: Any) -> str:
+    if isinstance(value, (abc.Mapping, list, tuple)):
+        raise ValueError(f"invalid string value: {value!r}")
+    return str(value)
+
+
+def to_timedelta(value: Any) -> timedelta:
+    """
+    Converts numbers of seconds, and durations like "30s", "500ms", "1h30m", to
+    timedelta objects.
+    """
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return timedelta(seconds=value)
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return timedelta(seconds=float(text))
+        except ValueError:
+            pass
+        position = 0
+        seconds = 0.0
+        for match in _duration_pattern.finditer(text):
+            if text[position : match.start()].strip():
+                break
+            seconds += float(match.group(1)) * _duration_units[match.group(2).lower()]
+            position = match.end()
+        else:
+            if position and not text[position:].strip():
+                return timedelta(seconds=seconds)
+    raise ValueError(f"invalid duration: {value!r}")
+
+
+class ListOf:
+    """
+    Converts lists, or comma separated strings, to lists of items converted by the
+    given converter.
+    """
+
+    __slots__ = ("item_converter", "separator")
+
+    def __init__(self, item_converter: Any = str, separator: str = ",") -> None:
+        self.item_converter = get_converter(item_converter)
+        self.separator = separator
+
+    def __repr__(self) -> str:
+        return f"<ListOf {self.item_converter!r}>"
+
+    def __call__(self, value: Any) -> List[Any]:
+        if isinstance(value, str):
+            items: Any = [
+                item.strip() for item in value.split(self.separator) if item.strip()
+            ]
+        elif isinstance(value, (list, tuple)):
+            items = value
+        else:
+            raise ValueError(f"invalid list value: {value!r}")
+        return [self.item_converter(item) for item in items]
+
+
+_BUILTIN_CONVERTERS: Dict[Any, Converter] = {
+    bool: to_bool,
+    int: to_int,
+    float: to_float,
+    str: to_str,
+    timedelta: to_timedelta,
+}
+
+
+def _get_list_item_type(value_type: Any) -> Tuple[bool, Any]:
+    origin = getattr(value_type, "__origin__", None)
+    if origin is list:
+        args = getattr(value_type, "__args__", None) or (str,)
+        return True, args[0]
+    if value_type is list:
+        return True, str
+    return False, None
+
+
+def get_converter(value_type: Any) -> Converter:
+    """
+    Returns a converter for the given type: bool, int, float, str, timedelta, and
+    List[T] are supported out of the box; other callables are used as they are.
+    """
+    try:
+        return _BUILTIN_CONVERTERS[value_type]
+    except (KeyError, TypeError):
+        pass
+
+    is_list, item_type = _get_list_item_type(value_type)
+    if is_list:
+        return ListOf(item_type)
+
+    if callable(value_type):
+        return value_type
+    raise TypeError(f"Unsupported schema type: {value_type!r}")
+
+
+class _Node:
+    __slots__ = ("converter", "children")
+
+    def __init__(self) -> None:
+        self.converter: Optional[Converter] = None
+        self.children: Dict[str, "_Node"] = {}
+
+
+class Schema:
+    """
+    Describes the types of configuration values by path, like "server.port". The
+    `*` wildcard matches any key of a mapping, or any item of a list, like in
+    "tenants.*.rps". Paths are compiled once into a conversion plan, which is
+    applied with a single pass on the matching values; paths without values are
+    ignored.
+    """
+
+    def __init__(self, types: Mapping[str, Any]) -> None:
+        self._types = dict(types)
+        self._root = _Node()
+
+        for path, value_type in self._types.items():
+            node = self._root
+            for part in path.split("."):
+                node = node.children.setdefault(part, _Node())
+            node.converter = get_converter(value_type)
+
+    def __repr__(self) -> str:
+        return f"<Schema {list(self._types)}>"
+
+    def _convert(
+        self,
+        node: _Node,
+        value: Any,
+        path: List[Union[str, int]],
+        errors: List[Tuple[str, str]],
+    ) -> Any:
+        if node.children:
+            value = self._convert_children(node, value, path, errors)
+
+        if node.converter is not None and not isinstance(value, DeferredValue):
+            try:
+                return node.converter(value)
+            except (TypeError, ValueError) as error:
+                errors.append((".".join(str(part) for part in path), str(error)))
+        return value
+
+    def _convert_children(
+        self,
+        node: _Node,
+        value: Any,
+        path: List[Union[str, int]],
+        errors: List[Tuple[str, str]],
+    ) -> Any:
+        if isinstance(value, abc.Mapping):
+            items: Any = value.items()
+        elif isinstance(value, list):
+            items = enumerate(value)
+        else:
+            return value
+
+        wildcard = node.children.get(WILDCARD)
+        result: Any = None
+
+        for key, item in items:
+            child = node.children.get(str(key), wildcard)
+            if child is None:
+                continue
+            path.append(key)
+            new_item = self._convert(child, item, path, errors)
+            path.pop()
+
+            if new_item is not item:
+                # containers are copied before being modified, since they can be
+                # shared with the values of configuration sources
+                if result is None:
+                    result = (
+                        dict(value) if isinstance(value, abc.Mapping) else list(value)
+                    )
+                result[key] = new_item
+
+        return value if result is None else result
+
+    def get_conversion_path(
+        self, path: Sequence[Union[str, int]]
+    ) -> Optional[Sequence[Union[str, int]]]:
+        """
+        Returns the part of the given path whose value must be converted again when
+        the value at the given path changes: the path of the closest ancestor having
+        a converter, like a list of values, otherwise the given path. Returns None
+        if the schema describes no values at the given path.
+        """
+        node = self._root
+        for index, part in enumerate(path):
+            child = node.children.get(str(part), node.children.get(WILDCARD))
+            if child is None:
+                return None
+            node = child
+            if node.converter is not None:
+                return path[: index + 1]
+        return path
+
+    def convert_at(
+        self, path: Sequence[Union[str, int]], value: Any
+    ) -> Tuple[Any, List[Tuple[str, str]]]:
+        """
+        Converts the given value, located at the given path, and returns the
+        converted value, and the conversion errors. The given value is not modified.
+        """
+        errors: List[Tuple[str, str]] = []
+        node = self._root
+        for part in path:
+            child = node.children.get(str(part), node.children.get(WILDCARD))
+            if child is None:
+                return value, errors
+            node = child
+        return self._convert(node, value, list(path), errors), errors
+
+    def convert(
+        self, values: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[Tuple[str, str]]]:
+        """
+        Converts the values described by this schema, and returns the converted
+        values, and the paths of the values that could not be converted, with the
+        conversion errors. The given values are not modified: containers including
+        converted values are replaced by updated copies.
+        """
+        errors: List[Tuple[str, str]] = []
+        return self._convert_children(self._root, values, [], errors), errors
+
+    def apply(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Converts the values described by this schema, and returns the updated values.
+        The given dictionary is updated in place, while nested containers including
+        converted values are replaced by updated copies. All conversion errors are
+        reported at once, with a ConfigurationCoercionError.
+        """
+        converted, errors = self.convert(values)
+
+        if errors:
+            raise ConfigurationCoercionError(errors)
+
+        if converted is not values:
+            values.update(converted)
+        return values
@@ -0,0 +1,212 @@
+"""
+This module provides support for values that reference secrets, like
+`secret://name`, resolved by a pluggable resolver only when they are needed.
+"""
+import time
+from abc import ABC, abstractmethod
+from collections import abc
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from config.common import DeferredValue
+
+SECRET_PREFIX = "secret://"
+
+
+class SecretResolver(ABC):
+    """
+    Base class for objects that obtain the values of secrets by name, for example
+    from a secrets store.
+    """
+
+    max_workers: Optional[int] = None
+
+    @abstractmethod
+    def get_secret(self, name: str) -> Any:
+        """Returns the value of the secret with the given name."""
+
+    def get_secrets(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Returns the values of the secrets with the given names. The default
+        implementation fetches secrets concurrently, in a pool of threads; resolvers
+        supporting batch requests can override this method.
+        """
+        names = list(names)
+        if not names:
+            return {}
+        if len(names) == 1:
+            return {names[0]: self.get_secret(names[0])}
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            return dict(zip(names, executor.map(self.get_secret, names)))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
+
+
+class SecretReference(DeferredValue):
+    """A configuration value that references a secret."""
+
+    __slots__ = ("name", "_secrets")
+
+    def __init__(self, name: str, secrets: "Secrets") -> None:
+        self.name = name
+        self._secrets = secrets
+
+    def __repr__(self) -> str:
+        return f"<SecretReference {self.name}>"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SecretReference):
+            return self.name == other.name and self._secrets is other._secrets
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def get_value(self) -> Any:
+        return self._secrets.get(self.name)
+
+
+class Secrets:
+    """
+    Replaces configuration values that reference secrets with SecretReference
+    objects, and caches the values of secrets fetched through a resolver.
+
+    By default secrets are fetched lazily, the first time they are read through a
+    Configuration object. If eager is True, all referenced secrets are fetched when
+    the configuration is built, in a single batch.
+    """
+
+    def __init__(
+        self,
+        resolver: SecretResolver,
+        cache_expiration: Optional[float] = 300.0,
+        eager: bool = False,
+        prefix: str = SECRET_PREFIX,
+    ) -> None:
+        """
+        Creates a new instance of Secrets using the given resolver. Fetched values are
+        cached for cache_expiration seconds, or forever if it is None.
+        """
+        self.resolver = resolver
+        self.cache_expiration = cache_expiration
+        self.eager = eager
+        self.prefix = prefix
+        self._cache: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = Lock()
+        self._name_locks: Dict[str, Lock] = {}
+
+    def __repr__(self) -> str:
+        return f"<Secrets {self.resolver!r}>"
+
+    def _get_expiration(self) -> Optional[float]:
+        if self.cache_expiration is None:
+            return None
+        return time.monotonic() + self.cache_expiration
+
+    def _get_cached(self, name: str) -> Tuple[bool, Any]:
+        try:
+            value, expiration = self._cache[name]
+        except KeyError:
+            return False, None
+        if expiration is not None and expiration <= time.monotonic():
+            return False, None
+        return True, value
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the value of the secret with the given name, from cache if available.
+        """
+        found, value = self._get_cached(name)
+        if found:
+            return value
+
+        with self._lock:
+            name_lock = self._name_locks.setdefault(name, Lock())
+
+        with name_lock:
+            # another thread might have fetched the same secret in the meantime
+            found, value = self._get_cached(name)
+            if found:
+                return value
+            value = self.resolver.get_secret(name)
+            self._cache[name] = (value, self._get_expiration())
+        return value
+
+    def fetch(self, names: Iterable[str]) -> None:
+        """
+        Fetches the secrets with the given names that are not cached, in one batch.
+        """
+        missing = [name for name in set(names) if not self._get_cached(name)[0]]
+        if not missing:
+            return
+
+        values = self.resolver.get_secrets(missing)
+        expiration = self._get_expiration()
+        with self._lock:
+            for name, value in values.items():
+                self._cache[name] = (value, expiration)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _bind(self, value: Any, names: Set[str]) -> Any:
+        if isinstance(value, str):
+            if value.startswith(self.prefix):
+                name = value[len(self.prefix) :]
+                names.add(name)
+                return SecretReference(name, self)
+            return value
+
+        if isinstance(value, abc.Mapping):
+            result: Any = None
+            for key, item in value.items():
+                new_item = self._bind(item, names)
+                if new_item is not item:
+                    if result is None:
+                        result = dict(value)
+                    result[key] = new_item
+            return value if result is None else result
+
+        if isinstance(value, abc.MutableSequence):
+            result = None
+            for index, item in enumerate(value):
+                new_item = self._bind(item, names)
+                if new_item is not item:
+                    if result is None:
+                        result = list(value)
+                    result[index] = new_item
+            return value if result is None else result
+
+        return value
+
+    def bind_value(self, value: Any) -> Any:
+        """
+        Returns the given value, with values that reference secrets replaced with
+        SecretReference objects, copying only containers including references.
+        If eager is True, referenced secrets are fetched immediately.
+        """
+        names: Set[str] = set()
+        value = self._bind(value, names)
+        if self.eager and names:
+            self.fetch(names)
+        return value
+
+    def bind(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replaces values that reference secrets with SecretReference objects, and
+        returns the updated values. Containers are copied only if they include
+        references to secrets, to not modify the values of configuration sources.
+        If eager is True, referenced secrets are fetched immediately.
+        """
+        names: Set[str] = set()
+        for key, value in values.items():
+            new_value = self._bind(value, names)
+            if new_value is not value:
+                values[key] = new_value
+
+        if self.eager:
+            self.fetch(names)
+        return values
@@ -0,0 +1,271 @@
+"""
+This module provides compiled snapshots of merged configuration values, to be
+produced ahead of time, for example when building a container image, and loaded
+quickly at startup without reading and parsing every source.
+
+Snapshots are serialized with `marshal`, which is fast but specific to the
+version of Python: a snapshot must be loaded by the same minor version of Python
+that produced it.
+"""
+import marshal
+import sys
+import time
+from collections import abc
+from datetime import date, datetime
+from datetime import time as time_value
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.common import ConfigurationBuilder, ConfigurationSource, merge_values
+from config.common.files import FileConfigurationSource, PathType, write_atomic
+from config.common.fingerprint import fingerprint_values
+from config.errors import ConfigurationError
+
+MAGIC = b"ECSNAP"
+FORMAT_VERSION = 1
+
+_FLAG_TAGGED = 1
+
+# values not supported by marshal are stored as tuples with a tag
+_TAG_PREFIX = "\x00ec:"
+
+
+def _encode_timedelta(value: timedelta) -> str:
+    return f"{value.days}:{value.seconds}:{value.microseconds}"
+
+
+def _decode_timedelta(value: str) -> timedelta:
+    days, seconds, microseconds = value.split(":")
+    return timedelta(int(days), int(seconds), int(microseconds))
+
+
+_TAGGED_TYPES: List[Tuple[type, str, Callable[[Any], str]]] = [
+    (datetime, "datetime", datetime.isoformat),
+    (date, "date", date.isoformat),
+    (time_value, "time", time_value.isoformat),
+    (timedelta, "timedelta", _encode_timedelta),
+]
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    _TAG_PREFIX + "datetime": datetime.fromisoformat,
+    _TAG_PREFIX + "date": date.fromisoformat,
+    _TAG_PREFIX + "time": time_value.fromisoformat,
+    _TAG_PREFIX + "timedelta": _decode_timedelta,
+}
+
+
+class SnapshotError(ConfigurationError):
+    """
+    An exception risen when a snapshot cannot be written or read.
+    """
+
+
+def _encode(value: Any, tagged: List[bool]) -> Any:
+    if isinstance(value, abc.Mapping):
+        return {key: _encode(item, tagged) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_encode(item, tagged) for item in value]
+        return items if isinstance(value, list) else tuple(items)
+    if value is None or isinstance(value, (str, bool, int, float, bytes)):
+        return value
+    for value_type, tag, encode in _TAGGED_TYPES:
+        if isinstance(value, value_type):
+            tagged[0] = True
+            return (_TAG_PREFIX + tag, encode(value))
+    raise SnapshotError(
+        f"Values of type {type(value).__name__} cannot be stored in snapshots."
+    )
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list, tuple)):
+                value[key] = _decode(item)
+        return value
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list, tuple)):
+                value[index] = _decode(item)
+        return value
+    if (
+        len(value) == 2
+        and isinstance(value[0], str)
+        and value[0].startswith(_TAG_PREFIX)
+    ):
+        return _DECODERS[value[0]](value[1])
+    return tuple(
+        _decode(item) if isinstance(item, (dict, list, tuple)) else item
+        for item in value
+    )
+
+
+def dump_snapshot(values: Dict[str, Any]) -> bytes:
+    """
+    Returns a compiled snapshot of the given values, as bytes.
+    """
+    tagged = [False]
+    encoded = _encode(values, tagged)
+    header = MAGIC + bytes(
+        [
+            FORMAT_VERSION,
+            sys.version_info[0],
+            sys.version_info[1],
+            _FLAG_TAGGED if tagged[0] else 0,
+        ]
+    )
+    return header + marshal.dumps(encoded)
+
+
+def load_snapshot(data: bytes) -> Dict[str, Any]:
+    """
+    Returns the values of a compiled snapshot.
+    """
+    header_size = len(MAGIC) + 4
+    if len(data) < header_size or not data.startswith(MAGIC):
+        raise SnapshotError("The given data is not a configuration snapshot.")
+
+    format_version, major, minor, flags = data[len(MAGIC) : header_size]
+    if format_version != FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format version: {format_version}; "
+            "the snapshot must be compiled again."
+        )
+    if (major, minor) != sys.version_info[:2]:
+        raise SnapshotError(
+            f"The snapshot was compiled with Python {major}.{minor}, and cannot be "
+            f"loaded with Python {sys.version_info[0]}.{sys.version_info[1]}; "
+            "the snapshot must be compiled again."
+        )
+
+    values = marshal.loads(data[header_size:])
+    if flags & _FLAG_TAGGED:
+        values = _decode(values)
+    return values
+
+
+def write_snapshot(
+    file_path: PathType, values: Dict[str, Any], mode: Optional[int] = None
+) -> int:
+    """
+    Writes a compiled snapshot of the given values to the given path atomically,
+    and returns its size in bytes. If a mode is given, the file gets the given
+    permissions, otherwise the ones of the existing file, or of new files.
+    """
+    data = dump_snapshot(values)
+    write_atomic(file_path, data, mode)
+    return len(data)
+
+
+class SnapshotFile(FileConfigurationSource):
+    """
+    Reads values from a compiled snapshot file.
+    """
+
+    def read_source(self) -> Dict[str, Any]:
+        with open(self.file_path, "rb") as source:
+            return load_snapshot(source.read())
+
+
+def count_keys(values: Any) -> int:
+    """
+    Returns the number of leaf values in the given tree of values.
+    """
+    if isinstance(values, abc.Mapping):
+        return sum(count_keys(item) for item in values.values())
+    if isinstance(values, list):
+        return sum(count_keys(item) for item in values)
+    return 1
+
+
+class SourceReport:
+    """
+    Describes the time spent reading and merging the values of a source, and the
+    number of values it provided.
+    """
+
+    __slots__ = ("source", "load_time", "merge_time", "keys")
+
+    def __init__(
+        self,
+        source: ConfigurationSource,
+        load_time: float,
+        merge_time: float,
+        keys: int,
+    ) -> None:
+        self.source = source
+        self.load_time = load_time
+        self.merge_time = merge_time
+        self.keys = keys
+
+    def __repr__(self) -> str:
+        return (
+            f"<SourceReport {self.source!r} load={self.load_time:.6f}s "
+            f"merge={self.merge_time:.6f}s keys={self.keys}>"
+        )
+
+    @property
+    def total_time(self) -> float:
+        return self.load_time + self.merge_time
+
+
+class SnapshotReport:
+    """
+    Describes a compiled snapshot, and the sources used to produce it.
+    """
+
+    __slots__ = ("sources", "values", "data", "keys", "fingerprint")
+
+    def __init__(
+        self, sources: List[SourceReport], values: Dict[str, Any], data: bytes
+    ) -> None:
+        self.sources = sources
+        self.values = values
+        self.data = data
+        self.keys = count_keys(values)
+        self.fingerprint = fingerprint_values(values)
+
+    def __repr__(self) -> str:
+        return f"<SnapshotReport keys={self.keys} size={self.size}>"
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def write(self, file_path: PathType) -> None:
+        """
+        Writes the compiled snapshot to the given path atomically.
+        """
+        write_atomic(file_path, self.data)
+
+
+def compile_snapshot(builder: ConfigurationBuilder) -> SnapshotReport:
+    """
+    Reads and merges the values of all sources of the given builder, measuring the
+    time spent on each source, and returns a report including the compiled
+    snapshot of the merged values.
+
+    Snapshots contain merged values before interpolation, type coercion, and
+    binding of secrets: these are applied when the snapshot is loaded, so that
+    secrets are never stored in snapshots.
+    """
+    settings: Dict[str, Any] = {}
+    owned: Dict[int, Any] = {id(settings): settings}
+    reports = []
+
+    for source in builder.sources:
+        start = time.perf_counter()
+        pairs = list(source.iter_values())
+        loaded = time.perf_counter()
+        merge_values(settings, pairs, builder._merger, owned)
+        merged = time.perf_counter()
+
+        reports.append(
+            SourceReport(
+                source,
+                loaded - start,
+                merged - loaded,
+                sum(count_keys(value) for _, value in pairs),
+            )
+        )
+
+    return SnapshotReport(reports, settings, dump_snapshot(settings))
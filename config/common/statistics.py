@@ -0,0 +1,220 @@
+"""
+This module provides opt-in instrumentation of configuration reads, to find the
+settings that are read most often, and the settings that are never read.
+"""
+from collections import abc
+from threading import Lock, local
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from config.common import (
+    Configuration,
+    ConfigurationSequence,
+    DeferredValue,
+    is_sequence,
+)
+
+T = TypeVar("T")
+
+
+def _iter_leaf_paths(value: Any, path: str) -> Iterable[str]:
+    # lists of scalar values are considered leaves, like scalar values
+    if isinstance(value, abc.Mapping):
+        for key, item in value.items():
+            yield from _iter_leaf_paths(item, f"{path}.{key}" if path else str(key))
+    elif is_sequence(value) and any(
+        isinstance(item, abc.Mapping) or is_sequence(item) for item in value
+    ):
+        for index, item in enumerate(value):
+            yield from _iter_leaf_paths(item, f"{path}.{index}")
+    elif path:
+        yield path
+
+
+def _wrap(value: Any, statistics: "AccessStatistics", path: str) -> Any:
+    if isinstance(value, abc.Mapping):
+        return TrackedConfiguration(value, statistics, path + ".")
+    if is_sequence(value):
+        return TrackedSequence(value, statistics, path + ".")
+    if isinstance(value, DeferredValue):
+        return value.get_value()
+    return value
+
+
+class AccessStatistics:
+    """
+    Counts reads of configuration values by path. Counters are kept per thread, so
+    that reads never contend for a lock, and are merged when statistics are
+    requested.
+    """
+
+    def __init__(self) -> None:
+        self._local = local()
+        self._lock = Lock()
+        self._counters: List[Dict[str, int]] = []
+        self._values: Optional[Any] = None
+
+    def __repr__(self) -> str:
+        return f"<AccessStatistics reads={sum(self.counts().values())}>"
+
+    def _get_counter(self) -> Dict[str, int]:
+        try:
+            return self._local.counter
+        except AttributeError:
+            counter: Dict[str, int] = {}
+            self._local.counter = counter
+            with self._lock:
+                self._counters.append(counter)
+            return counter
+
+    def add(self, path: str) -> None:
+        """
+        Counts a read of the value at the given path.
+        """
+        try:
+            counter = self._local.counter
+        except AttributeError:
+            counter = self._get_counter()
+        counter[path] = counter.get(path, 0) + 1
+
+    def add_tree(self, path: str, value: Any) -> None:
+        """
+        Counts a read of the value at the given path, and of all values it contains.
+        """
+        if path:
+            self.add(path)
+        for leaf_path in _iter_leaf_paths(value, path):
+            if leaf_path != path:
+                self.add(leaf_path)
+
+    def track(self, configuration: Configuration) -> "TrackedConfiguration":
+        """
+        Returns a configuration with the same values of the given configuration,
+        counting reads in these statistics. The values of the last tracked
+        configuration are used to report keys that are never read.
+        """
+        self._values = configuration._data
+        tracked = TrackedConfiguration(configuration._data, self)
+        tracked._fingerprint = configuration._fingerprint
+        return tracked
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of reads by path, merged across threads.
+        """
+        with self._lock:
+            counters = list(self._counters)
+
+        result: Dict[str, int] = {}
+        for counter in counters:
+            for path, count in counter.copy().items():
+                result[path] = result.get(path, 0) + count
+        return result
+
+    def hottest(self, count: int = 10) -> List[Tuple[str, int]]:
+        """
+        Returns the paths read most often, with their number of reads.
+        """
+        return sorted(self.counts().items(), key=lambda item: (-item[1], item[0]))[
+            :count
+        ]
+
+    def unread(self) -> List[str]:
+        """
+        Returns the paths of the values of the last tracked configuration that were
+        never read.
+        """
+        if self._values is None:
+            return []
+        counts = self.counts()
+        return [
+            path for path in _iter_leaf_paths(self._values, "") if path not in counts
+        ]
+
+    def reset(self) -> None:
+        """
+        Clears all counters.
+        """
+        with self._lock:
+            for counter in self._counters:
+                counter.clear()
+
+    def report(self, count: int = 10) -> str:
+        """
+        Returns a text report of the hottest paths, and of the keys never read.
+        """
+        lines = ["Hottest paths:"]
+        lines.extend(f"  {reads:>10}  {path}" for path, reads in self.hottest(count))
+        unread = self.unread()
+        lines.append(f"Never read ({len(unread)}):")
+        lines.extend(f"  {path}" for path in unread)
+        return "\n".join(lines)
+
+
+class TrackedConfiguration(Configuration):
+    """
+    A Configuration that counts reads of its values through attributes, items,
+    and the bind method.
+    """
+
+    __slots__ = ("_statistics", "_prefix")
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(
+        self, mapping: Any, statistics: AccessStatistics, prefix: str = ""
+    ) -> None:
+        super().__init__(mapping)
+        self._statistics = statistics
+        self._prefix = prefix
+
+    def __getattr__(self, name) -> Any:
+        if name in self._data:
+            path = self._prefix + name
+            self._statistics.add(path)
+            return _wrap(self._data[name], self._statistics, path)
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
+
+    def bind(self, cls: Type[T], *path: str) -> T:
+        value: Any = self._data
+        for fragment in path:
+            value = value[fragment]
+        self._statistics.add_tree((self._prefix + ".".join(path)).rstrip("."), value)
+        return super().bind(cls, *path)
+
+
+class TrackedSequence(ConfigurationSequence):
+    """
+    A ConfigurationSequence that counts reads of its items.
+    """
+
+    __slots__ = ("_statistics", "_prefix", "_indexes")
+
+    def __init__(
+        self,
+        items: Sequence,
+        statistics: AccessStatistics,
+        prefix: str,
+        indexes: Optional[range] = None,
+    ) -> None:
+        super().__init__(items)
+        self._statistics = statistics
+        self._prefix = prefix
+        # the positions of items in the original sequence, for slices
+        self._indexes = range(len(items)) if indexes is None else indexes
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TrackedSequence(
+                self._items[index],
+                self._statistics,
+                self._prefix,
+                self._indexes[index],
+            )
+
+        value = self._items[index]
+        path = f"{self._prefix}{self._indexes[index]}"
+        self._statistics.add(path)
+        return _wrap(value, self._statistics, path)
@@ -0,0 +1,393 @@
+"""
+This module provides support for building many configurations that share the same
+base values, and differ only by small overlays.
+"""
+import copy
+from collections import abc, defaultdict
+from typing import Any, DefaultDict, Dict, Iterable, List, Set, Tuple
+
+from config.common import (
+    _MISSING,
+    Configuration,
+    ConfigurationBuilder,
+    ConfigurationSource,
+    MapSource,
+    merge_values,
+    split_key,
+)
+from config.common.fingerprint import Fingerprinter
+from config.common.frozen import FrozenMapping, freeze_values
+from config.common.interpolation import (
+    Interpolator,
+    Path,
+    Reference,
+    Template,
+    compile_template,
+)
+from config.common.merging import create_merger
+from config.errors import ConfigurationCoercionError, ConfigurationInterpolationError
+
+KeyPath = Tuple[str, ...]
+
+
+def _get_value(values: Any, parts: Iterable[Any]) -> Tuple[Path, Any]:
+    """
+    Returns the path of the value at the given parts, with the indexes of lists as
+    integers, and the value, or _MISSING if the value does not exist.
+    """
+    value = values
+    path: Path = ()
+    for part in parts:
+        if isinstance(value, abc.Mapping):
+            if part not in value:
+                return path, _MISSING
+            key: Any = part
+        elif isinstance(value, abc.MutableSequence):
+            if isinstance(part, str):
+                if not part.isdigit():
+                    return path, _MISSING
+                part = int(part)
+            if not isinstance(part, int) or part >= len(value):
+                return path, _MISSING
+            key = part
+        else:
+            return path, _MISSING
+        value = value[key]
+        path += (key,)
+    return path, value
+
+
+def _set_value(
+    values: Dict[str, Any], path: Path, value: Any, owned: Dict[int, Any]
+) -> None:
+    """
+    Sets the value at the given path, replacing containers along the path that are
+    not owned with shallow copies, since they can be shared with the base.
+    """
+    parent: Any = values
+    for part in path[:-1]:
+        child = parent[part]
+        if id(child) not in owned:
+            child = dict(child) if isinstance(child, abc.Mapping) else list(child)
+            parent[part] = child
+            owned[id(child)] = child
+        parent = child
+    parent[path[-1]] = value
+
+
+def _to_key_path(path: Iterable[Any]) -> KeyPath:
+    return tuple(str(part) for part in path)
+
+
+def _collect_overlay_values(
+    path: KeyPath, value: Any, assigned: Set[KeyPath], strings: Dict[int, str]
+) -> None:
+    """
+    Collects the paths of the values assigned by an overlay, and the strings of the
+    overlay that can include references.
+    """
+    if isinstance(value, abc.Mapping) and value:
+        for key, item in value.items():
+            _collect_overlay_values(path + (str(key),), item, assigned, strings)
+        return
+
+    assigned.add(path)
+    if isinstance(value, str):
+        if "${" in value:
+            strings[id(value)] = value
+    elif isinstance(value, abc.MutableSequence):
+        for item in value:
+            _collect_overlay_values(path, item, set(), strings)
+
+
+def _collect_templates(
+    path: Path, value: Any, strings: Dict[int, str], templates: Dict[Path, Template]
+) -> None:
+    """
+    Collects the templates of the strings of an overlay, found under the given path.
+    Other strings are resolved base values, which are not interpolated again.
+    """
+    if isinstance(value, str):
+        if id(value) in strings:
+            template = compile_template(value)
+            if template is not None:
+                templates[path] = template
+    elif isinstance(value, abc.Mapping):
+        for key, item in value.items():
+            _collect_templates(path + (key,), item, strings, templates)
+    elif isinstance(value, abc.MutableSequence):
+        for index, item in enumerate(value):
+            _collect_templates(path + (index,), item, strings, templates)
+
+
+def _freeze_base(value: Any, frozen: Dict[int, Any]) -> Any:
+    """
+    Returns a frozen representation of the given base values, storing the frozen
+    representation of each container by the id of the container.
+    """
+    if isinstance(value, dict):
+        result: Any = FrozenMapping(
+            {key: _freeze_base(item, frozen) for key, item in value.items()}
+        )
+    elif isinstance(value, list):
+        result = tuple(_freeze_base(item, frozen) for item in value)
+    else:
+        return freeze_values(value)
+    frozen[id(value)] = result
+    return result
+
+
+def _freeze_variant(value: Any, frozen: Dict[int, Any]) -> Any:
+    """
+    Returns a frozen representation of the given values, reusing the frozen
+    representations of the containers of the base: only containers copied to
+    apply overlays are frozen again.
+    """
+    try:
+        return frozen[id(value)]
+    except KeyError:
+        pass
+    if isinstance(value, dict):
+        return FrozenMapping(
+            {key: _freeze_variant(item, frozen) for key, item in value.items()}
+        )
+    if isinstance(value, list):
+        return tuple(_freeze_variant(item, frozen) for item in value)
+    return freeze_values(value)
+
+
+def _is_pending_error(error_path: str, pending: Set[str]) -> bool:
+    return any(
+        path == error_path or path.startswith(error_path + ".") for path in pending
+    )
+
+
+class ConfigurationBase:
+    """
+    Holds the merged values of the sources of a ConfigurationBuilder, frozen at the
+    time the base was created, and derives configurations applying overlays.
+
+    Base values are interpolated, bound to secrets, and converted by the schema of
+    the builder once, when the base is created; `${env:NAME}` references are
+    therefore resolved once. Derived configurations share the subtrees of the base
+    that are not affected by overlays, and only the values of overlays, and the
+    base values referencing them, are processed again: the cost of deriving a
+    configuration depends on the size of the overlay, not on the size of the base.
+    If the builder creates frozen configurations, derived configurations are frozen
+    too, sharing the frozen subtrees of the base.
+    """
+
+    def __init__(self, builder: ConfigurationBuilder) -> None:
+        # values merged from sources can be shared with the sources themselves,
+        # a copy is done once, to not be affected by later changes
+        values = copy.deepcopy(builder.merge_sources())
+
+        self._builder = builder
+        self._merger = create_merger(builder.merge_strategies, copy=True)
+        self._templates: Dict[Path, Template] = {}
+        # base values whose references can be resolved only with overlays
+        self._pending: Dict[Path, Template] = {}
+        self._dependents: DefaultDict[KeyPath, Set[Path]] = defaultdict(set)
+        self._dependents_by_prefix: DefaultDict[KeyPath, Set[Path]] = defaultdict(set)
+
+        if builder.interpolate:
+            self._resolve(values)
+        if builder.secrets is not None:
+            builder.secrets.bind(values)
+        if builder.schema is not None:
+            self._convert(values)
+
+        self._values = values
+        # frozen representations of base containers, by id, shared by all derived
+        # configurations when the builder creates frozen configurations
+        self._frozen: Dict[int, Any] = {}
+        if builder.frozen:
+            frozen_values = _freeze_base(values, self._frozen)
+        # hashes of base subtrees are computed once, for all derived configurations
+        self._fingerprinter = Fingerprinter(
+            values=frozen_values if builder.frozen else values
+        )
+
+    def __repr__(self) -> str:
+        return f"<ConfigurationBase {list(self._values)}>"
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """
+        Returns a copy of the dictionary of base values.
+        """
+        return self._values.copy()
+
+    def _resolve(self, values: Dict[str, Any]) -> None:
+        interpolator = Interpolator(values)
+        self._templates = dict(interpolator.templates)
+
+        for path, template in self._templates.items():
+            try:
+                interpolator.resolve_value(path)
+            except ConfigurationInterpolationError:
+                self._pending[path] = template
+
+            # base values are indexed by the paths they reference, to find the ones
+            # affected by overlays
+            for part in template:
+                if isinstance(part, Reference) and part.env_name is None:
+                    self._dependents[part.path].add(path)
+                    for index in range(1, len(part.path) + 1):
+                        self._dependents_by_prefix[part.path[:index]].add(path)
+
+    def _convert(self, values: Dict[str, Any]) -> None:
+        assert self._builder.schema is not None
+        converted, errors = self._builder.schema.convert(values)
+
+        if self._pending:
+            # values with pending references are converted in derived configurations
+            pending = {".".join(map(str, path)) for path in self._pending}
+            errors = [
+                error for error in errors if not _is_pending_error(error[0], pending)
+            ]
+        if errors:
+            raise ConfigurationCoercionError(errors)
+
+        if converted is not values:
+            values.update(converted)
+
+    def _get_dependents(self, path: KeyPath) -> Iterable[Path]:
+        """
+        Returns the paths of the base values referencing the value at the given
+        path, its descendants, or its ancestors.
+        """
+        yield from self._dependents_by_prefix.get(path, ())
+        for index in range(1, len(path)):
+            yield from self._dependents.get(path[:index], ())
+
+    def _is_base_value(
+        self, settings: Dict[str, Any], path: Path, assigned: Set[KeyPath]
+    ) -> bool:
+        """
+        Returns a value indicating whether the value at the given path is the base
+        value, not overridden by overlays.
+        """
+        key_path = _to_key_path(path)
+        if any(key_path[:index] in assigned for index in range(1, len(path) + 1)):
+            return False
+        return _get_value(settings, path)[1] is _get_value(self._values, path)[1]
+
+    def _get_templates(
+        self,
+        settings: Dict[str, Any],
+        changed: Dict[Path, None],
+        assigned: Set[KeyPath],
+        strings: Dict[int, str],
+    ) -> Dict[Path, Template]:
+        """
+        Returns the templates of the values of overlays, and of the base values
+        affected by overlays, which must be resolved again.
+        """
+        templates = {
+            path: template
+            for path, template in self._pending.items()
+            if self._is_base_value(settings, path, assigned)
+        }
+        for path in changed:
+            _collect_templates(path, _get_value(settings, path)[1], strings, templates)
+
+        queue = [_to_key_path(path) for path in [*changed, *templates]]
+        while queue:
+            for path in self._get_dependents(queue.pop()):
+                if path not in templates and self._is_base_value(
+                    settings, path, assigned
+                ):
+                    templates[path] = self._templates[path]
+                    queue.append(_to_key_path(path))
+        return templates
+
+    def _process(
+        self, settings: Dict[str, Any], changed: Dict[Path, None], owned: Dict[int, Any]
+    ) -> None:
+        """
+        Binds secrets and converts the values at the given paths.
+        """
+        builder = self._builder
+        paths: Set[Path] = set()
+        for path in sorted(changed, key=len):
+            if not any(path[:index] in paths for index in range(1, len(path))):
+                paths.add(path)
+
+        if builder.secrets is not None:
+            for path in paths:
+                value = _get_value(settings, path)[1]
+                new_value = builder.secrets.bind_value(value)
+                if new_value is not value:
+                    _set_value(settings, path, new_value, owned)
+
+        if builder.schema is not None:
+            errors: List[Tuple[str, str]] = []
+            converted: Set[Path] = set()
+            for path in sorted(paths, key=len):
+                conversion_path = builder.schema.get_conversion_path(path)
+                if conversion_path is None or any(
+                    conversion_path[:index] in converted
+                    for index in range(1, len(conversion_path) + 1)
+                ):
+                    continue
+                converted.add(tuple(conversion_path))
+                value = _get_value(settings, conversion_path)[1]
+                new_value, value_errors = builder.schema.convert_at(
+                    conversion_path, value
+                )
+                errors.extend(value_errors)
+                if new_value is not value:
+                    _set_value(settings, tuple(conversion_path), new_value, owned)
+            if errors:
+                raise ConfigurationCoercionError(errors)
+
+    def derive(self, *sources: ConfigurationSource) -> Configuration:
+        """
+        Returns a Configuration with the base values, overridden by the values of the
+        given sources, applied in order. Base values are not modified.
+        """
+        settings = dict(self._values)
+        owned: Dict[int, Any] = {id(settings): settings}
+        touched: List[List[str]] = []
+        assigned: Set[KeyPath] = set()
+        strings: Dict[int, str] = {}
+
+        for source in sources:
+            pairs = list(source.iter_values())
+            for key, value in pairs:
+                parts = split_key(key)
+                touched.append(parts)
+                _collect_overlay_values(tuple(parts), value, assigned, strings)
+            merge_values(settings, pairs, self._merger, owned)
+
+        changed: Dict[Path, None] = {}
+        for parts in touched:
+            path, value = _get_value(settings, parts)
+            if value is not _MISSING:
+                changed[path] = None
+
+        if self._builder.interpolate:
+            templates = self._get_templates(settings, changed, assigned, strings)
+            if templates:
+                Interpolator(settings, templates).resolve()
+                changed.update(dict.fromkeys(templates))
+
+        self._process(settings, changed, owned)
+
+        if self._builder.frozen:
+            # frozen representations of the base are shared: frozen values are
+            # returned as they are when the configuration is created
+            settings = _freeze_variant(settings, self._frozen)
+
+        # compact representations are not shared, and would be created for all
+        # values of each derived configuration
+        configuration = self._builder._wrap_values(settings, compact=False)
+        configuration._fingerprint = self._fingerprinter
+        return configuration
+
+    def derive_map(self, values: Dict[str, Any]) -> Configuration:
+        """
+        Returns a Configuration with the base values, overridden by the given values.
+        """
+        return self.derive(MapSource(values))
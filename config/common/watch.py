@@ -0,0 +1,219 @@
+"""
+This module provides an asyncio based watcher that rebuilds configuration when the
+files it is read from change, and publishes new snapshots to awaiting consumers.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config.common import Configuration, ConfigurationSource
+from config.common.files import (
+    FileConfigurationSource,
+    FileState,
+    PathType,
+    get_file_state,
+)
+from config.common.provider import ConfigurationProvider
+
+logger = logging.getLogger("config.watch")
+
+
+def get_source_paths(source: ConfigurationSource) -> List[Path]:
+    """
+    Returns the paths of the files the given source reads values from, if any.
+    """
+    if isinstance(source, FileConfigurationSource):
+        return [source.file_path]
+
+    inner_source = getattr(source, "source", None)
+    if isinstance(inner_source, ConfigurationSource):
+        # sources wrapping other sources, like FallbackSource
+        return get_source_paths(inner_source)
+
+    get_files = getattr(source, "get_files", None)
+    if get_files is not None:
+        # sources reading several files, like GlobSource
+        return list(get_files())
+
+    directory_path = getattr(source, "directory_path", None)
+    if directory_path:
+        # the modification time of a directory changes when files are added,
+        # removed, or replaced with atomic updates
+        return [Path(directory_path)]
+
+    env_file = getattr(source, "file", None)
+    if env_file:
+        return [Path(env_file)]
+    return []
+
+
+class ConfigurationWatcher:
+    """
+    Watches the files used by the sources of a ConfigurationProvider's builder, using
+    mtime polling. Bursts of changes are coalesced: a rebuild happens only once
+    files stop changing for the debounce interval. Rebuilds run in an executor, so
+    they never block the event loop, and each new snapshot is published to the
+    provider and to consumers iterating the watcher:
+
+        async for config in watcher:
+            ...
+    """
+
+    def __init__(
+        self,
+        provider: ConfigurationProvider,
+        paths: Optional[Iterable[PathType]] = None,
+        interval: float = 1.0,
+        debounce: float = 0.2,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Creates a new instance of ConfigurationWatcher for the given provider.
+        Watched files are obtained from the sources of the provider's builder, plus
+        optional additional paths.
+        """
+        self._provider = provider
+        self._extra_paths = [Path(path) for path in paths] if paths else []
+        self.interval = interval
+        self.debounce = debounce
+        self.executor = executor
+        self.last_error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        self._published: Optional[asyncio.Event] = None
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<ConfigurationWatcher {self.get_paths()}>"
+
+    @property
+    def provider(self) -> ConfigurationProvider:
+        return self._provider
+
+    @property
+    def configuration(self) -> Configuration:
+        return self._provider.configuration
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def get_paths(self) -> List[Path]:
+        """
+        Returns the list of watched files.
+        """
+        paths: List[Path] = []
+        for source in self._provider.builder.sources:
+            paths.extend(get_source_paths(source))
+        paths.extend(self._extra_paths)
+        return paths
+
+    def _get_states(self) -> Dict[Path, FileState]:
+        return {path: get_file_state(path) for path in self.get_paths()}
+
+    async def _read_states(self) -> Dict[Path, FileState]:
+        # paths are obtained and checked in the executor, since sources like
+        # GlobSource scan folders, and stat calls can block on network drives
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._get_states)
+
+    def _get_published_event(self) -> asyncio.Event:
+        if self._published is None:
+            self._published = asyncio.Event()
+        return self._published
+
+    def start(self) -> "asyncio.Task":
+        """
+        Starts watching files, in a task scheduled on the running event loop.
+        """
+        if self.running:
+            raise RuntimeError("The watcher is already running.")
+        self._closed = False
+        self._get_published_event()
+        # the initial states are read once, synchronously, so that changes done
+        # right after the watcher is started are not missed
+        self._task = asyncio.ensure_future(self._watch(self._get_states()))
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Stops watching files, and ends the iteration of all consumers.
+        """
+        self._closed = True
+        if self._published is not None:
+            self._published.set()
+            self._published = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "ConfigurationWatcher":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def __aiter__(self):
+        # the version of the last snapshot seen by this consumer: snapshots published
+        # while the consumer is busy are yielded without waiting for the next one
+        version = self._provider.version
+        while not self._closed:
+            event = self._get_published_event()
+            if self._provider.version == version:
+                await event.wait()
+                if self._closed:
+                    return
+            version = self._provider.version
+            yield self._provider.configuration
+
+    async def reload(self) -> Configuration:
+        """
+        Rebuilds the configuration in the executor, and publishes the new snapshot.
+        """
+        loop = asyncio.get_running_loop()
+        configuration = await loop.run_in_executor(self.executor, self._provider.reload)
+        self._notify()
+        return configuration
+
+    def _notify(self) -> None:
+        # wake up current consumers, then prepare a new event for the next change
+        event = self._get_published_event()
+        self._published = asyncio.Event()
+        event.set()
+
+    async def _wait_for_quiet(
+        self, states: Dict[Path, FileState]
+    ) -> Dict[Path, FileState]:
+        while True:
+            await asyncio.sleep(self.debounce)
+            new_states = await self._read_states()
+            if new_states == states:
+                return states
+            states = new_states
+
+    async def _watch(self, states: Dict[Path, FileState]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            new_states = await self._read_states()
+
+            if new_states == states:
+                continue
+
+            states = await self._wait_for_quiet(new_states)
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # the current snapshot is kept, and a new attempt is done on the
+                # next change
+                self.last_error = exc
+                logger.exception("Failed to rebuild configuration.")
+            else:
+                self.last_error = None
@@ -0,0 +1,143 @@
+"""
+This module provides a configuration source that reads values from a directory
+containing one file per key, like Kubernetes secrets and ConfigMaps mounted as
+volumes.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.common import ConfigurationSource, KeyValuePairs, merge_values
+from config.common.files import PathType
+from config.errors import MissingConfigurationFileError
+
+FileState = Tuple[int, int, int]
+
+
+def _get_file_key(name: str) -> Tuple[str, ...]:
+    """
+    Returns the key described by the given file name. Nested keys are described
+    only with `__` and `:` separators, since dots are common in file names, like
+    `tls.crt` and `config.json`, which are used as they are.
+    """
+    name = name.strip("_:")
+    for token in (":", "__"):
+        if token in name:
+            return tuple(name.split(token))
+    return (name,)
+
+
+class DirectorySource(ConfigurationSource):
+    """
+    Reads values from a directory in which each file represents a key, and its
+    contents the value. File names can describe nested keys using `__` or `:`
+    separators, for example `db__password`; dots are part of keys, like in
+    `tls.crt`.
+
+    Entries whose name starts with "..", like the `..data` symlink used by
+    Kubernetes for atomic updates, are skipped. Files are read in parallel, and
+    only files whose inode, modification time, or size changed since the last read
+    are read again.
+    """
+
+    def __init__(
+        self,
+        directory_path: PathType,
+        optional: bool = False,
+        strip: bool = False,
+        encoding: str = "utf-8",
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Creates a new instance of DirectorySource for the given directory. If strip
+        is True, leading and trailing whitespace is removed from values.
+        """
+        super().__init__()
+        self.directory_path = Path(directory_path)
+        self.optional = optional
+        self.strip = strip
+        self.encoding = encoding
+        self.max_workers = max_workers
+        self._cache: Dict[str, Tuple[FileState, str]] = {}
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<DirectorySource {self.directory_path}>"
+
+    def _scan(self) -> List[Tuple[str, Path, FileState]]:
+        entries = []
+        with os.scandir(self.directory_path) as iterator:
+            for entry in iterator:
+                if entry.name.startswith(".."):
+                    continue
+                try:
+                    # follow symlinks, since Kubernetes mounts files as symlinks
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:  # pragma: no cover
+                    # the file was removed in the meantime
+                    continue
+                entries.append(
+                    (
+                        entry.name,
+                        Path(entry.path),
+                        (stat.st_ino, stat.st_mtime_ns, stat.st_size),
+                    )
+                )
+        entries.sort()
+        return entries
+
+    def _read_file(self, file_path: Path) -> str:
+        value = file_path.read_text(encoding=self.encoding)
+        return value.strip() if self.strip else value
+
+    def _read(self) -> List[Tuple[str, str]]:
+        entries = self._scan()
+        cache = self._cache
+        changed = [
+            (name, path, state)
+            for name, path, state in entries
+            if name not in cache or cache[name][0] != state
+        ]
+
+        if len(changed) > 1:
+            with ThreadPoolExecutor(
+                min(len(changed), self.max_workers or 32)
+            ) as executor:
+                values = list(
+                    executor.map(self._read_file, [path for _, path, _ in changed])
+                )
+        else:
+            values = [self._read_file(path) for _, path, _ in changed]
+
+        new_cache = {name: cache[name] for name, _, _ in entries if name in cache}
+        for (name, _, state), value in zip(changed, values):
+            new_cache[name] = (state, value)
+        self._cache = new_cache
+
+        return [(_get_file_key(name), new_cache[name][1]) for name, _, _ in entries]
+
+    def iter_values(self) -> KeyValuePairs:
+        if not self.directory_path.is_dir():
+            if self.optional:
+                return []
+            raise MissingConfigurationFileError(self.directory_path)
+
+        with self._lock:
+            return self._read()
+
+    def get_values(self) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        merge_values(values, self.iter_values())
+        return values
+
+    def get_sections(self) -> Optional[Set[str]]:
+        """
+        Returns the top-level keys described by file names, without reading files.
+        """
+        if not self.directory_path.is_dir():
+            return set() if self.optional else None
+        return {_get_file_key(name)[0] for name, _, _ in self._scan()}
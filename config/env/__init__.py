@@ -1,9 +1,9 @@
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-from config.common import ConfigurationSource
+from config.common import ConfigurationSource, KeyValuePairs, split_key
 from config.common.files import PathType
 
 
@@ -18,24 +18,64 @@ class EnvironmentVariables(ConfigurationSource):
         self.prefix = prefix
         self.strip_prefix = strip_prefix
         self._file = file
+        self._loaded_values: Dict[str, str] = {}
+
+    @property
+    def file(self) -> Optional[PathType]:
+        return self._file
+
+    def _load_file(self, file: PathType) -> None:
+        # like load_dotenv, without overriding existing environment variables;
+        # except those that were set by this source, so that changes to the file
+        # are applied when values are read again
+        loaded_values = self._loaded_values
+        for key, value in dotenv_values(file).items():
+            if value is None:
+                continue
+            current_value = os.environ.get(key)
+            if current_value is None or current_value == loaded_values.get(key):
+                os.environ[key] = value
+                loaded_values[key] = value
 
     def get_values(self) -> Dict[str, Any]:
-        if self._file:
-            load_dotenv(self._file)
+        return dict(self.iter_values())
 
-        values = {}
+    def _get_key(self, key: str) -> Optional[str]:
+        # returns the key of configuration for the given variable, or None if the
+        # variable is not handled by this source
+        key_lower = key.lower()
         prefix = self.prefix
-        strip_prefix = self.strip_prefix
         if prefix:
             prefix = prefix.lower()
-        for key, value in os.environ.items():
-            key_lower = key.lower()
-            if prefix and not key_lower.startswith(prefix):
-                continue
-            if prefix and strip_prefix:
+            if not key_lower.startswith(prefix):
+                return None
+            if self.strip_prefix:
                 key_lower = key_lower[len(prefix) :]
-            values[key_lower] = value
-        return values
+        return key_lower
+
+    def iter_values(self) -> KeyValuePairs:
+        if self._file:
+            self._load_file(self._file)
+
+        for key, value in os.environ.items():
+            key_lower = self._get_key(key)
+            if key_lower is not None:
+                yield key_lower, value
+
+    def get_sections(self) -> Optional[Set[str]]:
+        """
+        Returns the top-level keys of environment variables, reading only their
+        names. If a .env file is configured, None is returned, since variables are
+        read from the file only when values are read.
+        """
+        if self._file:
+            return None
+        sections = set()
+        for key in os.environ:
+            key_lower = self._get_key(key)
+            if key_lower is not None:
+                sections.add(split_key(key_lower)[0])
+        return sections
 
 
 EnvVars = EnvironmentVariables
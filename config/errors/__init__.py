@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import List, Tuple
 
 
 class ConfigurationError(Exception):
@@ -13,3 +14,24 @@ class MissingConfigurationFileError(ConfigurationError, FileNotFoundError):
     def __init__(self, file_path: Path) -> None:
         super().__init__(f"Missing configuration file: {file_path}")
         self.missing_file_path = file_path
+
+
+class ConfigurationInterpolationError(ConfigurationError):
+    """
+    An exception risen for invalid references in configuration values, like
+    references to missing keys or circular references.
+    """
+
+
+class ConfigurationCoercionError(ConfigurationError):
+    """
+    An exception risen when configuration values cannot be converted to the types
+    described by a schema. It describes all invalid values at once.
+    """
+
+    def __init__(self, errors: List[Tuple[str, str]]) -> None:
+        super().__init__(
+            "Invalid configuration values:\n"
+            + "\n".join(f"- {path}: {message}" for path, message in errors)
+        )
+        self.errors = errors
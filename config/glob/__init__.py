@@ -0,0 +1,152 @@
+"""
+This module provides a configuration source that reads values from all files
+matching a glob pattern, like `conf.d/*.yaml`.
+"""
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from config.common import ConfigurationSource, KeyValuePairs, merge_values
+from config.common.files import FileConfigurationSource, PathType
+from config.errors import ConfigurationError, MissingConfigurationFileError
+from config.ini import INIFile
+from config.json import JSONFile
+from config.toml import TOMLFile
+
+FileSourceFactory = Callable[[Path], FileConfigurationSource]
+
+# starting a pool of processes costs tens of milliseconds: files are parsed in
+# parallel by default only when their total size is large enough to benefit
+PARALLEL_SIZE_THRESHOLD = 1024 * 1024
+
+
+def _yaml_file(file_path: Path) -> FileConfigurationSource:
+    # PyYAML is an optional dependency
+    from config.yaml import YAMLFile
+
+    return YAMLFile(file_path)
+
+
+DEFAULT_FILE_TYPES: Dict[str, FileSourceFactory] = {
+    ".json": JSONFile,
+    ".ini": INIFile,
+    ".toml": TOMLFile,
+    ".yaml": _yaml_file,
+    ".yml": _yaml_file,
+}
+
+
+def get_default_mp_context() -> BaseContext:
+    """
+    Returns the context used to start the processes parsing files: forkserver where
+    available, otherwise spawn. The fork start method is not used, since forking a
+    process running other threads, like the threads of web servers or of
+    configuration watchers, can deadlock the child processes.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _read_file(factory: FileSourceFactory, file_path: Path) -> Dict[str, Any]:
+    return factory(file_path).read_source()
+
+
+class GlobSource(ConfigurationSource):
+    """
+    Reads values from all files matching a glob pattern, merged in the order of
+    their paths. Files are parsed using the file sources of this library, by
+    extension.
+
+    When several files are matched, and their total size is large, files are parsed
+    in a pool of processes, since parsing is CPU bound. Processes are started with
+    the forkserver or spawn methods, which import the main module of the
+    application in the child processes: like for multiprocessing, applications must
+    then build configuration inside an `if __name__ == "__main__":` block.
+    """
+
+    def __init__(
+        self,
+        pattern: PathType,
+        optional: bool = False,
+        file_types: Optional[Mapping[str, FileSourceFactory]] = None,
+        parallel: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        """
+        Creates a new instance of GlobSource for the given pattern, which supports
+        `**` to match files recursively. By default files are parsed in parallel
+        only if their total size is large, and more than one CPU is available;
+        parallel=True or parallel=False force a behavior. The multiprocessing
+        context used to start processes can be specified with mp_context.
+        """
+        super().__init__()
+        self.pattern = str(pattern)
+        self.optional = optional
+        self.file_types: Dict[str, FileSourceFactory] = dict(
+            file_types or DEFAULT_FILE_TYPES
+        )
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+
+    def __repr__(self) -> str:
+        return f"<GlobSource {self.pattern}>"
+
+    def get_files(self) -> List[Path]:
+        """
+        Returns the paths of files matching the pattern, in a deterministic order.
+        """
+        return [
+            Path(file_path)
+            for file_path in sorted(glob.glob(self.pattern, recursive=True))
+            if os.path.isfile(file_path)
+        ]
+
+    def _get_factory(self, file_path: Path) -> FileSourceFactory:
+        try:
+            return self.file_types[file_path.suffix.lower()]
+        except KeyError:
+            raise ConfigurationError(
+                f"Unsupported configuration file type: {file_path}"
+            )
+
+    def _use_processes(self, files: List[Path]) -> bool:
+        if self.parallel is not None:
+            return self.parallel and len(files) > 1
+        if len(files) < 2 or (os.cpu_count() or 1) < 2:
+            return False
+        return (
+            sum(file_path.stat().st_size for file_path in files)
+            >= PARALLEL_SIZE_THRESHOLD
+        )
+
+    def iter_values(self) -> KeyValuePairs:
+        files = self.get_files()
+
+        if not files:
+            if self.optional:
+                return
+            raise MissingConfigurationFileError(Path(self.pattern))
+
+        factories = [self._get_factory(file_path) for file_path in files]
+
+        if self._use_processes(files):
+            with ProcessPoolExecutor(
+                self.max_workers, mp_context=self.mp_context or get_default_mp_context()
+            ) as executor:
+                for values in executor.map(_read_file, factories, files):
+                    yield from values.items()
+        else:
+            for factory, file_path in zip(factories, files):
+                yield from _read_file(factory, file_path).items()
+
+    def get_values(self) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        merge_values(values, self.iter_values())
+        return values
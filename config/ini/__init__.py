@@ -1,9 +1,13 @@
 import configparser
+import re
 from collections import abc
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 
+from config.common import split_key
 from config.common.files import FileConfigurationSource
 
+_section_pattern = re.compile(r"^\s*\[(?P<header>.+)\]")
+
 
 def _develop_configparser_values(parser):
     values = {}
@@ -24,3 +28,21 @@ class INIFile(FileConfigurationSource):
         parser = configparser.ConfigParser()
         parser.read(self.file_path, encoding="utf8")
         return _develop_configparser_values(parser)
+
+    def get_sections(self) -> Optional[Set[str]]:
+        """
+        Returns the top-level keys of the sections of the INI file, reading only
+        section headers: a section like `[app:db]` describes the key `app`.
+        """
+        if not self.file_path.exists():
+            return set() if self.optional else None
+
+        sections = set()
+        with open(self.file_path, "rt", encoding="utf8") as source:
+            for line in source:
+                match = _section_pattern.match(line)
+                if match:
+                    header = match.group("header")
+                    if header != configparser.DEFAULTSECT:
+                        sections.add(split_key(header)[0])
+        return sections
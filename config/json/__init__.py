@@ -1,10 +1,38 @@
 import json
 from typing import Any, Dict
 
+from config.common import KeyValuePairs, merge_values
 from config.common.files import FileConfigurationSource
+from config.errors import ConfigurationError
 
 
 class JSONFile(FileConfigurationSource):
     def read_source(self) -> Dict[str, Any]:
         with open(self.file_path, "rt", encoding="utf-8") as source:
             return json.load(source)
+
+
+class JSONLinesFile(FileConfigurationSource):
+    """
+    Reads values from a JSON Lines (NDJSON) file, in which each line is a JSON
+    object. Lines are read one by one, and their items are merged in order, so the
+    whole file is never held in memory.
+    """
+
+    def read_source(self) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        merge_values(values, self.iter_source())
+        return values
+
+    def iter_source(self) -> KeyValuePairs:
+        with open(self.file_path, "rt", encoding="utf-8") as source:
+            for line_number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+
+                chunk = json.loads(line)
+                if not isinstance(chunk, dict):
+                    raise ConfigurationError(
+                        f"Line {line_number} of {self.file_path} is not a JSON object."
+                    )
+                yield from chunk.items()
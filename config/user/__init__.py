@@ -2,9 +2,12 @@
 This module provides support for user settings stored locally, for development, or for
 CLIs.
 """
+import os
+import re
+import stat
+from hashlib import sha1
 from pathlib import Path
-from typing import Any, Dict, Optional
-from uuid import uuid4
+from typing import Any, Dict, Optional, Tuple
 
 from config.common import ConfigurationSource
 from config.json import JSONFile
@@ -16,19 +19,114 @@ except ImportError:  # pragma: no cover
     # older Python
     import tomli as tomllib  # noqa
 
+_table_pattern = re.compile(r"^\s*\[\[?\s*([^\[\]]+?)\s*\]\]?\s*(#.*)?$")
+_name_pattern = re.compile(r"""^\s*name\s*=\s*(?:"([^"\\]*)"|'([^']*)')\s*(#.*)?$""")
 
-def get_project_name() -> str:
-    pyproject = Path("pyproject.toml").resolve()
+# project names by pyproject.toml path, with the state of the file when read
+_project_names: Dict[Path, Tuple[Tuple[int, int], Optional[str]]] = {}
 
-    if pyproject.exists():
-        with open(pyproject, "rb") as source:
-            data = tomllib.load(source)
+# pyproject.toml paths by directory, checked with a single stat when used again
+_pyproject_paths: Dict[Path, Path] = {}
+
+
+def _find_pyproject(
+    directory: Optional[Path] = None,
+) -> Optional[Tuple[Path, os.stat_result]]:
+    directory = Path.cwd() / directory if directory else Path.cwd()
+
+    pyproject = _pyproject_paths.get(directory)
+    if pyproject is not None:
         try:
-            return data["project"]["name"]
-        except KeyError:  # pragma: no cover
+            pyproject_stat = os.stat(pyproject)
+        except OSError:
             pass
+        else:
+            if stat.S_ISREG(pyproject_stat.st_mode):
+                return pyproject, pyproject_stat
+        del _pyproject_paths[directory]
+
+    resolved = directory.resolve()
+    for folder in (resolved, *resolved.parents):
+        candidate = folder / "pyproject.toml"
+        try:
+            pyproject_stat = os.stat(candidate)
+        except OSError:
+            continue
+        if stat.S_ISREG(pyproject_stat.st_mode):
+            _pyproject_paths[directory] = candidate
+            return candidate, pyproject_stat
+    return None
+
+
+def find_pyproject(directory: Optional[Path] = None) -> Optional[Path]:
+    """
+    Returns the path of the nearest `pyproject.toml` file, searching the given
+    directory (by default the current working directory) and its parents. The path
+    found is cached by directory, while it exists: a `pyproject.toml` file created
+    later in a nearer folder is found only when the cached file is removed.
+    """
+    found = _find_pyproject(directory)
+    return found[0] if found is not None else None
+
+
+def read_project_name(pyproject: Path) -> Optional[str]:
+    """
+    Reads the `name` of the `[project]` table of a pyproject.toml file, scanning
+    its lines instead of parsing the whole document. The document is parsed only
+    if the name is not written in a simple form, like `name = "example"`.
+    """
+    in_project = False
+    with open(pyproject, "rt", encoding="utf8") as source:
+        for line in source:
+            table = _table_pattern.match(line)
+            if table:
+                if in_project:
+                    break
+                in_project = table.group(1) == "project"
+                continue
+            if in_project:
+                name = _name_pattern.match(line)
+                if name:
+                    return name.group(1) if name.group(1) is not None else name.group(2)
+                if line.lstrip().startswith("name"):
+                    break
+        else:
+            if not in_project:
+                return None
+
+    # the [project] table uses a syntax not handled by the scan above
+    with open(pyproject, "rb") as source:
+        data = tomllib.load(source)
+    try:
+        return data["project"]["name"]
+    except KeyError:
+        return None
+
+
+def get_project_name(directory: Optional[Path] = None) -> str:
+    """
+    Returns the name of the project in the given directory (by default the current
+    working directory), read from the nearest `pyproject.toml` file. Names are
+    cached until pyproject files change. If a name is not found, a stable name is
+    derived from the path of the directory.
+    """
+    found = _find_pyproject(directory)
+
+    if found is not None:
+        pyproject, pyproject_stat = found
+        state = (pyproject_stat.st_mtime_ns, pyproject_stat.st_size)
+        try:
+            cached_state, name = _project_names[pyproject]
+        except KeyError:
+            cached_state, name = None, None
+        if cached_state != state:
+            name = read_project_name(pyproject)
+            _project_names[pyproject] = (state, name)
+        if name:
+            return name
 
-    return uuid4().hex
+    directory = (directory or Path.cwd()).resolve()
+    return f"{directory.name or 'root'}-{sha1(str(directory).encode()).hexdigest()[:8]}"
 
 
 class UserSettings(ConfigurationSource):
@@ -42,8 +140,8 @@ class UserSettings(ConfigurationSource):
         """
         Configures an instance of UserSettings that obtains values from a project file
         stored in the user's folder. If a project name is not provided, it is
-        automatically inferred from a `pyproject.toml` file, if present, otherwise a
-        random value is generated.
+        automatically inferred from the nearest `pyproject.toml` file, if present,
+        otherwise a stable value is derived from the current working directory.
         """
         if not project_name:
             project_name = get_project_name()
@@ -1,13 +1,33 @@
 import json
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-
-import rich_click as click
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from config.cli import click
 from config.common import apply_key_value
-from config.user import UserSettings
+from config.common.files import write_atomic
+from config.user import UserSettings, find_pyproject
+from config.user.registry import ProjectsRegistry, file_lock
+
+
+def parse_key_value_lines(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Parses lines in the form `key=value`, ignoring empty lines and comments
+    starting with `#`.
+    """
+    pairs = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, separator, value = line.partition("=")
+        key = key.strip()
+        if not separator or not key:
+            raise ValueError(f"Invalid line {number}, expected key=value: {line!r}")
+        pairs.append((key, value.strip()))
+    return pairs
 
 
 class ClickLogger:
@@ -26,21 +46,21 @@ class UserSettingsManager(UserSettings):
     ) -> None:
         super().__init__(project_name, True)
         self.logger = ClickLogger()
+        self.registry = ProjectsRegistry(self.get_base_folder())
 
     def init_project_settings(self):
         name = self.project_name
         settings_path = self.settings_file_path
 
-        if not settings_path.exists():
-            settings_path.parent.mkdir(parents=True, exist_ok=True)
-            settings_path.write_text("{}")
+        settings_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock():
+            self._create_settings_file()
 
         self.logger.info(f"Initialized project settings for: {name}")
         self.logger.debug(f"settings path: {settings_path}")
-        pyproject = Path("pyproject.toml")
 
-        if not pyproject.exists():
-            pyproject.write_text(
+        if find_pyproject() is None:
+            Path("pyproject.toml").write_text(
                 f"""
 [project]
 name = "{name}"
@@ -49,17 +69,40 @@ name = "{name}"
                 encoding="utf8",
             )
 
-    def _write_values(self, values):
-        try:
-            self.write(values)
-        except FileNotFoundError:
+    def _create_settings_file(self) -> None:
+        # must be called holding the lock, so that settings written by another
+        # process in the meantime are not overwritten
+        settings_path = self.settings_file_path
+        if not settings_path.exists():
+            write_atomic(settings_path, b"{}")
+            self.registry.update(self.project_name, settings_path)
+
+    @property
+    def lock_file_path(self) -> Path:
+        return self.settings_file_path.with_name("settings.lock")
+
+    def lock(self):
+        """
+        Acquires an exclusive advisory lock on the settings of the project, so that
+        concurrent processes updating settings do not lose each other's changes.
+        """
+        return file_lock(self.lock_file_path)
+
+    def update_values(self, update: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Reads the current settings, applies the given function to them, and writes
+        them back, in a single read-modify-write cycle protected by a lock.
+        """
+        if not self.settings_file_path.parent.exists():
             self.init_project_settings()
-            self.write(values)
+
+        with self.lock():
+            values = self.get_values()
+            if update(values) is not False:
+                self.write(values)
 
     def set_value(self, key: str, value: str):
-        values = self.get_values()
-        values = apply_key_value(values, key, value)
-        self._write_values(values)
+        self.update_values(lambda values: apply_key_value(values, key, value))
 
     def get_value(self, key: str):
         values = self.get_values()
@@ -67,9 +110,18 @@ name = "{name}"
             self.logger.info(values[key])
 
     def set_many_values(self, data):
-        values = self.get_values()
-        values.update(data)
-        self._write_values(values)
+        self.update_values(lambda values: values.update(data))
+
+    def set_key_values(self, pairs: Iterable[Tuple[str, str]]):
+        """
+        Sets many values by key, in a single read-modify-write cycle.
+        """
+
+        def update(values):
+            for key, value in pairs:
+                apply_key_value(values, key, value)
+
+        self.update_values(update)
 
     def show_settings(self):
         values = self.get_values()
@@ -81,32 +133,48 @@ name = "{name}"
         if not self.settings_file_path.exists():
             self.logger.info("There are no settings configured.")
             return
-        values = self.get_values()
-        try:
-            del values[key]
-        except KeyError:
-            pass
-        else:
-            self.write(values)
+
+        def update(values):
+            try:
+                del values[key]
+            except KeyError:
+                return False
+
+        self.update_values(update)
 
     def write(self, values):
-        self.settings_file_path.write_text(
-            json.dumps(values, indent=4, ensure_ascii=False, sort_keys=True),
-            encoding="utf8",
+        """
+        Writes the given values to the settings file atomically, and updates the
+        index of projects.
+        """
+        write_atomic(
+            self.settings_file_path,
+            json.dumps(values, indent=4, ensure_ascii=False, sort_keys=True).encode(
+                "utf8"
+            ),
         )
+        self.registry.update(self.project_name, self.settings_file_path)
         self.logger.debug(f"Updated file: {self.settings_file_path}")
 
-    def list_projects(self):
-        try:
-            for child in self.get_base_folder().iterdir():
-                if child.is_dir():
-                    self.logger.info(child.name)
-        except FileNotFoundError:  # pragma: no cover
+    def list_projects(self, refresh: bool = False):
+        if refresh:
+            self.registry.rebuild()
+
+        projects = self.registry.list_projects()
+        if not projects:
             self.logger.info("There are no settings configured.")
+        for name in projects:
+            self.logger.info(name)
 
     def show_info(self):
         if self.settings_file_path.exists():
             self.logger.info(f"settings are stored at: {self.settings_file_path}")
+            project = self.registry.get_project(self.project_name)
+            if project and project["modified"] is not None:
+                modified = datetime.fromtimestamp(project["modified"])
+                self.logger.debug(
+                    f"size: {project['size']} bytes, last modified: {modified}"
+                )
         else:
             self.logger.info("There is no settings file configured.")
 
@@ -185,6 +253,31 @@ def set_many_values(file, project: Optional[str]):
     UserSettingsManager(project).set_many_values(data)
 
 
+@click.command(name="set-batch")
+@click.option("--file", help="Input file", type=click.File("r"), default="-")
+@click.option("--project", "-p", required=False)
+def set_batch_values(file, project: Optional[str]):
+    """
+    Set many settings, read as key=value lines from a file or from stdin, in a
+    single update. Empty lines and lines starting with # are ignored.
+    If a project name is specified, it is used, otherwise a value is obtained
+    from a `pyproject.toml` file, or generated.
+
+    Examples:
+
+    config settings set-batch --file example.env
+
+    printf "a=1\\nb.c=2\\n" | config settings set-batch
+    """
+    with file:
+        try:
+            pairs = parse_key_value_lines(file)
+        except ValueError as value_error:
+            raise click.ClickException(str(value_error))
+
+    UserSettingsManager(project).set_key_values(pairs)
+
+
 @click.command(name="del")
 @click.argument("key")
 @click.option("--project", "-p", required=False)
@@ -205,11 +298,17 @@ def show_settings(project: Optional[str]):
 
 
 @click.command(name="list")
-def list_groups():
+@click.option(
+    "--refresh",
+    default=False,
+    is_flag=True,
+    help="Rebuild the index of projects scanning the user folder.",
+)
+def list_groups(refresh: bool):
     """
     List all projects configured for settings stored in the user folder.
     """
-    UserSettingsManager(None).list_projects()
+    UserSettingsManager(None).list_projects(refresh)
 
 
 @click.command(name="info")
@@ -225,6 +324,7 @@ settings.add_command(init_settings)
 settings.add_command(get_value)
 settings.add_command(set_value)
 settings.add_command(set_many_values)
+settings.add_command(set_batch_values)
 settings.add_command(del_value)
 settings.add_command(show_settings)
 settings.add_command(list_groups)
@@ -0,0 +1,140 @@
+"""
+This module provides an index of the projects having user settings, kept up to
+date when settings are written, so that projects can be listed and looked up
+reading a single file instead of scanning the folder of user settings.
+"""
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.common.files import write_atomic
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Windows
+    fcntl = None  # type: ignore
+
+
+@contextmanager
+def file_lock(lock_file_path: Path) -> Iterator[None]:
+    """
+    Acquires an exclusive advisory lock using the given lock file. On platforms
+    not supporting fcntl, the lock is not acquired.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+
+    with open(lock_file_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class ProjectsRegistry:
+    """
+    An index of the projects having user settings, stored in an `index.json` file
+    in the folder of user settings. For each project, it describes the path, the
+    size and the last modification time of its settings file.
+
+    If the index does not exist, it is created scanning the folder of user settings
+    once; it can be rebuilt at any time with the rebuild method, for example after
+    projects are deleted manually.
+    """
+
+    index_file_name = "index.json"
+
+    def __init__(self, base_folder: Path) -> None:
+        self.base_folder = base_folder
+
+    @property
+    def index_file_path(self) -> Path:
+        return self.base_folder / self.index_file_name
+
+    @property
+    def lock_file_path(self) -> Path:
+        return self.base_folder / "index.lock"
+
+    def _read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.index_file_path, "rt", encoding="utf8") as index_file:
+                data = json.load(index_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        return data.get("projects") if isinstance(data, dict) else None
+
+    def _write(self, projects: Dict[str, Dict[str, Any]]) -> None:
+        write_atomic(
+            self.index_file_path,
+            json.dumps({"projects": projects}, indent=4, sort_keys=True).encode("utf8"),
+        )
+
+    def _scan(self) -> Dict[str, Dict[str, Any]]:
+        projects = {}
+        try:
+            children = list(self.base_folder.iterdir())
+        except FileNotFoundError:
+            return {}
+        for child in children:
+            if child.is_dir():
+                projects[child.name] = self._describe(child / "settings.json")
+        return projects
+
+    @staticmethod
+    def _describe(settings_file_path: Path) -> Dict[str, Any]:
+        try:
+            stat = os.stat(settings_file_path)
+        except FileNotFoundError:
+            size, modified = 0, None
+        else:
+            size, modified = stat.st_size, stat.st_mtime
+        return {"path": str(settings_file_path), "size": size, "modified": modified}
+
+    def get_projects(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the description of all projects, by name.
+        """
+        projects = self._read()
+        if projects is None:
+            projects = self.rebuild()
+        return projects
+
+    def get_project(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the description of the project with the given name, if any.
+        """
+        return self.get_projects().get(name)
+
+    def list_projects(self) -> List[str]:
+        """
+        Returns the names of all projects, sorted.
+        """
+        return sorted(self.get_projects())
+
+    def rebuild(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuilds the index scanning the folder of user settings.
+        """
+        if not self.base_folder.exists():
+            return {}
+        with file_lock(self.lock_file_path):
+            projects = self._scan()
+            self._write(projects)
+        return projects
+
+    def update(self, name: str, settings_file_path: Path) -> None:
+        """
+        Updates the description of the project with the given name.
+        """
+        self.base_folder.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_file_path):
+            projects = self._read()
+            if projects is None:
+                projects = self._scan()
+            projects[name] = self._describe(settings_file_path)
+            self._write(projects)
@@ -1,14 +1,18 @@
 import json
 import os
+import subprocess
+import sys
 import tempfile
 from contextlib import contextmanager
 from pathlib import Path
+from threading import Thread
 from uuid import uuid4
 
 import pytest
 from click.testing import CliRunner
 
 from config.cli.main import main
+from config.user.cli import UserSettingsManager
 
 
 @contextmanager
@@ -118,6 +122,21 @@ def test_list_groups():
     assert result.exit_code == 0
 
 
+def test_list_groups_includes_written_projects():
+    test_id = uuid4().hex
+    runner = CliRunner()
+    result = runner.invoke(main, ["settings", "set", "a", "1", "-p", test_id])
+    assert result.exit_code == 0
+
+    result = runner.invoke(main, ["settings", "list"])
+    assert result.exit_code == 0
+    assert test_id in result.output.splitlines()
+
+    result = runner.invoke(main, ["settings", "list", "--refresh"])
+    assert result.exit_code == 0
+    assert test_id in result.output.splitlines()
+
+
 def test_set_many_settings_main():
     runner = CliRunner()
     result = runner.invoke(main, ["settings", "set-many"])
@@ -236,3 +255,146 @@ def test_set_many_settings_show_settings_auto_project():
         assert result.exit_code == 0
         data = json.loads(result.output)
         assert data == initial_data
+
+
+def test_set_batch_settings_from_stdin():
+    test_id = uuid4().hex
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["settings", "set-batch", "-p", test_id],
+        input="# comment\nFoo=FOO\n\nsource.one = foo\nsource__two=a=b\n",
+    )
+    assert result.exit_code == 0
+
+    result = runner.invoke(main, ["settings", "show", "-p", test_id])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data == {"Foo": "FOO", "source": {"one": "foo", "two": "a=b"}}
+
+
+def test_set_batch_settings_from_file():
+    with temp_dir() as folder:
+        source = folder / "source.env"
+        source.write_text("A=1\nB.C=2\n", encoding="utf8")
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["settings", "set-batch", "--file", "source.env"])
+        assert result.exit_code == 0
+
+        result = runner.invoke(main, ["settings", "show"])
+        data = json.loads(result.output)
+        assert data == {"A": "1", "B": {"C": "2"}}
+
+
+def test_set_batch_settings_invalid_line():
+    test_id = uuid4().hex
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["settings", "set-batch", "-p", test_id], input="A=1\nB\n"
+    )
+    assert result.exit_code == 1
+    assert "Invalid line 2" in result.output
+
+    result = runner.invoke(main, ["settings", "info", "-p", test_id])
+    assert result.output == "There is no settings file configured.\n"
+
+
+def test_concurrent_updates_are_not_lost():
+    manager = UserSettingsManager(uuid4().hex)
+    manager.init_project_settings()
+
+    def set_values(index: int):
+        for count in range(5):
+            UserSettingsManager(manager.project_name).set_value(
+                f"key{index}.value{count}", str(count)
+            )
+
+    threads = [Thread(target=set_values, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    values = manager.get_values()
+    assert len(values) == 8
+    assert all(len(values[f"key{index}"]) == 5 for index in range(8))
+
+    # temporary files are replaced atomically
+    assert [
+        path.name for path in manager.settings_file_path.parent.iterdir()
+    ] == sorted(["settings.json", "settings.lock"])
+
+
+def test_concurrent_updates_on_first_use_are_not_lost():
+    project_name = uuid4().hex
+
+    def set_value(index: int):
+        UserSettingsManager(project_name).set_value(f"key{index}", str(index))
+
+    threads = [Thread(target=set_value, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(UserSettingsManager(project_name).get_values()) == 8
+
+
+def test_settings_set_value_in_project_subdirectory():
+    with temp_dir() as temp_dirname:
+        (temp_dirname / "pyproject.toml").write_text(
+            '[project]\nname = "example"\n', encoding="utf8"
+        )
+        subdirectory = temp_dirname / "src"
+        subdirectory.mkdir()
+        os.chdir(subdirectory)
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["settings", "set", "Foo", "FOO"])
+
+        assert result.exit_code == 0
+        assert not (subdirectory / "pyproject.toml").exists()
+
+
+def _run_python(code: str, **env) -> str:
+    process_env = {**os.environ, **env}
+    process_env.pop("EC_RICH", None)
+    process_env.update(env)
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        env=process_env,
+        cwd=str(Path(__file__).parent.parent),
+    ).stdout.decode("utf8")
+
+
+def test_main_import_does_not_load_commands_or_rich():
+    # regression test for the start-up time of the CLI: the entry point must not
+    # import command modules nor rich, which take most of the import time
+    output = _run_python(
+        "import sys, json\n"
+        "import config.cli.main\n"
+        "print(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('rich', 'rich_click', 'deepmerge', 'config'))))"
+    )
+    assert json.loads(output) == ["config", "config.cli", "config.cli.main"]
+
+
+def test_commands_do_not_load_rich_when_output_is_not_a_tty():
+    output = _run_python(
+        "import sys\n"
+        "from config.cli.main import main\n"
+        "main(['settings', 'info', '-p', 'example'], standalone_mode=False)\n"
+        "print('config.user.cli' in sys.modules, 'rich' in sys.modules)"
+    )
+    assert output.splitlines()[-1] == "True False"
+
+
+def test_rich_output_can_be_forced():
+    output = _run_python(
+        "import sys\n" "import config.cli.main\n" "print('rich_click' in sys.modules)",
+        EC_RICH="1",
+    )
+    assert output.strip() == "True"
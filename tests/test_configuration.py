@@ -1,4 +1,8 @@
+import copy
+import json
 import os
+from array import array
+from random import Random
 from typing import Any, Dict
 from uuid import uuid4
 
@@ -7,13 +11,26 @@ import pytest
 from config.common import (
     Configuration,
     ConfigurationBuilder,
+    ConfigurationSequence,
     ConfigurationSource,
+    ImmutableMapping,
     MapSource,
+    apply_key_value,
+    merge_values,
 )
+from config.common.compact import CompactMapping, compact
+from config.common.frozen import FrozenMapping, freeze_configuration, freeze_values
+from config.common.interpolation import Interpolator
+from config.common.merging import MergeStrategies, UnionByKey
+from config.common.provider import ConfigurationProvider
 from config.env import EnvVars
-from config.errors import ConfigurationOverrideError
+from config.errors import (
+    ConfigurationError,
+    ConfigurationInterpolationError,
+    ConfigurationOverrideError,
+)
 from config.ini import INIFile
-from config.json import JSONFile
+from config.json import JSONFile, JSONLinesFile
 from config.toml import TOMLFile
 from config.yaml import YAMLFile
 
@@ -329,7 +346,13 @@ def test_configuration_builder_repr():
 
 @pytest.mark.parametrize(
     "source",
-    [INIFile("noop.no"), YAMLFile("noop.no"), JSONFile("noop.no"), TOMLFile("noop.no")],
+    [
+        INIFile("noop.no"),
+        YAMLFile("noop.no"),
+        JSONFile("noop.no"),
+        TOMLFile("noop.no"),
+        JSONLinesFile("noop.no"),
+    ],
 )
 def test_file_source_raises_for_missing_file(source):
     builder = ConfigurationBuilder(source)
@@ -340,7 +363,13 @@ def test_file_source_raises_for_missing_file(source):
 
 @pytest.mark.parametrize(
     "source",
-    [INIFile("noop.no"), YAMLFile("noop.no"), JSONFile("noop.no"), TOMLFile("noop.no")],
+    [
+        INIFile("noop.no"),
+        YAMLFile("noop.no"),
+        JSONFile("noop.no"),
+        TOMLFile("noop.no"),
+        JSONLinesFile("noop.no"),
+    ],
 )
 def test_optional_file_source_does_not_raise_for_missing_file(source):
     source.optional = True
@@ -392,3 +421,858 @@ def test_deep_merges_of_mappings():
     assert config.a.b.c == 100
     assert config.a.b.d == 200
     assert config.a2 == "oof"
+
+
+def test_configuration_provider_reload_publishes_new_snapshot():
+    source = MapSource({"a": 1})
+    builder = ConfigurationBuilder(source)
+    provider = ConfigurationProvider(builder)
+
+    snapshot = provider.configuration
+    assert snapshot.a == 1
+    assert provider.version == 1
+
+    source._values["a"] = 2
+    new_snapshot = provider.reload()
+
+    assert new_snapshot is provider.get()
+    assert provider.configuration.a == 2
+    assert provider.version == 2
+    # the previous snapshot is not modified
+    assert snapshot.a == 1
+
+
+def test_configuration_provider_reload_with_nested_defaults(tmp_path):
+    file_path = tmp_path / "settings.json"
+    file_path.write_text(json.dumps({"app": {"b": 2, "hosts": ["x"]}}))
+    defaults = {"app": {"a": 1, "hosts": ["default"], "db": {"host": "h"}}}
+    builder = ConfigurationBuilder(
+        MapSource(defaults), JSONFile(file_path), MapSource({"app__db__port": 1})
+    )
+    provider = ConfigurationProvider(builder)
+    snapshot = provider.configuration
+
+    file_path.write_text(json.dumps({"app": {"hosts": ["y"]}}))
+    config = provider.reload()
+
+    assert config.app.values == {
+        "a": 1,
+        "hosts": ["default", "y"],
+        "db": {"host": "h", "port": 1},
+    }
+    # the previous snapshot and the values of sources are not modified
+    assert snapshot.app.values == {
+        "a": 1,
+        "b": 2,
+        "hosts": ["default", "x"],
+        "db": {"host": "h", "port": 1},
+    }
+    assert defaults == {"app": {"a": 1, "hosts": ["default"], "db": {"host": "h"}}}
+
+
+def test_configuration_provider_keeps_snapshot_if_reload_fails():
+    builder = ConfigurationBuilder(MapSource({"a": "Hello"}))
+    provider = ConfigurationProvider(builder)
+    snapshot = provider.configuration
+
+    builder.add_map({"a:b:c": "Hello World"})
+
+    with pytest.raises(ConfigurationOverrideError):
+        provider.reload()
+
+    assert provider.configuration is snapshot
+    assert provider.version == 1
+
+
+def test_configuration_provider_publish():
+    provider = ConfigurationProvider(ConfigurationBuilder(), Configuration({"a": True}))
+    assert provider.configuration.a is True
+
+    provider.publish(Configuration({"a": False}))
+    assert provider.configuration.a is False
+    assert repr(provider) == "<ConfigurationProvider version=2>"
+
+
+def test_configuration_accessor():
+    config = Configuration(
+        {
+            "limits": {"per_tenant": {"rps": 100}},
+            "servers": [{"port": 80}, {"port": 443}],
+            "tags": ["a", "b"],
+        }
+    )
+
+    rps = config.accessor("limits.per_tenant.rps")
+    assert rps() == 100
+    assert repr(rps) == "<Accessor 'limits.per_tenant.rps'>"
+    assert config.accessor("limits:per_tenant:rps")() == 100
+    assert config.accessor("servers.1.port")() == 443
+    assert config.accessor("tags.-1")() == "b"
+    assert config.accessor("limits.per_tenant")().rps == 100
+    assert config.accessor("tags")() == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "path", ["missing", "limits.missing", "limits.rps.value", "tags.5", "tags.x"]
+)
+def test_configuration_accessor_missing_path(path):
+    config = Configuration({"limits": {"rps": 100}, "tags": ["a"]})
+
+    with pytest.raises(KeyError):
+        config.accessor(path)()
+
+    assert config.accessor(path, None)() is None
+    assert config.accessor(path, default=10)() == 10
+
+
+def test_configuration_accessor_compact():
+    config = Configuration(compact({"limits": {"rps": 100, "ports": [80, 443]}}))
+
+    assert config.accessor("limits.rps")() == 100
+    assert config.accessor("limits.ports.1")() == 443
+
+
+def test_configuration_provider_accessor_reads_latest_snapshot():
+    source = MapSource({"limits": {"rps": 100}})
+    provider = ConfigurationProvider(ConfigurationBuilder(source))
+    rps = provider.accessor("limits.rps")
+
+    assert rps() == 100
+
+    source._values["limits"]["rps"] = 200
+    provider.reload()
+
+    assert rps() == 200
+    assert repr(rps) == "<ProviderAccessor 'limits.rps'>"
+
+
+def test_interpolation_of_references():
+    os.environ["EC_TEST_INTERPOLATION"] = "from-env"
+    source = MapSource(
+        {
+            "host": "example.com",
+            "port": 8080,
+            "url": "https://${host}:${port}/${path}",
+            "path": "api",
+            "server": {"port": "${port}", "name": "${env:EC_TEST_INTERPOLATION}"},
+            "items": [{"url": "${url}/items"}],
+            "copy": "${server}",
+            "literal": "$${host}",
+        }
+    )
+    builder = ConfigurationBuilder(source, interpolate=True)
+
+    config = builder.build()
+
+    assert config.url == "https://example.com:8080/api"
+    assert config.server.port == 8080
+    assert config.server.name == "from-env"
+    assert config.items[0].url == "https://example.com:8080/api/items"
+    assert config.copy.values == {"port": 8080, "name": "from-env"}
+    assert config.literal == "${host}"
+
+    # values of sources are not modified
+    assert source.get_values()["server"]["port"] == "${port}"
+    assert source.get_values()["items"][0]["url"] == "${url}/items"
+
+
+def test_interpolation_is_disabled_by_default():
+    config = ConfigurationBuilder(MapSource({"a": "${b}", "b": 1})).build()
+
+    assert config.a == "${b}"
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {"a": "${b}", "b": "${c}", "c": "${a}"},
+        {"a": "${a}"},
+        {"a": {"b": "${a}"}},
+        {"a": "${missing}"},
+        {"a": "${b.c}", "b": 1},
+        {"a": "${env:EC_TEST_MISSING_VARIABLE}"},
+        {"a": "${}"},
+    ],
+)
+def test_interpolation_raises_for_invalid_references(values):
+    builder = ConfigurationBuilder(MapSource(values), interpolate=True)
+
+    with pytest.raises(ConfigurationInterpolationError):
+        builder.build()
+
+
+def test_interpolation_resolves_each_value_once():
+    values = {"base": "x", "items": [f"${{base}}-{i}" for i in range(100)]}
+    interpolator = Interpolator(values)
+
+    assert interpolator.references_count == 100
+    interpolator.resolve()
+    assert values["items"][99] == "x-99"
+
+
+def test_interpolation_of_references_to_list_items():
+    builder = ConfigurationBuilder(
+        MapSource({"a": ["${b}", "${a.0}!"], "b": "B", "c": "${a.1}"}),
+        interpolate=True,
+    )
+
+    config = builder.build()
+
+    assert config.a == ["B", "B!"]
+    assert config.c == "B!"
+
+
+def test_interpolation_of_references_to_subtrees_defined_later():
+    builder = ConfigurationBuilder(interpolate=True)
+    builder.add_map({"d": "${a}", "a": {"b": "${c}", "e": ["${c}"]}, "c": 1})
+
+    config = builder.build()
+
+    assert config.a.values == {"b": 1, "e": [1]}
+    assert config.d.values == {"b": 1, "e": [1]}
+
+
+def test_compact_configuration():
+    values = {
+        "tenants": {
+            f"tenant-{index}": {
+                "limits": {"rps": 100, "enabled": True},
+                "ports": [8000, 8001],
+                "weights": [0.5, 1.5],
+                "flags": [True, False],
+                "routes": [{"path": "/api"}, {"path": "/health"}],
+            }
+            for index in range(20)
+        },
+        "name": "example",
+    }
+    builder = ConfigurationBuilder(MapSource(values), compact=True)
+
+    config = builder.build()
+
+    assert isinstance(config.values["tenants"], ImmutableMapping)
+    assert config.name == "example"
+    assert config["tenants"]["tenant-1"].limits.rps == 100
+    assert config.tenants["tenant-1"].limits.enabled is True
+    assert config.tenants["tenant-1"].ports == [8000, 8001]
+    assert config.tenants["tenant-1"].weights == [0.5, 1.5]
+    assert config.tenants["tenant-1"].flags == [True, False]
+    assert config.tenants["tenant-1"].routes[1].path == "/health"
+    assert "tenant-19" in config.tenants
+    assert len(config.values["tenants"]) == 20
+    assert config.values["tenants"]["tenant-0"]["limits"] == {
+        "rps": 100,
+        "enabled": True,
+    }
+
+    tenant = config.values["tenants"]["tenant-1"]
+    assert isinstance(tenant, CompactMapping)
+    assert isinstance(tenant["ports"], array)
+    assert isinstance(tenant["flags"], tuple)
+    # identical subtrees are stored only once
+    assert tenant is config.values["tenants"]["tenant-2"]
+
+
+def test_compact_does_not_share_values_of_different_types():
+    values = compact({"a": {"x": 1}, "b": {"x": True}, "c": {"x": 1.0}})
+
+    assert type(values["a"]["x"]) is int and values["a"]["x"] == 1
+    assert values["b"]["x"] is True
+    assert type(values["c"]["x"]) is float
+
+
+def test_compact_mapping_raises_key_error():
+    values = compact({"a": 1})
+
+    with pytest.raises(KeyError):
+        values["b"]
+    assert repr(values) == "<CompactMapping {'a': 1}>"
+
+
+def test_frozen_configuration():
+    values = {
+        "app": {"name": "example", "ports": [80, 443], "tags": {"a", "b"}},
+        "tenants": [{"id": 1, "limits": {"rps": 100}}, {"id": 2}],
+    }
+    builder = ConfigurationBuilder(MapSource(values), frozen=True)
+
+    config = builder.build()
+
+    assert config.app.name == "example"
+    assert config.app.ports == [80, 443]
+    assert config.tenants[0].limits.rps == 100
+
+    frozen_values = config.values
+    assert isinstance(frozen_values, FrozenMapping)
+    assert isinstance(frozen_values["app"]["ports"], tuple)
+    assert frozen_values["app"]["tags"] == frozenset({"a", "b"})
+    # frozen values are not copied
+    assert config.values is frozen_values
+    assert config.app.values is frozen_values["app"]
+
+    with pytest.raises(TypeError):
+        frozen_values["app"]["name"] = "other"  # type: ignore
+
+    # values are not aliased with the values of sources
+    values["app"]["ports"].append(8080)
+    assert config.app.ports == [80, 443]
+
+
+def test_frozen_mapping_hash_and_equality():
+    config = ConfigurationBuilder(
+        MapSource({"a": {"x": 1, "y": [1, 2]}, "b": {"y": [1, 2], "x": 1}}),
+        frozen=True,
+    ).build()
+    a, b = config.values["a"], config.values["b"]
+
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a == {"x": 1, "y": (1, 2)}
+    assert {"x": 1, "y": (1, 2)} == a
+    assert a != {"x": 2, "y": (1, 2)}
+    assert a != FrozenMapping({"x": 2})
+    assert len({a: 1, b: 2}) == 1
+    assert repr(FrozenMapping({"x": 1})) == "<FrozenMapping {'x': 1}>"
+    assert (
+        config.fingerprint()
+        == Configuration(
+            {"a": {"x": 1, "y": [1, 2]}, "b": {"y": [1, 2], "x": 1}}
+        ).fingerprint()
+    )
+
+
+def test_freeze_values():
+    frozen = freeze_values({"a": [{"b": 1}], "c": "text"})
+
+    assert freeze_values(frozen) is frozen
+    assert frozen == {"a": (FrozenMapping({"b": 1}),), "c": "text"}
+    assert freeze_configuration(Configuration({"a": 1})).values == {"a": 1}
+
+
+def test_frozen_configuration_bind():
+    config = ConfigurationBuilder(
+        MapSource({"app": {"name": "example", "ports": [80, 443]}}), frozen=True
+    ).build()
+
+    assert config.bind(dict, "app") == {"name": "example", "ports": [80, 443]}
+
+
+def test_frozen_configuration_does_not_modify_sources():
+    first = MapSource({"a": {"l": [1]}})
+    second = MapSource({"a": {"l": [2]}})
+    builder = ConfigurationBuilder(first, second, frozen=True)
+
+    for _ in range(3):
+        assert builder.build().a.l == (1, 2)
+
+    assert first.get_values() == {"a": {"l": [1]}}
+    assert second.get_values() == {"a": {"l": [2]}}
+
+
+def test_frozen_and_compact_cannot_be_combined():
+    with pytest.raises(ValueError):
+        ConfigurationBuilder(compact=True, frozen=True)
+
+
+def test_list_of_falsy_values():
+    config = Configuration({"items": [0, "", False, [], None]})
+
+    assert config.items == [0, "", False, [], None]
+
+
+def test_list_items_are_wrapped_lazily():
+    config = Configuration(
+        {"endpoints": [{"url": f"https://{index}.example.com"} for index in range(100)]}
+    )
+
+    endpoints = config.endpoints
+
+    assert isinstance(endpoints, ConfigurationSequence)
+    assert len(endpoints) == 100
+    assert endpoints._cache == {}
+
+    assert endpoints[5].url == "https://5.example.com"
+    assert endpoints[5] is endpoints[5]
+    assert endpoints[-1] is endpoints[99]
+    assert list(endpoints._cache) == [5, 99]
+
+
+def test_list_view_slicing_and_iteration():
+    config = Configuration({"items": [{"id": 1}, {"id": 2}, {"id": 3}], "ids": [1, 2]})
+
+    sliced = config.items[1:]
+    assert isinstance(sliced, ConfigurationSequence)
+    assert sliced._cache == {}
+    assert [item.id for item in sliced] == [2, 3]
+
+    assert config.ids == [1, 2]
+    assert config.ids == (1, 2)
+    assert config.ids != [1, 2, 3]
+    assert config.ids == config.ids
+    assert 2 in config.ids
+    assert repr(config.ids) == "[1, 2]"
+
+    with pytest.raises(IndexError):
+        config.ids[2]
+
+
+class StreamingSource(ConfigurationSource):
+    def __init__(self, pairs) -> None:
+        self.pairs = pairs
+
+    def get_values(self) -> Dict[str, Any]:  # pragma: no cover
+        raise AssertionError("Values should be streamed")
+
+    def iter_values(self):
+        yield from self.pairs
+
+
+def test_builder_consumes_streaming_sources():
+    builder = ConfigurationBuilder(
+        MapSource({"a": {"b": 1}, "items": [{"id": 1}]}),
+        StreamingSource(
+            [("a", {"c": 2}), ("a:d", 3), ("items:0:id", 10), ("a", {"c": 4})]
+        ),
+    )
+
+    config = builder.build()
+
+    assert config.values == {"a": {"b": 1, "c": 4, "d": 3}, "items": [{"id": 10}]}
+
+
+def test_merge_values_accepts_key_value_pairs():
+    values: Dict[str, Any] = {}
+    merge_values(values, iter([("a__b", 1), ("c", 2)]))
+
+    assert values == {"a": {"b": 1}, "c": 2}
+
+
+def _apply_one_by_one(values, pairs):
+    for key, value in pairs:
+        apply_key_value(values, key, value)
+
+
+def _get_random_pairs(random: Random, count: int):
+    parts = ["a", "b", "c", "0", "1", "items"]
+    separators = ["__", ".", ":"]
+    values = [1, "x", None, [1, 2], {"a": 1}, {"b": {"c": 2}}, [{"a": 1}]]
+    pairs = []
+    for _ in range(count):
+        key = random.choice(separators).join(
+            random.choice(parts) for _ in range(random.randint(1, 4))
+        )
+        pairs.append((key, copy.deepcopy(random.choice(values))))
+    return pairs
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_merge_values_matches_applying_keys_one_by_one(seed):
+    random = Random(seed)
+    initial = {"items": [{"a": 1}, {"b": 2}], "a": {"b": {"c": 1}}}
+    pairs = _get_random_pairs(random, random.randint(1, 200))
+
+    expected: Dict[str, Any] = copy.deepcopy(initial)
+    try:
+        _apply_one_by_one(expected, copy.deepcopy(pairs))
+    except Exception as error:
+        expected_error: Any = type(error)
+    else:
+        expected_error = None
+
+    values: Dict[str, Any] = copy.deepcopy(initial)
+    if expected_error is not None:
+        with pytest.raises(expected_error):
+            merge_values(values, copy.deepcopy(pairs))
+    else:
+        merge_values(values, copy.deepcopy(pairs))
+        assert values == expected
+        assert json.dumps(values) == json.dumps(expected)
+
+
+def _get_random_tree_pairs(random: Random, count: int):
+    # keys of leaves of a random tree, sharing their paths, so that most pairs are
+    # merged without conflicts
+    separators = ["__", ".", ":"]
+    leaves = []
+
+    def visit(path, depth):
+        if path == ["items"]:
+            names = ["0", "1"]
+        else:
+            names = random.sample(["a", "b", "c", "d", "0", "1"], random.randint(1, 4))
+        for name in names:
+            if depth == 0 or random.random() < 0.3:
+                leaves.append(path + [name])
+            else:
+                visit(path + [name], depth - 1)
+
+    for root in ["items", "a", "new"]:
+        visit([root], 3)
+
+    pairs = []
+    for _ in range(count):
+        value = random.choice([1, "x", None, [1, 2], {"a": 1}])
+        key = random.choice(separators).join(random.choice(leaves))
+        pairs.append((key, copy.deepcopy(value)))
+    return pairs
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_merge_values_shared_paths_match_applying_keys_one_by_one(seed):
+    random = Random(seed)
+    pairs = _get_random_tree_pairs(random, random.randint(1, 200))
+    initial = {"items": [{"a": 1}, {"b": 2}], "a": {"b": {"c": 1}}}
+
+    expected: Dict[str, Any] = copy.deepcopy(initial)
+    try:
+        _apply_one_by_one(expected, copy.deepcopy(pairs))
+    except ConfigurationOverrideError:
+        with pytest.raises(ConfigurationOverrideError):
+            merge_values(copy.deepcopy(initial), copy.deepcopy(pairs))
+    else:
+        values: Dict[str, Any] = copy.deepcopy(initial)
+        merge_values(values, copy.deepcopy(pairs))
+        assert json.dumps(values) == json.dumps(expected)
+
+
+def test_merge_values_shared_paths():
+    pairs = [
+        (f"app__tenants__{tenant}__limits__{name}", index)
+        for tenant in range(50)
+        for index, name in enumerate(["rps", "burst", "connections"])
+    ]
+    pairs.append(("app__name", "example"))
+    values: Dict[str, Any] = {"app": {"tenants": {"0": {"limits": {"rps": 0}}}}}
+
+    merge_values(values, iter(pairs))
+
+    assert values["app"]["name"] == "example"
+    assert len(values["app"]["tenants"]) == 50
+    assert values["app"]["tenants"]["49"] == {
+        "limits": {"rps": 0, "burst": 1, "connections": 2}
+    }
+
+
+def test_merge_values_shared_paths_override_errors():
+    pairs = [(f"a__{index}", index) for index in range(10)]
+    pairs.append(("a__0__b", 1))
+
+    with pytest.raises(ConfigurationOverrideError):
+        merge_values({}, pairs)
+
+
+def test_merge_values_object_after_nested_keys():
+    pairs = [(f"a__b{index}", index) for index in range(10)]
+    pairs.append(("a", {"b0": "last"}))
+    pairs.append(("a__b2", "after"))
+    values: Dict[str, Any] = {}
+
+    merge_values(values, pairs)
+
+    assert values["a"]["b0"] == "last"
+    assert values["a"]["b1"] == 1
+    assert values["a"]["b2"] == "after"
+
+
+def test_merge_values_keys_as_tuples_of_parts():
+    values: Dict[str, Any] = {}
+
+    merge_values(values, [(("certs", "tls.crt"), 1), (("a.b",), 2), ("certs__x", 3)])
+    apply_key_value(values, ("certs", "ca.crt"), 4)
+
+    assert values == {"certs": {"tls.crt": 1, "x": 3, "ca.crt": 4}, "a.b": 2}
+
+
+def test_merge_values_replaced_path():
+    values: Dict[str, Any] = {"items": [{"a": 1}]}
+
+    merge_values(
+        values, [("items__0__a", 2), ("items", [{"b": 3}]), ("items__1__b", 4)]
+    )
+
+    assert values == {"items": [{"a": 2}, {"b": 4}]}
+
+    with pytest.raises(ConfigurationOverrideError):
+        merge_values({}, [("a__b__c", 1), ("a__b", 2), ("a__b__d", 3)])
+
+
+def test_json_lines_file(tmp_path):
+    file_path = tmp_path / "settings.ndjson"
+    file_path.write_text(
+        '{"a": {"b": 1}, "c": "hello"}\n\n{"a:d": 2}\n{"a": {"b": 3}}\n',
+        encoding="utf8",
+    )
+    source = JSONLinesFile(file_path)
+
+    config = ConfigurationBuilder(source).build()
+
+    assert config.values == {"a": {"b": 3, "d": 2}, "c": "hello"}
+    assert source.get_values() == config.values
+
+
+def test_json_lines_file_raises_for_invalid_lines(tmp_path):
+    file_path = tmp_path / "settings.ndjson"
+    file_path.write_text('{"a": 1}\n[1, 2]\n', encoding="utf8")
+
+    with pytest.raises(ConfigurationError):
+        ConfigurationBuilder(JSONLinesFile(file_path)).build()
+
+
+def test_environment_variables_iter_values():
+    prefix = str(uuid4())
+    os.environ[f"{prefix}_a__b"] = "1"
+
+    pairs = list(EnvVars(f"{prefix}_").iter_values())
+
+    assert pairs == [("a__b", "1")]
+
+
+def test_lists_are_appended_by_default():
+    builder = ConfigurationBuilder(
+        MapSource({"hosts": ["a", "b"]}), MapSource({"hosts": ["b", "c"]})
+    )
+
+    assert builder.build().hosts == ["a", "b", "b", "c"]
+
+
+@pytest.mark.parametrize(
+    "strategies,expected",
+    [
+        ({"hosts": "replace"}, ["b", "c"]),
+        ({"hosts": "dedupe"}, ["a", "b", "c"]),
+        ({"*": "dedupe"}, ["a", "b", "c"]),
+        ({"other": "replace"}, ["a", "b", "b", "c"]),
+    ],
+)
+def test_list_merge_strategies(strategies, expected):
+    builder = ConfigurationBuilder(
+        MapSource({"hosts": ["a", "b"]}),
+        MapSource({"hosts": ["b", "c"]}),
+        merge_strategies=strategies,
+    )
+
+    assert builder.build().hosts == expected
+
+
+def test_list_merge_strategies_by_nested_path():
+    builder = ConfigurationBuilder(
+        MapSource({"app": {"servers": [1, 2], "tags": [{"a": 1}, "x"]}}),
+        MapSource({"app": {"servers": [3], "tags": [{"a": 1}, "y"]}}),
+        MapSource({"app:servers": [4]}),
+        merge_strategies={"app.servers": "replace", "*.tags": "dedupe"},
+    )
+
+    config = builder.build()
+
+    assert config.app.servers == [4]
+    assert config.values["app"]["tags"] == [
+        {"a": 1},
+        "x",
+        "y",
+    ]
+
+
+def test_list_merge_strategy_union_by_key():
+    builder = ConfigurationBuilder(
+        MapSource(
+            {
+                "tenants": [
+                    {"id": "a", "plan": "free", "limits": {"rps": 1}},
+                    {"id": "b", "plan": "free"},
+                ]
+            }
+        ),
+        MapSource(
+            {
+                "tenants": [
+                    {"id": "b", "plan": "pro"},
+                    {"id": "c", "plan": "free"},
+                    {"id": "a", "limits": {"burst": 2}},
+                ]
+            }
+        ),
+        merge_strategies={"tenants": UnionByKey("id")},
+    )
+
+    config = builder.build()
+
+    assert config.values["tenants"] == [
+        {"id": "a", "plan": "free", "limits": {"rps": 1, "burst": 2}},
+        {"id": "b", "plan": "pro"},
+        {"id": "c", "plan": "free"},
+    ]
+
+
+def test_dedupe_distinguishes_values_of_different_types():
+    builder = ConfigurationBuilder(
+        MapSource({"values": [1, True]}),
+        MapSource({"values": [1.0, True, "1"]}),
+        merge_strategies=MergeStrategies(default="dedupe"),
+    )
+
+    assert builder.build().values["values"] == [1, True, 1.0, "1"]
+
+
+def test_unknown_merge_strategy():
+    with pytest.raises(ConfigurationError):
+        ConfigurationBuilder(merge_strategies={"a": "unknown"})
+
+
+def test_merge_strategies_for_derived_variants():
+    base = ConfigurationBuilder(
+        MapSource({"hosts": ["a"]}), merge_strategies={"hosts": "replace"}
+    ).freeze()
+
+    assert base.derive_map({"hosts": ["b"]}).hosts == ["b"]
+    assert base.values["hosts"] == ["a"]
+
+
+class SectionsSource(ConfigurationSource):
+    def __init__(self, values, sections) -> None:
+        self.values = values
+        self.sections = sections
+        self.read = False
+
+    def get_values(self) -> Dict[str, Any]:
+        self.read = True
+        return self.values
+
+    def get_sections(self):
+        return self.sections
+
+
+def test_build_sections():
+    db_source = SectionsSource({"db": {"host": "localhost"}}, {"db"})
+    other_source = SectionsSource({"cache": {"ttl": 10}}, {"cache"})
+    unknown_source = SectionsSource({"db:port": 5432, "app__name": "example"}, None)
+
+    builder = ConfigurationBuilder(db_source, other_source, unknown_source)
+
+    config = builder.build(sections=["db"])
+
+    assert config.values == {"db": {"host": "localhost", "port": 5432}}
+    assert db_source.read is True
+    assert other_source.read is False
+    assert unknown_source.read is True
+
+
+def test_build_sections_ini_file():
+    source = INIFile(_get_file_path("ini_example_02.ini"))
+
+    assert source.get_sections() == {"example", "another"}
+
+    config = ConfigurationBuilder(source).build(sections=["another", "missing"])
+
+    assert list(config.values) == ["another"]
+    assert config.another.port == "50022"
+
+
+def test_build_sections_ini_file_nested_section(tmp_path):
+    file_path = tmp_path / "settings.ini"
+    file_path.write_text("[app:db]\nhost = h\n", encoding="utf8")
+    source = INIFile(file_path)
+
+    assert source.get_sections() == {"app"}
+    assert ConfigurationBuilder(source).build(sections=["app"]).values == {
+        "app": {"db": {"host": "h"}}
+    }
+
+
+def test_build_sections_env_vars():
+    prefix = str(uuid4())
+    os.environ[f"{prefix}_db__host"] = "localhost"
+    os.environ[f"{prefix}_app"] = "example"
+    source = EnvVars(f"{prefix}_")
+
+    assert source.get_sections() == {"db", "app"}
+    assert ConfigurationBuilder(source).build(sections=["db"]).values == {
+        "db": {"host": "localhost"}
+    }
+
+
+def test_env_vars_sections_with_file(tmp_path):
+    prefix = str(uuid4())
+    file_path = tmp_path / ".env"
+    file_path.write_text(f"{prefix}_db__host=localhost\n", encoding="utf8")
+    source = EnvVars(f"{prefix}_", file=file_path)
+
+    # the .env file is not loaded to obtain sections
+    assert source.get_sections() is None
+    assert f"{prefix}_db__host" not in os.environ
+    assert ConfigurationBuilder(source).build(sections=["db"]).values == {
+        "db": {"host": "localhost"}
+    }
+
+
+def test_file_source_sections_manifest(tmp_path):
+    file_path = tmp_path / "settings.json"
+    file_path.write_text('{"db": {"host": "localhost"}, "app": {}}', encoding="utf8")
+    source = JSONFile(file_path)
+
+    assert source.get_sections() is None
+
+    ConfigurationBuilder(source).build()
+
+    assert source.get_sections() == {"db", "app"}
+
+    file_path.write_text('{"cache": {}}', encoding="utf8")
+
+    assert source.get_sections() is None
+    assert JSONFile(tmp_path / "missing.json", optional=True).get_sections() == set()
+
+
+def test_configuration_fingerprint():
+    values = {
+        "a": {"b": [1, 2.5, True, None, "x"], "c": {"d": "e"}},
+        "f": 1,
+    }
+    config = Configuration(values)
+
+    fingerprint = config.fingerprint()
+
+    assert isinstance(fingerprint, str)
+    assert config.fingerprint() is fingerprint
+    # stable, and independent from the order of keys
+    assert Configuration({"f": 1, "a": values["a"]}).fingerprint() == fingerprint
+    assert Configuration(compact(values)).fingerprint() == fingerprint
+    assert config.a.fingerprint() == Configuration(values["a"]).fingerprint()
+
+
+@pytest.mark.parametrize(
+    "first,second",
+    [
+        ({"a": 1}, {"a": "1"}),
+        ({"a": 1}, {"a": True}),
+        ({"a": 1}, {"a": 1.0}),
+        ({"a": 0.0}, {"a": -0.0}),
+        ({"a": None}, {"a": "None"}),
+        ({"a": [1, 2]}, {"a": [2, 1]}),
+        ({"a": {"b": 1}}, {"a": {"c": 1}}),
+        ({"a": {"b": 1}}, {"a": [{"b": 1}]}),
+        ({"a": "bc"}, {"ab": "c"}),
+    ],
+)
+def test_configuration_fingerprint_differs(first, second):
+    assert Configuration(first).fingerprint() != Configuration(second).fingerprint()
+
+
+def test_fingerprint_of_derived_configurations_reuses_base_hashes():
+    builder = ConfigurationBuilder(
+        MapSource({"large": {str(index): index for index in range(100)}, "a": 1})
+    )
+    base = builder.freeze()
+
+    first = base.derive_map({"a": 2})
+    second = base.derive_map({"a": 2})
+
+    assert first.fingerprint() == second.fingerprint()
+    assert first.fingerprint() != base.derive().fingerprint()
+    assert (
+        first.fingerprint()
+        == ConfigurationBuilder(
+            MapSource({"large": {str(index): index for index in range(100)}, "a": 2})
+        )
+        .build()
+        .fingerprint()
+    )
+    assert id(base.values["large"]) in base._fingerprinter._memo
@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from config.common import ConfigurationBuilder, MapSource
+from config.directory import DirectorySource
+
+
+def _create_kubernetes_volume(root: Path, version: str, values) -> None:
+    # reproduces the layout of volumes mounted by Kubernetes:
+    # key -> ..data/key, ..data -> ..<version>
+    data_dir = root / f"..{version}"
+    data_dir.mkdir()
+    for key, value in values.items():
+        (data_dir / key).write_text(value, encoding="utf8")
+
+    temp_link = root / "..data_tmp"
+    os.symlink(data_dir.name, temp_link)
+    os.replace(temp_link, root / "..data")
+
+    for key in values:
+        if not (root / key).is_symlink():
+            os.symlink(Path("..data") / key, root / key)
+
+
+def test_directory_source(tmp_path):
+    (tmp_path / "host").write_text("localhost", encoding="utf8")
+    (tmp_path / "db__password").write_text("secret\n", encoding="utf8")
+    (tmp_path / "db:user").write_text("admin", encoding="utf8")
+    (tmp_path / "nested").mkdir()
+
+    builder = ConfigurationBuilder(
+        MapSource({"db": {"name": "example"}}), DirectorySource(tmp_path)
+    )
+
+    config = builder.build()
+
+    assert config.values == {
+        "host": "localhost",
+        "db": {"name": "example", "password": "secret\n", "user": "admin"},
+    }
+
+
+def test_directory_source_dotted_file_names(tmp_path):
+    (tmp_path / "tls.crt").write_text("certificate", encoding="utf8")
+    (tmp_path / "config.json").write_text("{}", encoding="utf8")
+    (tmp_path / "ca__ca.crt").write_text("authority", encoding="utf8")
+    source = DirectorySource(tmp_path)
+
+    assert source.get_values() == {
+        "tls.crt": "certificate",
+        "config.json": "{}",
+        "ca": {"ca.crt": "authority"},
+    }
+    assert source.get_sections() == {"tls.crt", "config.json", "ca"}
+
+    config = ConfigurationBuilder(source).build(sections=["tls.crt"])
+    assert config.values == {"tls.crt": "certificate"}
+    assert config["tls.crt"] == "certificate"
+
+
+def test_directory_source_strip(tmp_path):
+    (tmp_path / "password").write_text(" secret\n", encoding="utf8")
+
+    assert DirectorySource(tmp_path, strip=True).get_values() == {"password": "secret"}
+
+
+def test_directory_source_kubernetes_layout(tmp_path):
+    _create_kubernetes_volume(tmp_path, "2024_01_01", {"user": "a", "password": "b"})
+    source = DirectorySource(tmp_path)
+
+    assert source.get_values() == {"password": "b", "user": "a"}
+
+    _create_kubernetes_volume(tmp_path, "2024_01_02", {"user": "a", "password": "c"})
+
+    assert source.get_values() == {"password": "c", "user": "a"}
+
+
+def test_directory_source_reads_only_changed_files(tmp_path):
+    (tmp_path / "a").write_text("1", encoding="utf8")
+    (tmp_path / "b").write_text("2", encoding="utf8")
+    source = DirectorySource(tmp_path)
+    read_files = []
+    read_file = source._read_file
+
+    def spy(file_path):
+        read_files.append(file_path.name)
+        return read_file(file_path)
+
+    source._read_file = spy  # type: ignore
+
+    assert source.get_values() == {"a": "1", "b": "2"}
+    assert sorted(read_files) == ["a", "b"]
+
+    read_files.clear()
+    (tmp_path / "c").write_text("3", encoding="utf8")
+    (tmp_path / "a").unlink()
+
+    assert source.get_values() == {"b": "2", "c": "3"}
+    assert read_files == ["c"]
+
+
+def test_directory_source_missing_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DirectorySource(tmp_path / "missing").get_values()
+
+    assert DirectorySource(tmp_path / "missing", optional=True).get_values() == {}
+
+
+def test_directory_source_sections(tmp_path):
+    (tmp_path / "db__password").write_text("secret", encoding="utf8")
+    (tmp_path / "host").write_text("localhost", encoding="utf8")
+    source = DirectorySource(tmp_path)
+
+    assert source.get_sections() == {"db", "host"}
+    assert ConfigurationBuilder(source).build(sections=["db"]).values == {
+        "db": {"password": "secret"}
+    }
@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from config.common import ConfigurationBuilder, MapSource
+from config.common.export import ENV_VARIABLE, ConfigurationExport, ExportedSource
+from config.common.secrets import SecretResolver, Secrets
+from config.common.snapshot import SnapshotError
+from config.errors import ConfigurationError
+
+CHILD_CODE = (
+    "from config.common import ConfigurationBuilder\n"
+    "from config.common.export import ExportedSource\n"
+    "config = ConfigurationBuilder(ExportedSource()).build()\n"
+    "print(config.app.name, config.app.ports[1], config.timeout)\n"
+)
+
+
+class Resolver(SecretResolver):
+    def get_secret(self, name: str) -> str:
+        return f"value-of-{name}"
+
+
+@pytest.fixture
+def clean_env():
+    yield
+    os.environ.pop(ENV_VARIABLE, None)
+    os.environ.pop(ENV_VARIABLE + "_FD", None)
+
+
+def _get_builder(**kwargs) -> ConfigurationBuilder:
+    return ConfigurationBuilder(
+        MapSource({"app": {"name": "example", "ports": [80, 443]}}),
+        MapSource({"timeout": "30s", "token": "secret://token"}),
+        schema={"timeout": timedelta},
+        **kwargs,
+    )
+
+
+def _run_child(env, pass_fds=()) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", CHILD_CODE],
+        check=True,
+        stdout=subprocess.PIPE,
+        env={**os.environ, **env},
+        pass_fds=pass_fds,
+        cwd=str(Path(__file__).parent.parent),
+    ).stdout.decode("utf8")
+
+
+def test_export_configuration_through_environment(clean_env):
+    config = _get_builder().build()
+    exported = config.export()
+
+    os.environ.update(exported.to_environment())
+    child_config = ConfigurationBuilder(ExportedSource()).build()
+
+    assert child_config.values == config.values
+    assert child_config.timeout == timedelta(seconds=30)
+
+
+def test_export_builder_merged_values(clean_env):
+    builder = _get_builder(secrets=Secrets(Resolver()))
+    exported = builder.export()
+
+    os.environ.update(exported.to_environment())
+    child_builder = ConfigurationBuilder(
+        ExportedSource(),
+        schema={"timeout": timedelta},
+        secrets=Secrets(Resolver()),
+    )
+    config = child_builder.build()
+
+    assert config.app.ports == [80, 443]
+    assert config.timeout == timedelta(seconds=30)
+    assert config.token == "value-of-token"
+
+
+def test_export_configuration_with_deferred_values():
+    config = _get_builder(secrets=Secrets(Resolver())).build()
+
+    with pytest.raises(SnapshotError):
+        config.export()
+
+    exported = config.export(resolve_deferred=True)
+    assert isinstance(exported, ConfigurationExport)
+
+
+def test_export_compact_configuration(clean_env):
+    config = _get_builder(compact=True).build()
+    assert config.app.ports[1] == 443
+
+    os.environ.update(config.export().to_environment())
+    child_config = ConfigurationBuilder(ExportedSource()).build()
+
+    assert child_config.app.values == {"name": "example", "ports": [80, 443]}
+
+
+def test_export_to_child_process_through_environment():
+    exported = _get_builder().build().export()
+
+    output = _run_child(exported.to_environment())
+
+    assert output.strip() == "example 443 0:00:30"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="pass_fds is supported only on POSIX")
+def test_export_to_child_process_through_file_descriptor():
+    exported = _get_builder().build().export()
+    fd, env = exported.to_file_descriptor()
+    try:
+        # children can read the same file descriptor
+        assert _run_child(env, pass_fds=(fd,)).strip() == "example 443 0:00:30"
+        assert _run_child(env, pass_fds=(fd,)).strip() == "example 443 0:00:30"
+    finally:
+        os.close(fd)
+
+
+def test_exported_source_missing(clean_env):
+    with pytest.raises(ConfigurationError):
+        ExportedSource().get_values()
+
+    assert ExportedSource(optional=True).get_values() == {}
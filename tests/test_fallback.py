@@ -0,0 +1,164 @@
+import os
+import time
+from threading import Event
+from typing import Any, Dict, List
+
+import pytest
+
+from config.common import ConfigurationBuilder, ConfigurationSource, MapSource
+from config.common.fallback import FallbackSource, SourceTimeoutError
+from config.common.watch import get_source_paths
+from config.json import JSONFile
+
+
+class RemoteSource(ConfigurationSource):
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {"remote": {"value": 1}}
+        self.error: Any = None
+        self.hang = Event()
+        self.calls: List[float] = []
+
+    def get_values(self) -> Dict[str, Any]:
+        self.calls.append(time.monotonic())
+        if self.error is not None:
+            raise self.error
+        if not self.hang.is_set():
+            self.hang.wait(5)
+        return self.values
+
+
+@pytest.fixture
+def remote():
+    source = RemoteSource()
+    source.hang.set()
+    yield source
+    # release hanging reads
+    source.hang.set()
+
+
+def test_fallback_source_uses_last_values_on_errors(remote):
+    source = FallbackSource(remote)
+    builder = ConfigurationBuilder(MapSource({"a": 1}), source)
+
+    assert builder.build().remote.value == 1
+    assert builder.degradations == []
+
+    remote.error = ConnectionError("unavailable")
+    config = builder.build()
+
+    assert config.remote.value == 1
+    assert config.a == 1
+    assert len(builder.degradations) == 1
+    degradation = builder.degradations[0]
+    assert degradation.source is remote
+    assert degradation.fallback == "memory"
+    assert isinstance(degradation.error, ConnectionError)
+
+    remote.error = None
+    remote.values = {"remote": {"value": 2}}
+    assert builder.build().remote.value == 2
+    assert builder.degradations == []
+
+
+def test_fallback_source_timeout(remote):
+    source = FallbackSource(remote, timeout=0.05)
+    builder = ConfigurationBuilder(source)
+    assert builder.build().remote.value == 1
+
+    remote.hang.clear()
+    start = time.monotonic()
+    config = builder.build()
+    assert time.monotonic() - start < 1
+
+    assert config.remote.value == 1
+    assert isinstance(builder.degradations[0].error, SourceTimeoutError)
+
+    # while the previous read is still running, no other reads are started
+    calls = len(remote.calls)
+    assert builder.build().remote.value == 1
+    assert len(remote.calls) == calls
+
+    remote.hang.set()
+    time.sleep(0.05)
+    assert builder.build().remote.value == 1
+    assert builder.degradations == []
+
+
+def test_fallback_source_without_last_values_raises(remote):
+    remote.error = ConnectionError("unavailable")
+
+    with pytest.raises(ConnectionError):
+        ConfigurationBuilder(FallbackSource(remote)).build()
+
+    remote.error = None
+    remote.hang.clear()
+
+    with pytest.raises(SourceTimeoutError):
+        ConfigurationBuilder(FallbackSource(remote, timeout=0.01)).build()
+
+
+def test_fallback_source_errors_not_handled(remote):
+    source = FallbackSource(remote, errors=(ConnectionError,))
+    builder = ConfigurationBuilder(source)
+    builder.build()
+
+    remote.error = ValueError("invalid")
+    with pytest.raises(ValueError):
+        builder.build()
+
+
+def test_fallback_source_does_not_handle_invalid_values_by_default(remote):
+    builder = ConfigurationBuilder(FallbackSource(remote))
+    builder.build()
+
+    remote.error = ValueError("invalid")
+    with pytest.raises(ValueError):
+        builder.build()
+
+    remote.error = TimeoutError("timeout")
+    assert builder.build().remote.value == 1
+
+
+def test_fallback_source_persisted_values(remote, tmp_path):
+    fallback_path = tmp_path / "remote.snapshot"
+    builder = ConfigurationBuilder(FallbackSource(remote, fallback_path=fallback_path))
+    builder.build()
+
+    assert fallback_path.exists()
+
+    # values are read from the file after a restart
+    remote.error = ConnectionError("unavailable")
+    builder = ConfigurationBuilder(FallbackSource(remote, fallback_path=fallback_path))
+    config = builder.build()
+
+    assert config.remote.value == 1
+    assert builder.degradations[0].fallback == "file"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="file modes are supported only on POSIX")
+def test_fallback_source_persisted_values_are_readable_only_by_owner(remote, tmp_path):
+    fallback_path = tmp_path / "remote.snapshot"
+    fallback_path.write_bytes(b"")
+    fallback_path.chmod(0o644)
+
+    ConfigurationBuilder(FallbackSource(remote, fallback_path=fallback_path)).build()
+
+    assert fallback_path.stat().st_mode & 0o777 == 0o600
+
+
+def test_fallback_source_values_are_not_modified_by_merges(remote):
+    source = FallbackSource(remote)
+    builder = ConfigurationBuilder(source, MapSource({"remote": {"other": True}}))
+    builder.build()
+
+    remote.error = ConnectionError("unavailable")
+    assert builder.build().remote.values == {"value": 1, "other": True}
+    assert source.get_values() == {"remote": {"value": 1}}
+
+
+def test_fallback_source_paths(tmp_path):
+    file_path = tmp_path / "settings.json"
+    source = FallbackSource(JSONFile(file_path))
+
+    assert get_source_paths(source) == [file_path]
+    assert repr(source) == "<FallbackSource <JSONFile>>"
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+import config.glob
+from config.common import ConfigurationBuilder
+from config.errors import ConfigurationError
+from config.glob import GlobSource
+
+
+@pytest.fixture
+def conf_d(tmp_path):
+    folder = tmp_path / "conf.d"
+    folder.mkdir()
+    (folder / "10-base.yaml").write_text(
+        "app:\n  name: example\n  port: 8080\nitems:\n  - 1\n", encoding="utf8"
+    )
+    (folder / "20-override.json").write_text(
+        json.dumps({"app": {"port": 9090}, "items": [2]}), encoding="utf8"
+    )
+    (folder / "30-extra.toml").write_text('[extra]\nvalue = "toml"\n', encoding="utf8")
+    (folder / "40-legacy.ini").write_text("[legacy]\nvalue = ini\n", encoding="utf8")
+    (folder / "nested").mkdir()
+    (folder / "nested" / "50-nested.yml").write_text("app:\n  port: 1\n")
+    return folder
+
+
+EXPECTED_VALUES = {
+    "app": {"name": "example", "port": 9090},
+    "items": [1, 2],
+    "extra": {"value": "toml"},
+    "legacy": {"value": "ini"},
+}
+
+
+@pytest.mark.parametrize("parallel", [None, False, True])
+def test_glob_source(conf_d, parallel):
+    source = GlobSource(conf_d / "*", parallel=parallel)
+
+    config = ConfigurationBuilder(source).build()
+
+    assert config.values == EXPECTED_VALUES
+    assert source.get_values() == EXPECTED_VALUES
+
+
+def test_glob_source_parallel_by_total_size(tmp_path, monkeypatch):
+    for index in range(10):
+        (tmp_path / f"{index}.json").write_text(f'{{"a{index}": 1}}', encoding="utf8")
+    source = GlobSource(tmp_path / "*.json")
+    files = source.get_files()
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+    # many small files are parsed faster without starting processes
+    assert source._use_processes(files) is False
+
+    monkeypatch.setattr(config.glob, "PARALLEL_SIZE_THRESHOLD", 50)
+    assert source._use_processes(files) is True
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    assert source._use_processes(files) is False
+
+
+def test_glob_source_does_not_fork_processes(conf_d, monkeypatch):
+    contexts = []
+    executor_type = config.glob.ProcessPoolExecutor
+
+    def create_executor(max_workers=None, mp_context=None):
+        contexts.append(mp_context)
+        return executor_type(max_workers, mp_context=mp_context)
+
+    monkeypatch.setattr(config.glob, "ProcessPoolExecutor", create_executor)
+
+    assert GlobSource(conf_d / "*", parallel=True).get_values() == EXPECTED_VALUES
+    assert contexts[0].get_start_method() in ("forkserver", "spawn")
+
+
+def test_glob_source_recursive(conf_d):
+    source = GlobSource(conf_d / "**" / "*.y*ml")
+
+    assert [file_path.name for file_path in source.get_files()] == [
+        "10-base.yaml",
+        "50-nested.yml",
+    ]
+    assert source.get_values()["app"]["port"] == 1
+
+
+def test_glob_source_raises_for_unsupported_files(conf_d):
+    (conf_d / "README.md").write_text("Hello", encoding="utf8")
+
+    with pytest.raises(ConfigurationError):
+        GlobSource(conf_d / "*").get_values()
+
+
+def test_glob_source_no_matching_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        GlobSource(tmp_path / "*.yaml").get_values()
+
+    assert GlobSource(tmp_path / "*.yaml", optional=True).get_values() == {}
+
+
+def test_glob_source_files_are_watched(conf_d):
+    from config.common.watch import get_source_paths
+
+    source = GlobSource(conf_d / "*.json")
+
+    assert get_source_paths(source) == [conf_d / "20-override.json"]
@@ -0,0 +1,159 @@
+import os
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from config.common import ConfigurationBuilder, MapSource
+from config.common.schema import ListOf, Schema, to_bool, to_timedelta
+from config.common.secrets import SecretReference, SecretResolver, Secrets
+from config.env import EnvironmentVariables
+from config.errors import ConfigurationCoercionError
+
+
+@pytest.mark.parametrize(
+    "value,expected_value",
+    [
+        ("1", True),
+        ("true", True),
+        ("Yes", True),
+        ("on", True),
+        ("0", False),
+        ("False", False),
+        ("no", False),
+        ("off", False),
+        (True, True),
+        (0, False),
+    ],
+)
+def test_to_bool(value, expected_value):
+    assert to_bool(value) is expected_value
+
+
+@pytest.mark.parametrize(
+    "value,expected_value",
+    [
+        ("30", timedelta(seconds=30)),
+        ("1.5", timedelta(seconds=1.5)),
+        (45, timedelta(seconds=45)),
+        ("30s", timedelta(seconds=30)),
+        ("500ms", timedelta(milliseconds=500)),
+        ("1h30m", timedelta(hours=1, minutes=30)),
+        ("2d", timedelta(days=2)),
+    ],
+)
+def test_to_timedelta(value, expected_value):
+    assert to_timedelta(value) == expected_value
+
+
+@pytest.mark.parametrize("value", ["", "30x", "s", "1h foo", "foo 1h"])
+def test_to_timedelta_invalid(value):
+    with pytest.raises(ValueError):
+        to_timedelta(value)
+
+
+def test_list_of():
+    assert ListOf(int)("1, 2,3") == [1, 2, 3]
+    assert ListOf(int)(["1", 2]) == [1, 2]
+    assert ListOf(str, ";")("a;b") == ["a", "b"]
+
+
+def test_schema_coerces_environment_variables():
+    os.environ["APP_SERVER__PORT"] = "8080"
+    os.environ["APP_SERVER__DEBUG"] = "true"
+    os.environ["APP_SERVER__TIMEOUT"] = "1m30s"
+    os.environ["APP_SERVER__PORTS"] = "80,443"
+
+    builder = ConfigurationBuilder(
+        EnvironmentVariables(prefix="APP_"),
+        schema={
+            "server.port": int,
+            "server.debug": bool,
+            "server.timeout": timedelta,
+            "server.ports": List[int],
+            "server.missing": int,
+        },
+    )
+    config = builder.build()
+
+    assert config.server.port == 8080
+    assert config.server.debug is True
+    assert config.server.timeout == timedelta(seconds=90)
+    assert config.server.ports == [80, 443]
+    assert "missing" not in config.server.values
+
+
+def test_schema_wildcards():
+    builder = ConfigurationBuilder(
+        MapSource(
+            {
+                "tenants": {"a": {"rps": "10"}, "b": {"rps": "20", "name": "b"}},
+                "servers": [{"port": "80"}, {"port": "443"}],
+                "weights": ["0.5", "1"],
+            }
+        ),
+        schema={"tenants.*.rps": int, "servers.*.port": int, "weights.*": float},
+    )
+    config = builder.build()
+
+    assert config.tenants.a.rps == 10
+    assert config.tenants.b.rps == 20
+    assert config.tenants.b.name == "b"
+    assert config.servers[0].port == 80
+    assert config.servers[1].port == 443
+    assert config.weights == [0.5, 1.0]
+
+
+def test_schema_exact_paths_take_precedence_over_wildcards():
+    schema = Schema({"tenants.*.rps": int, "tenants.special.rps": float})
+
+    values = schema.apply({"tenants": {"a": {"rps": "1"}, "special": {"rps": "2"}}})
+
+    assert values == {"tenants": {"a": {"rps": 1}, "special": {"rps": 2.0}}}
+    assert isinstance(values["tenants"]["special"]["rps"], float)
+
+
+def test_schema_reports_all_errors():
+    builder = ConfigurationBuilder(
+        MapSource({"port": "http", "debug": "maybe", "tenants": [{"rps": "x"}]}),
+        schema={"port": int, "debug": bool, "tenants.*.rps": int},
+    )
+
+    with pytest.raises(ConfigurationCoercionError) as error_info:
+        builder.build()
+
+    paths = [path for path, _ in error_info.value.errors]
+    assert paths == ["port", "debug", "tenants.0.rps"]
+    assert "tenants.0.rps" in str(error_info.value)
+
+
+def test_schema_does_not_modify_source_values():
+    values = {"server": {"port": "8080", "host": "localhost"}}
+    builder = ConfigurationBuilder(MapSource(values), schema={"server.port": int})
+
+    config = builder.build()
+
+    assert config.server.port == 8080
+    assert config.server.host == "localhost"
+    assert values == {"server": {"port": "8080", "host": "localhost"}}
+
+
+def test_schema_skips_secret_references():
+    class Resolver(SecretResolver):
+        def get_secret(self, name: str) -> str:
+            return "42"
+
+    builder = ConfigurationBuilder(
+        MapSource({"db": {"port": "secret://port"}}),
+        secrets=Secrets(Resolver()),
+        schema={"db.port": int},
+    )
+    config = builder.build()
+
+    assert isinstance(config.db.values["port"], SecretReference)
+    assert config.db.port == "42"
+
+
+def test_schema_unsupported_type():
+    with pytest.raises(TypeError):
+        Schema({"foo": 1})
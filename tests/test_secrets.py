@@ -0,0 +1,115 @@
+import time
+from threading import Lock
+from typing import Any, List
+
+import pytest
+from pydantic import BaseModel
+
+from config.common import ConfigurationBuilder, MapSource
+from config.common.secrets import SecretReference, SecretResolver, Secrets
+
+
+class FakeResolver(SecretResolver):
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+        self._lock = Lock()
+
+    def get_secret(self, name: str) -> Any:
+        with self._lock:
+            self.calls.append(name)
+        return f"value-of-{name}"
+
+
+class DatabaseSettings(BaseModel):
+    user: str
+    password: str
+
+
+@pytest.fixture
+def resolver():
+    return FakeResolver()
+
+
+def test_secrets_are_resolved_lazily(resolver):
+    source = MapSource(
+        {
+            "db": {"user": "admin", "password": "secret://db-password"},
+            "api_keys": ["secret://key-1", "plain"],
+            "other": "secret://other",
+        }
+    )
+    builder = ConfigurationBuilder(source, secrets=Secrets(resolver))
+
+    config = builder.build()
+
+    assert resolver.calls == []
+    assert config.db.password == "value-of-db-password"
+    assert config.db["password"] == "value-of-db-password"
+    assert resolver.calls == ["db-password"]
+
+    assert config.api_keys == ["value-of-key-1", "plain"]
+    assert resolver.calls == ["db-password", "key-1"]
+
+    # values of sources are not modified
+    assert source.get_values()["db"]["password"] == "secret://db-password"
+
+
+def test_secrets_are_resolved_by_bind(resolver):
+    builder = ConfigurationBuilder(
+        MapSource({"db": {"user": "admin", "password": "secret://db-password"}}),
+        secrets=Secrets(resolver),
+    )
+
+    settings = builder.build().bind(DatabaseSettings, "db")
+
+    assert settings.password == "value-of-db-password"
+
+
+def test_secrets_are_fetched_eagerly_in_batch(resolver):
+    batches = []
+
+    class BatchResolver(FakeResolver):
+        def get_secrets(self, names):
+            batches.append(sorted(names))
+            return super().get_secrets(names)
+
+    resolver = BatchResolver()
+    builder = ConfigurationBuilder(
+        MapSource({"a": "secret://a", "b": ["secret://b", "secret://a"]}),
+        secrets=Secrets(resolver, eager=True),
+    )
+
+    config = builder.build()
+
+    assert batches == [["a", "b"]]
+    assert sorted(resolver.calls) == ["a", "b"]
+
+    assert config.a == "value-of-a"
+    assert config.b == ["value-of-b", "value-of-a"]
+    assert len(resolver.calls) == 2
+
+
+def test_secrets_cache_expiration(resolver):
+    secrets = Secrets(resolver, cache_expiration=0.01)
+
+    assert secrets.get("a") == "value-of-a"
+    assert secrets.get("a") == "value-of-a"
+    assert resolver.calls == ["a"]
+
+    time.sleep(0.02)
+    assert secrets.get("a") == "value-of-a"
+    assert resolver.calls == ["a", "a"]
+
+    secrets.clear_cache()
+    secrets.get("a")
+    assert resolver.calls == ["a", "a", "a"]
+
+
+def test_secret_reference(resolver):
+    secrets = Secrets(resolver)
+    reference = SecretReference("a", secrets)
+
+    assert repr(reference) == "<SecretReference a>"
+    assert reference == SecretReference("a", secrets)
+    assert reference != SecretReference("b", secrets)
+    assert reference.get_value() == "value-of-a"
@@ -0,0 +1,172 @@
+import os
+import sys
+from datetime import date, datetime, time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from click.testing import CliRunner
+
+from config.cli.main import main
+from config.common import ConfigurationBuilder, MapSource
+from config.common.snapshot import (
+    MAGIC,
+    SnapshotError,
+    SnapshotFile,
+    compile_snapshot,
+    dump_snapshot,
+    load_snapshot,
+    write_snapshot,
+)
+from config.json import JSONFile
+from config.toml import TOMLFile
+
+EXAMPLES = Path(__file__).parent
+
+
+def test_snapshot_round_trip():
+    values = {
+        "a": {"b": [1, 2.5, True, None, "x"], "c": b"bytes"},
+        "when": datetime(2024, 1, 2, 3, 4, 5),
+        "day": date(2024, 1, 2),
+        "at": time(10, 30),
+        "items": [{"created": date(2020, 5, 1)}, (1, 2)],
+    }
+
+    assert load_snapshot(dump_snapshot(values)) == values
+
+
+def test_snapshot_unsupported_value():
+    with pytest.raises(SnapshotError):
+        dump_snapshot({"a": object()})
+
+
+def test_snapshot_invalid_data():
+    with pytest.raises(SnapshotError):
+        load_snapshot(b"{}")
+
+
+def test_snapshot_other_python_version():
+    data = bytearray(dump_snapshot({"a": 1}))
+    data[len(MAGIC) + 2] = (sys.version_info[1] + 1) % 256
+
+    with pytest.raises(SnapshotError) as error_info:
+        load_snapshot(bytes(data))
+
+    assert "must be compiled again" in str(error_info.value)
+
+
+def test_snapshot_file_source(tmp_path):
+    snapshot_path = tmp_path / "settings.snapshot"
+    size = write_snapshot(snapshot_path, {"host": "example.com", "url": "${host}/a"})
+
+    assert size == snapshot_path.stat().st_size
+
+    builder = ConfigurationBuilder(
+        SnapshotFile(snapshot_path), MapSource({"port": 80}), interpolate=True
+    )
+    config = builder.build()
+
+    assert config.url == "example.com/a"
+    assert config.port == 80
+
+
+@pytest.mark.skipif(os.name == "nt", reason="file modes are supported only on POSIX")
+def test_snapshot_file_mode_follows_umask(tmp_path):
+    snapshot_path = tmp_path / "settings.snapshot"
+    umask = os.umask(0o022)
+    try:
+        write_snapshot(snapshot_path, {"a": 1})
+    finally:
+        os.umask(umask)
+
+    assert snapshot_path.stat().st_mode & 0o777 == 0o644
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/status"), reason="the umask is read from /proc"
+)
+def test_snapshot_file_mode_does_not_set_umask(tmp_path, monkeypatch):
+    def umask(mask):
+        raise AssertionError("the umask must not be changed")
+
+    monkeypatch.setattr(os, "umask", umask)
+
+    write_snapshot(tmp_path / "settings.snapshot", {"a": 1})
+
+
+def test_compile_snapshot_report():
+    builder = ConfigurationBuilder(
+        JSONFile(EXAMPLES / "json_example_01.json"),
+        TOMLFile(EXAMPLES / "toml_example_01.toml"),
+        MapSource({"extra": {"a": 1, "b": [1, 2]}}),
+    )
+    report = compile_snapshot(builder)
+
+    assert [source_report.source for source_report in report.sources] == (
+        builder.sources
+    )
+    assert report.sources[2].keys == 3
+    assert all(source_report.load_time >= 0 for source_report in report.sources)
+    assert report.size == len(report.data)
+    assert load_snapshot(report.data) == builder.merge_sources()
+    assert report.fingerprint == builder.build().fingerprint()
+
+
+def test_snapshot_compile_command(tmp_path):
+    module_name = f"settings_{uuid4().hex}"
+    (tmp_path / f"{module_name}.py").write_text(
+        "from config.common import ConfigurationBuilder, MapSource\n\n"
+        "def get_builder():\n"
+        "    return ConfigurationBuilder(MapSource({'a': {'b': 1, 'c': 2}}))\n",
+        encoding="utf8",
+    )
+    output = tmp_path / "settings.snapshot"
+
+    previous_dir = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["snapshot", "compile", f"{module_name}:get_builder", "-o", str(output)],
+        )
+        assert result.exit_code == 0, result.output
+        assert "MapSource" in result.output
+        assert "Snapshot: 2 keys" in result.output
+        assert SnapshotFile(output).get_values() == {"a": {"b": 1, "c": 2}}
+
+        result = runner.invoke(
+            main,
+            [
+                "snapshot",
+                "compile",
+                f"{module_name}:get_builder",
+                "-o",
+                str(output),
+                "--max-source-time",
+                "-1",
+            ],
+        )
+        assert result.exit_code == 1
+        assert "Sources exceeding the maximum time: MapSource" in result.output
+    finally:
+        os.chdir(previous_dir)
+
+
+@pytest.mark.parametrize(
+    "target,message",
+    [
+        ("not_valid", "expected a value like"),
+        (f"missing_{uuid4().hex}:builder", "Cannot import"),
+        ("config.common:missing", "has no attribute"),
+        ("os:sep", "is not a ConfigurationBuilder"),
+    ],
+)
+def test_snapshot_compile_command_invalid_target(tmp_path, target, message):
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["snapshot", "compile", target, "-o", str(tmp_path / "out")]
+    )
+    assert result.exit_code != 0
+    assert message in result.output
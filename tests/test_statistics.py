@@ -0,0 +1,128 @@
+from threading import Thread
+
+from pydantic import BaseModel
+
+from config.common import ConfigurationBuilder, MapSource
+from config.common.statistics import (
+    AccessStatistics,
+    TrackedConfiguration,
+    TrackedSequence,
+)
+
+
+def _get_builder(statistics: AccessStatistics) -> ConfigurationBuilder:
+    return ConfigurationBuilder(
+        MapSource(
+            {
+                "limits": {"rps": 100, "burst": 10},
+                "servers": [{"host": "a", "port": 80}, {"host": "b", "port": 443}],
+                "tags": ["x", "y"],
+                "database": {"host": "localhost", "port": 5432},
+                "unused": {"value": True},
+            }
+        ),
+        access_statistics=statistics,
+    )
+
+
+def test_access_statistics_counts_reads_by_path():
+    statistics = AccessStatistics()
+    config = _get_builder(statistics).build()
+
+    assert isinstance(config, TrackedConfiguration)
+    assert isinstance(config.servers, TrackedSequence)
+
+    for _ in range(3):
+        assert config.limits.rps == 100
+    assert config["limits"]["burst"] == 10
+    assert config.servers[1].port == 443
+    assert config.servers[-1:][0].host == "b"
+    assert config.tags == ["x", "y"]
+
+    counts = statistics.counts()
+    assert counts["limits"] == 4
+    assert counts["limits.rps"] == 3
+    assert counts["limits.burst"] == 1
+    assert counts["servers.1"] == 2
+    assert counts["servers.1.port"] == 1
+    assert counts["servers.1.host"] == 1
+    assert counts["tags"] == 1
+
+    assert statistics.hottest(2) == [("limits", 4), ("limits.rps", 3)]
+
+
+def test_access_statistics_unread_keys():
+    statistics = AccessStatistics()
+    config = _get_builder(statistics).build()
+
+    config.limits.rps
+    config.servers[0].host
+    config.tags
+
+    assert statistics.unread() == [
+        "limits.burst",
+        "servers.0.port",
+        "servers.1.host",
+        "servers.1.port",
+        "database.host",
+        "database.port",
+        "unused.value",
+    ]
+
+
+def test_access_statistics_bind():
+    class DatabaseSettings(BaseModel):
+        host: str
+        port: int
+
+    statistics = AccessStatistics()
+    config = _get_builder(statistics).build()
+
+    settings = config.bind(DatabaseSettings, "database")
+    assert settings.port == 5432
+
+    counts = statistics.counts()
+    assert counts["database"] == 1
+    assert counts["database.host"] == 1
+    assert counts["database.port"] == 1
+    assert "database.host" not in statistics.unread()
+
+
+def test_access_statistics_merges_thread_counters():
+    statistics = AccessStatistics()
+    config = _get_builder(statistics).build()
+
+    def read():
+        for _ in range(1000):
+            config.limits.rps
+
+    threads = [Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statistics.counts()["limits.rps"] == 4000
+
+
+def test_access_statistics_report_and_reset():
+    statistics = AccessStatistics()
+    config = _get_builder(statistics).build()
+
+    config.limits.rps
+    report = statistics.report()
+
+    assert report.startswith("Hottest paths:")
+    assert "limits.rps" in report
+    assert "Never read (9):" in report
+
+    statistics.reset()
+    assert statistics.counts() == {}
+    assert repr(statistics) == "<AccessStatistics reads=0>"
+
+
+def test_untracked_configuration_by_default():
+    config = ConfigurationBuilder(MapSource({"a": {"b": 1}})).build()
+
+    assert not isinstance(config, TrackedConfiguration)
+    assert not isinstance(config.a, TrackedConfiguration)
@@ -0,0 +1,173 @@
+import os
+
+import pytest
+
+import config.user
+from config.common.files import write_atomic
+from config.user import (
+    UserSettings,
+    find_pyproject,
+    get_project_name,
+    read_project_name,
+)
+from config.user.registry import ProjectsRegistry
+
+
+@pytest.mark.parametrize(
+    "content,expected_name",
+    [
+        ('[project]\nname = "example"\n', "example"),
+        ("[project]\nname='example' # comment\n", "example"),
+        ('[build-system]\nrequires = []\n\n[ project ]\nname = "a"\n', "a"),
+        ('[project]\nversion = "1"\n[tool.x]\nname = "other"\n', None),
+        ('[tool.x]\nname = "other"\n', None),
+        ('[project]\nname = """multi"""\n', "multi"),
+        ('[project.urls]\nname = "x"\n[project]\nname = "example"\n', "example"),
+    ],
+)
+def test_read_project_name(tmp_path, content, expected_name):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(content, encoding="utf8")
+
+    assert read_project_name(pyproject) == expected_name
+
+
+def test_get_project_name_searches_parent_directories(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "parent"\n', encoding="utf8"
+    )
+    nested = tmp_path / "src" / "package"
+    nested.mkdir(parents=True)
+
+    assert find_pyproject(nested) == (tmp_path / "pyproject.toml").resolve()
+    assert get_project_name(nested) == "parent"
+
+
+def test_find_pyproject_is_cached_by_directory(tmp_path, monkeypatch):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "parent"\n', encoding="utf8")
+    nested = tmp_path / "src" / "package"
+    nested.mkdir(parents=True)
+    (nested / "pyproject.toml").write_text("", encoding="utf8")
+
+    expected = (nested / "pyproject.toml").resolve()
+    assert find_pyproject(nested) == expected
+
+    def resolve(self, strict=False):
+        raise AssertionError("parent directories must not be searched again")
+
+    with monkeypatch.context() as context:
+        context.setattr(type(nested), "resolve", resolve)
+        assert find_pyproject(nested) == expected
+
+    # the cached path is discarded when the file is removed
+    (nested / "pyproject.toml").unlink()
+    assert find_pyproject(nested) == pyproject.resolve()
+    assert get_project_name(nested) == "parent"
+
+
+def test_get_project_name_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "first"\n', encoding="utf8")
+
+    assert get_project_name(tmp_path) == "first"
+
+    calls = []
+    original = config.user.read_project_name
+    monkeypatch.setattr(
+        config.user,
+        "read_project_name",
+        lambda path: calls.append(path) or original(path),
+    )
+
+    assert get_project_name(tmp_path) == "first"
+    assert calls == []
+
+    pyproject.write_text('[project]\nname = "second"\n', encoding="utf8")
+    stat = pyproject.stat()
+    os.utime(pyproject, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert get_project_name(tmp_path) == "second"
+    assert len(calls) == 1
+
+
+def test_get_project_name_without_pyproject_is_stable(tmp_path):
+    folder = tmp_path / "example"
+    folder.mkdir()
+
+    if find_pyproject(folder) is not None:  # pragma: no cover
+        pytest.skip("a pyproject.toml exists in a parent of the temp folder")
+
+    name = get_project_name(folder)
+    assert name.startswith("example-")
+    assert get_project_name(folder) == name
+
+    other = tmp_path / "other" / "example"
+    other.mkdir(parents=True)
+    assert get_project_name(other) != name
+
+
+def test_user_settings_project_name_from_pyproject(tmp_path, monkeypatch):
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "from-pyproject"\n', encoding="utf8"
+    )
+    monkeypatch.chdir(tmp_path)
+
+    assert UserSettings().project_name == "from-pyproject"
+
+
+def test_projects_registry(tmp_path):
+    base_folder = tmp_path / "ec"
+    registry = ProjectsRegistry(base_folder)
+
+    assert registry.list_projects() == []
+    assert not registry.index_file_path.exists()
+
+    (base_folder / "first").mkdir(parents=True)
+    (base_folder / "first" / "settings.json").write_text("{}", encoding="utf8")
+
+    # the index is created scanning the folder, the first time
+    assert registry.list_projects() == ["first"]
+    assert registry.index_file_path.exists()
+    assert registry.get_project("first") == {
+        "path": str(base_folder / "first" / "settings.json"),
+        "size": 2,
+        "modified": (base_folder / "first" / "settings.json").stat().st_mtime,
+    }
+
+    second_settings = base_folder / "second" / "settings.json"
+    second_settings.parent.mkdir()
+    second_settings.write_text('{"a": 1}', encoding="utf8")
+
+    # then projects are listed from the index, kept up to date by writes
+    assert registry.list_projects() == ["first"]
+    registry.update("second", second_settings)
+    assert registry.list_projects() == ["first", "second"]
+    assert registry.get_project("second")["size"] == 8
+    assert registry.get_project("missing") is None
+
+    (base_folder / "third").mkdir()
+    assert registry.list_projects() == ["first", "second"]
+    registry.rebuild()
+    assert registry.list_projects() == ["first", "second", "third"]
+    assert registry.get_project("third")["modified"] is None
+
+
+def test_projects_registry_invalid_index(tmp_path):
+    registry = ProjectsRegistry(tmp_path)
+    (tmp_path / "example").mkdir()
+    registry.index_file_path.write_text("not json", encoding="utf8")
+
+    assert registry.list_projects() == ["example"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="file modes are supported only on POSIX")
+def test_write_atomic_keeps_file_mode(tmp_path):
+    file_path = tmp_path / "settings.json"
+    file_path.write_text("{}", encoding="utf8")
+    file_path.chmod(0o640)
+
+    write_atomic(file_path, b'{"a": 1}')
+
+    assert file_path.read_text(encoding="utf8") == '{"a": 1}'
+    assert file_path.stat().st_mode & 0o777 == 0o640
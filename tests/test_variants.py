@@ -0,0 +1,235 @@
+from typing import List
+
+import pytest
+
+from config.common import ConfigurationBuilder, MapSource
+from config.common.frozen import FrozenMapping
+from config.common.schema import Schema
+from config.common.secrets import SecretReference, SecretResolver, Secrets
+from config.errors import ConfigurationCoercionError, ConfigurationOverrideError
+
+
+@pytest.fixture
+def builder():
+    return ConfigurationBuilder(
+        MapSource(
+            {
+                "app": {"name": "example", "limits": {"rps": 100, "burst": 10}},
+                "regions": ["westeurope"],
+                "tenants": [{"id": "a", "plan": "free"}, {"id": "b", "plan": "pro"}],
+                "large": {str(index): {"value": index} for index in range(1000)},
+            }
+        )
+    )
+
+
+def test_derive_variants(builder):
+    base = builder.freeze()
+
+    first = base.derive_map({"app:limits:rps": 200, "regions": ["northeurope"]})
+    second = base.derive_map({"app": {"name": "other"}, "tenants:1:plan": "free"})
+
+    assert first.app.limits.rps == 200
+    assert first.app.limits.burst == 10
+    assert first.app.name == "example"
+    assert first.regions == ["westeurope", "northeurope"]
+    assert first.tenants[1].plan == "pro"
+
+    assert second.app.name == "other"
+    assert second.app.limits.rps == 100
+    assert second.tenants[1].plan == "free"
+    assert second.regions == ["westeurope"]
+
+    # the base is not modified
+    assert base.values["app"] == {
+        "name": "example",
+        "limits": {"rps": 100, "burst": 10},
+    }
+    assert base.values["tenants"][1] == {"id": "b", "plan": "pro"}
+    assert base.values["regions"] == ["westeurope"]
+
+
+def test_derived_variants_share_untouched_subtrees(builder):
+    base = builder.freeze()
+
+    variant = base.derive_map({"app:limits:rps": 200})
+
+    assert variant.values["large"] is base.values["large"]
+    assert variant.values["tenants"] is base.values["tenants"]
+    assert variant.values["app"] is not base.values["app"]
+    assert variant.values["app"]["name"] is base.values["app"]["name"]
+
+
+def test_base_is_not_affected_by_changes_to_sources():
+    source = MapSource({"a": {"b": 1}})
+    base = ConfigurationBuilder(source).freeze()
+
+    source.get_values()["a"]["b"] = 2
+
+    assert base.derive().a.b == 1
+
+
+def test_derive_applies_builder_options():
+    builder = ConfigurationBuilder(
+        MapSource({"host": "example.com", "url": "https://${host}"}), interpolate=True
+    )
+    base = builder.freeze()
+
+    variant = base.derive_map({"host": "example.org"})
+
+    assert variant.url == "https://example.org"
+    assert base.values["url"] == "https://example.com"
+    assert base.derive().url == "https://example.com"
+
+
+def test_derive_resolves_only_values_affected_by_overlays(monkeypatch):
+    builder = ConfigurationBuilder(
+        MapSource(
+            {
+                "host": "example.com",
+                "url": "https://${host}/${path}",
+                "path": "home",
+                "links": {"home": "${url}", "docs": "${url}/docs"},
+                "other": "${path}",
+                "escaped": "$${host}",
+                "large": {str(index): "${path}" for index in range(1000)},
+            }
+        ),
+        interpolate=True,
+    )
+    base = builder.freeze()
+
+    import config.common.variants as variants
+
+    resolved = []
+    original = variants.Interpolator
+
+    def interpolator(values, templates=None):
+        assert templates is not None, "derive must not scan all base values"
+        resolved.extend(templates)
+        return original(values, templates)
+
+    monkeypatch.setattr(variants, "Interpolator", interpolator)
+
+    variant = base.derive_map(
+        {"host": "example.org", "extra": {"name": "${host}", "literal": "$${x}"}}
+    )
+
+    assert variant.url == "https://example.org/home"
+    assert variant.links.home == "https://example.org/home"
+    assert variant.links.docs == "https://example.org/home/docs"
+    assert variant.extra.name == "example.org"
+    assert variant.extra.literal == "${x}"
+    assert variant.escaped == "${host}"
+    assert sorted(resolved) == [
+        ("extra", "literal"),
+        ("extra", "name"),
+        ("links", "docs"),
+        ("links", "home"),
+        ("url",),
+    ]
+    assert variant.values["large"] is base.values["large"]
+
+
+def test_derive_does_not_resolve_base_values_overridden_by_overlays():
+    builder = ConfigurationBuilder(
+        MapSource({"port": 80, "default_port": 80, "url": "${port}"}),
+        MapSource({"port": "${default_port}"}),
+        interpolate=True,
+    )
+    base = builder.freeze()
+
+    variant = base.derive_map({"default_port": 81, "port": 80})
+
+    assert variant.port == 80
+    assert variant.url == 80
+
+
+def test_derive_resolves_base_values_referencing_overlays():
+    builder = ConfigurationBuilder(
+        MapSource({"url": "https://${tenant.host}"}), interpolate=True
+    )
+    base = builder.freeze()
+
+    assert base.derive_map({"tenant": {"host": "a.com"}}).url == "https://a.com"
+    assert base.derive_map({"tenant": {"host": "b.com"}}).url == "https://b.com"
+
+
+def test_derive_binds_secrets_and_converts_overlays():
+    class Resolver(SecretResolver):
+        def get_secret(self, name):
+            return f"secret-{name}"
+
+    builder = ConfigurationBuilder(
+        MapSource(
+            {
+                "port": "8080",
+                "password": "secret://db",
+                "ports": "1,2",
+                "tenants": [{"rps": "10"}],
+            }
+        ),
+        interpolate=True,
+        secrets=Secrets(Resolver()),
+        schema=Schema(
+            {"port": int, "ports": List[int], "tenants.*.rps": int, "timeout": int}
+        ),
+    )
+    base = builder.freeze()
+
+    assert base.values["port"] == 8080
+    assert isinstance(base.values["password"], SecretReference)
+
+    variant = base.derive_map(
+        {
+            "port": "${timeout}",
+            "timeout": "30",
+            "password": "secret://other",
+            "tenants:0:rps": "20",
+        }
+    )
+
+    assert variant.port == 30
+    assert variant.timeout == 30
+    assert variant.password == "secret-other"
+    assert variant.tenants[0].rps == 20
+    assert variant.values["ports"] is base.values["ports"]
+
+    with pytest.raises(ConfigurationCoercionError):
+        base.derive_map({"tenants:0:rps": "many"})
+
+
+def test_derive_raises_for_invalid_overrides(builder):
+    base = builder.freeze()
+
+    with pytest.raises(ConfigurationOverrideError):
+        base.derive_map({"app:name:value": 1})
+
+
+def test_derive_does_not_resolve_pending_base_values_overridden_by_overlays():
+    builder = ConfigurationBuilder(
+        MapSource({"url": "https://${tenant.host}"}), interpolate=True
+    )
+    base = builder.freeze()
+
+    assert base.derive_map({"url": "https://example.com"}).url == "https://example.com"
+
+
+def test_derive_frozen_variants(builder):
+    builder.frozen = True
+    base = builder.freeze()
+
+    first = base.derive_map({"app:limits:rps": 200, "regions": ["northeurope"]})
+    second = base.derive_map({"tenants:1:plan": "free"})
+
+    assert isinstance(first.values, FrozenMapping)
+    assert first.app.limits.rps == 200
+    assert first.regions == ("westeurope", "northeurope")
+    assert second.tenants[1].plan == "free"
+    assert isinstance(second.values["tenants"][0], FrozenMapping)
+
+    # frozen subtrees of the base are shared by derived configurations
+    assert first.values["large"] is second.values["large"]
+    assert first.values["tenants"] is base.derive().values["tenants"]
+    assert first.values["app"]["name"] is second.values["app"]["name"]
+    assert second.values["app"] is base.derive().values["app"]
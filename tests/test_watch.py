@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+from config.common import ConfigurationBuilder
+from config.common.provider import ConfigurationProvider
+from config.common.watch import ConfigurationWatcher
+from config.env import EnvVars
+from config.json import JSONFile
+
+
+def _write_json(path: Path, data) -> None:
+    path.write_text(json.dumps(data), encoding="utf8")
+    # ensure a different mtime, also on file systems with coarse resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_watcher_get_paths(tmp_path):
+    env_file = tmp_path / ".env"
+    builder = ConfigurationBuilder(
+        JSONFile(tmp_path / "settings.json", optional=True), EnvVars(file=env_file)
+    )
+    provider = ConfigurationProvider(builder)
+    watcher = ConfigurationWatcher(provider, paths=[tmp_path / "extra.txt"])
+
+    assert watcher.get_paths() == [
+        tmp_path / "settings.json",
+        env_file,
+        tmp_path / "extra.txt",
+    ]
+
+
+def test_watcher_publishes_new_configuration(tmp_path):
+    settings_file = tmp_path / "settings.json"
+    _write_json(settings_file, {"value": 1})
+
+    provider = ConfigurationProvider(ConfigurationBuilder(JSONFile(settings_file)))
+    watcher = ConfigurationWatcher(provider, interval=0.01, debounce=0.01)
+
+    async def consume():
+        async for config in watcher:
+            return config
+
+    async def main():
+        async with watcher:
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.05)
+            _write_json(settings_file, {"value": 2})
+            return await asyncio.wait_for(consumer, 5)
+
+    config = asyncio.run(main())
+
+    assert config.value == 2
+    assert provider.configuration is config
+    assert watcher.running is False
+
+
+def test_watcher_slow_consumer_gets_latest_configuration(tmp_path):
+    settings_file = tmp_path / "settings.json"
+    _write_json(settings_file, {"value": 1})
+
+    provider = ConfigurationProvider(ConfigurationBuilder(JSONFile(settings_file)))
+    watcher = ConfigurationWatcher(provider, interval=60)
+    values = []
+
+    async def consume():
+        async for config in watcher:
+            values.append(config.value)
+            if config.value == 3:
+                return
+            await asyncio.sleep(0.1)
+
+    async def main():
+        async with watcher:
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.01)
+            _write_json(settings_file, {"value": 2})
+            await watcher.reload()
+            await asyncio.sleep(0.01)
+            # published while the consumer is busy
+            _write_json(settings_file, {"value": 3})
+            await watcher.reload()
+            await asyncio.wait_for(consumer, 5)
+
+    asyncio.run(main())
+
+    assert values == [2, 3]
+
+
+def test_watcher_keeps_configuration_on_error(tmp_path):
+    settings_file = tmp_path / "settings.json"
+    _write_json(settings_file, {"value": 1})
+
+    provider = ConfigurationProvider(ConfigurationBuilder(JSONFile(settings_file)))
+    watcher = ConfigurationWatcher(provider, interval=0.01, debounce=0.01)
+
+    async def main():
+        async with watcher:
+            settings_file.write_text("{", encoding="utf8")
+            for _ in range(500):
+                await asyncio.sleep(0.01)
+                if watcher.last_error is not None:
+                    break
+
+    asyncio.run(main())
+
+    assert isinstance(watcher.last_error, ValueError)
+    assert provider.configuration.value == 1
+    assert provider.version == 1
+
+
+def test_watcher_reads_file_states_in_executor(tmp_path):
+    provider = ConfigurationProvider(
+        ConfigurationBuilder(JSONFile(tmp_path / "settings.json", optional=True))
+    )
+    watcher = ConfigurationWatcher(provider, interval=0.01, debounce=0.01)
+    threads = []
+    get_states = watcher._get_states
+
+    def record_thread():
+        threads.append(threading.current_thread())
+        return get_states()
+
+    watcher._get_states = record_thread  # type: ignore
+
+    async def main():
+        async with watcher:
+            await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    # the initial states are read when the watcher starts, then polled in threads
+    assert len(threads) > 2
+    assert threading.main_thread() not in threads[1:]
+
+
+def test_watcher_stop_ends_iteration(tmp_path):
+    provider = ConfigurationProvider(ConfigurationBuilder())
+    watcher = ConfigurationWatcher(provider)
+
+    async def consume():
+        return [config async for config in watcher]
+
+    async def main():
+        watcher.start()
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0)
+        await watcher.stop()
+        return await asyncio.wait_for(consumer, 5)
+
+    assert asyncio.run(main()) == []
+
+
+def test_env_file_changes_are_applied_on_rebuild(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("EC_TEST_WATCH_VALUE=1\n", encoding="utf8")
+
+    builder = ConfigurationBuilder(EnvVars(prefix="EC_TEST_WATCH_", file=env_file))
+    try:
+        assert builder.build().value == "1"
+
+        env_file.write_text("EC_TEST_WATCH_VALUE=2\n", encoding="utf8")
+        assert builder.build().value == "2"
+    finally:
+        del os.environ["EC_TEST_WATCH_VALUE"]